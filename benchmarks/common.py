@@ -0,0 +1,79 @@
+import asyncio
+import dataclasses
+import time
+import typing
+
+
+def percentile(ordered: typing.Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an already sorted sequence.
+    """
+    if not ordered:
+        return 0.0
+    rank = max(1, min(len(ordered), round(q * len(ordered) + 0.5)))
+    return ordered[rank - 1]
+
+
+@dataclasses.dataclass
+class Result:
+    name: str
+    samples: list[float] = dataclasses.field(default_factory=list)
+    elapsed: float = 0.0
+    errors: int = 0
+    extra: dict[str, typing.Any] = dataclasses.field(default_factory=dict)
+
+    def summary(self) -> dict[str, typing.Any]:
+        ordered = sorted(self.samples)
+        count = len(ordered)
+        return {
+            "name": self.name,
+            "count": count,
+            "errors": self.errors,
+            "elapsed_s": round(self.elapsed, 4),
+            "throughput_per_s": round(count / self.elapsed, 2) if self.elapsed else 0.0,
+            "mean_ms": round(sum(ordered) / count * 1000, 3) if count else 0.0,
+            "p50_ms": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(ordered, 0.99) * 1000, 3),
+            "max_ms": round(ordered[-1] * 1000, 3) if count else 0.0,
+            **self.extra,
+        }
+
+
+async def drive(name: str, operation: typing.Callable[[int], typing.Awaitable[typing.Any]], iterations: int,
+                concurrency: int = 1) -> Result:
+    """
+    Call operation(i) for i in range(iterations) from `concurrency` workers, timing each call.
+    Exceptions are counted, not raised, so one bad request doesn't end a long run.
+    """
+    result = Result(name)
+    counter = iter(range(iterations))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                await operation(i)
+            except Exception:
+                result.errors += 1
+                continue
+            result.samples.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    result.elapsed = time.perf_counter() - started
+    return result
+
+
+def measure(name: str, operation: typing.Callable[[], typing.Any], repeat: int) -> Result:
+    """
+    Time a synchronous operation `repeat` times.
+    """
+    result = Result(name)
+    started = time.perf_counter()
+    for _ in range(repeat):
+        began = time.perf_counter()
+        operation()
+        result.samples.append(time.perf_counter() - began)
+    result.elapsed = time.perf_counter() - started
+    return result
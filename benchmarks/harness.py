@@ -0,0 +1,121 @@
+"""
+Stands up the boards router as a real FastAPI app over a real Postgres pool, with N
+simulated online characters.
+
+Only the edges that belong to a running game are replaced: authentication resolves the
+X-Bench-User header to a seeded user, the online list is the simulated characters, and
+events are delivered to an in-process hub that counts them instead of to sockets.
+"""
+import typing
+import uuid
+
+import asyncpg
+import httpx
+import mudforge
+from fastapi import FastAPI, Request
+
+from mudforge.rest.utils import get_current_user
+from mudforge.models.users import UserModel
+from mudforge.models.characters import CharacterModel, ActiveAs
+
+import mudforge_mush.rest.boards as rest_boards
+
+
+class SimulatedHub:
+    """
+    Stands in for mudforge.EVENT_HUB. Each send renders nothing and writes nothing; it
+    only counts, so fan-out cost measured here is the plugin's own.
+    """
+
+    def __init__(self):
+        self.delivered = 0
+        self.by_character: dict[uuid.UUID, int] = dict()
+
+    async def send(self, character_id: uuid.UUID, event):
+        self.delivered += 1
+        self.by_character[character_id] = self.by_character.get(character_id, 0) + 1
+
+
+class SimulatedBroadcaster:
+
+    def __init__(self):
+        self.broadcasts = 0
+
+    async def broadcast(self, event):
+        self.broadcasts += 1
+
+
+class Harness:
+
+    def __init__(self, pool: asyncpg.Pool, users: dict[str, UserModel], online: list[ActiveAs]):
+        self.pool = pool
+        self.users = users
+        self.online = online
+        self.hub = SimulatedHub()
+        self.bytes_received = 0
+        # Each character's last board list and its ETag, as the portal keeps them.
+        self.catalogs: dict[uuid.UUID, tuple[str, list]] = dict()
+        self.app = FastAPI()
+        self.app.include_router(rest_boards.router, prefix="/boards")
+        self.app.dependency_overrides[get_current_user] = self.current_user
+        self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=self.app), base_url="http://bench")
+
+    async def current_user(self, request: Request) -> UserModel:
+        return self.users[request.headers["X-Bench-User"]]
+
+    async def list_online(self) -> list[ActiveAs]:
+        return self.online
+
+    def install(self):
+        mudforge.PGPOOL = self.pool
+        mudforge.EVENT_HUB = self.hub
+        mudforge.BROADCASTERS = {"boards": SimulatedBroadcaster()}
+        rest_boards.list_online = self.list_online
+
+    async def request(self, method: str, url: str, character: CharacterModel, **kwargs) -> typing.Any:
+        params = kwargs.pop("params", dict())
+        params["character_id"] = str(character.id)
+        response = await self.client.request(method, url, params=params,
+                                             headers={"X-Bench-User": str(character.user_id)}, **kwargs)
+        response.raise_for_status()
+        self.bytes_received += len(response.content)
+        return response.json()
+
+    async def board_list(self, character: CharacterModel) -> list:
+        """
+        GET /boards/ the way the portal does: revalidating the character's cached copy
+        with If-None-Match and reusing it on a 304.
+        """
+        headers = {"X-Bench-User": str(character.user_id)}
+        if (cached := self.catalogs.get(character.id, None)) is not None:
+            headers["If-None-Match"] = cached[0]
+        response = await self.client.get("/boards/", params={"character_id": str(character.id)}, headers=headers)
+        if cached is not None and response.status_code == 304:
+            return cached[1]
+        response.raise_for_status()
+        self.bytes_received += len(response.content)
+        self.catalogs[character.id] = (response.headers["ETag"], response.json())
+        return self.catalogs[character.id][1]
+
+    async def close(self):
+        await self.client.aclose()
+        await self.pool.close()
+
+
+async def build(dsn: str, characters: list[dict], online: int, pool_size: int = 20) -> Harness:
+    """
+    characters are the seeder's chosen characters; the first `online` of them are online.
+    Rows are loaded without validation, since only their ids and names are used here.
+    """
+    pool = await asyncpg.create_pool(dsn, min_size=2, max_size=pool_size)
+    ids = [uuid.UUID(c["id"]) for c in characters]
+    character_rows = await pool.fetch("SELECT * FROM characters WHERE id = ANY($1::uuid[])", ids)
+    user_rows = await pool.fetch("SELECT * FROM users WHERE id = ANY($1::uuid[])",
+                                 list({row["user_id"] for row in character_rows}))
+    users = {str(row["id"]): UserModel.model_construct(**row) for row in user_rows}
+    by_id = {row["id"]: CharacterModel.model_construct(**row) for row in character_rows}
+    active = [ActiveAs.model_construct(user=users[str(by_id[i].user_id)], character=by_id[i])
+              for i in ids[:online] if i in by_id]
+    harness = Harness(pool, users, active)
+    harness.install()
+    return harness
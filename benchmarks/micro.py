@@ -0,0 +1,137 @@
+"""
+Microbenchmarks for individual optimizations. These need no database.
+"""
+import asyncio
+import datetime
+import random
+import time
+import types
+import uuid
+from decimal import Decimal
+
+import mudforge
+
+from benchmarks.common import Result, drive, measure
+
+
+def render_once(recipients: int, repeat: int) -> list[Result]:
+    """
+    Board event text for a fan-out: rendering per recipient, as events used to, against
+    rendering once when the event is built and reusing the result.
+    """
+    from mudforge_mush.events.boards import BoardPostCreate
+
+    def build():
+        return BoardPostCreate.variants(character_name="Somebody", board_key="BFA1", board_name="Bench Board",
+                                        faction_name="Bench Faction", poster_name="Mask", post_title="A title",
+                                        post_key="12")
+
+    def per_recipient():
+        public, admin = build()
+        for i in range(recipients):
+            public.format_message(public.render_message())
+
+    def once():
+        public, admin = build()
+        for i in range(recipients):
+            public.rendered
+
+    results = [measure("render_per_recipient", per_recipient, repeat), measure("render_once", once, repeat)]
+    for result in results:
+        result.extra["recipients"] = recipients
+    return results
+
+
+async def radio_burst(listeners: int, frequencies: int, transmissions: int, hub) -> list[Result]:
+    """
+    Transmissions on a frequency with `listeners` tuned characters, half of them online,
+    from transmit() until the fan-out has delivered to every online listener, plus a range
+    scan over the index.
+    """
+    from mudforge_mush.api import radio, fanout
+
+    index = radio.RADIO_INDEX
+    index.loaded = True
+    rng = random.Random(1)
+    busy = radio.to_key(Decimal("100.000"))
+    for i in range(listeners):
+        index.add(busy, character_id := uuid.uuid4())
+        if i % 2 == 0:
+            index.login(character_id)
+    for i in range(listeners):
+        index.login(character_id := uuid.uuid4())
+        index.add(radio.to_key(Decimal(rng.randrange(100000, 100000 + frequencies)) / 1000), character_id)
+
+    speaker = types.SimpleNamespace(id=uuid.uuid4(), name="Bench Speaker")
+
+    burst = Result("radio_transmit_burst", extra={"listeners": listeners, "online": len(index.listening(busy))})
+    mudforge.EVENT_HUB = hub
+    started = time.perf_counter()
+    for i in range(transmissions):
+        began = time.perf_counter()
+        await radio.transmit(speaker, Decimal("100.000"), f"Burst {i}")
+        # transmit() doesn't wait on delivery; wait for the fan-out it started.
+        await asyncio.gather(*list(fanout._pending))
+        burst.samples.append(time.perf_counter() - began)
+    burst.elapsed = time.perf_counter() - started
+
+    low = radio.to_key(Decimal("100.000"))
+    scan = measure("radio_scan", lambda: index.scan(low, low + frequencies // 2), transmissions)
+    scan.extra["active_frequencies"] = len(index.active)
+    return [burst, scan]
+
+
+def post_rows(count: int) -> list[dict]:
+    """
+    Rows shaped like board_post_view_full, for a board with `count` posts.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    character_id = uuid.uuid4()
+    body = "A post body of ordinary length, with [b]some[/b] markup in it. " * 10
+    return [dict(id=i, board_id=1, post_order=i, sub_order=0, post_key=str(i), spoof_id=1, title=f"Post {i}",
+                 body=body, created_at=now, updated_at=now, deleted_at=None, character_id=character_id,
+                 character_name="Somebody", spoofed_name="Somebody", user_id=uuid.uuid4(), board_key="1",
+                 board_name="Bench Board", faction_id=None, faction_name=None, faction_abbreviation=None,
+                 anonymous_name=None)
+            for i in range(1, count + 1)]
+
+
+async def trusted_rows(count: int, repeat: int) -> list[Result]:
+    """
+    A `count`-post listing fetched through a FastAPI router, as list_posts serves it: a
+    response_model route returning validated models against a route returning trusted rows
+    serialized once with rest.boards.json_response. Both run FastAPI's full request path.
+    """
+    import fastapi
+    import httpx
+    from mudforge_mush.models.boards import BoardPostModel, BoardPostPage
+    from mudforge_mush.db.trusted import trusted
+    from mudforge_mush.rest.boards import json_response
+
+    rows = post_rows(count)
+    from_row = trusted(BoardPostModel)
+    router = fastapi.APIRouter()
+
+    @router.get("/validated", response_model=BoardPostPage)
+    async def validated():
+        return BoardPostPage(posts=[BoardPostModel(**row) for row in rows])
+
+    @router.get("/trusted", response_class=fastapi.Response, responses={200: {"model": BoardPostPage}})
+    async def trusted_listing():
+        return json_response(BoardPostPage(posts=[from_row(row) for row in rows]))
+
+    app = fastapi.FastAPI()
+    app.include_router(router)
+
+    results = list()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        for name, path in (("rows_validated", "/validated"), ("rows_trusted", "/trusted")):
+            async def fetch(_i: int, path=path):
+                response = await client.get(path)
+                response.raise_for_status()
+
+            results.append(await drive(name, fetch, repeat))
+    for result in results:
+        result.extra["rows"] = count
+        result.extra["rows_per_s"] = round(count * len(result.samples) / result.elapsed) if result.elapsed else 0
+    return results
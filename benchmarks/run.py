@@ -0,0 +1,174 @@
+"""
+Boards load test and benchmarks. Seeds Postgres, drives the real boards routes with N
+simulated online characters, and prints p50/p95/p99 latency and throughput as JSON.
+
+    python -m benchmarks.run --dsn postgresql://localhost/mush --online 200 --iterations 500 \\
+        --concurrency 16 --output bench_output.json
+
+Scenarios can be chosen with --scenarios; see SCENARIOS below. The micro scenarios need
+no database and run with --micro-only.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+
+from benchmarks import seed as seeder
+from benchmarks.common import Result, drive
+from benchmarks import micro
+
+HTTP_SCENARIOS = ("create_post", "list_posts", "list_post_summaries", "get_post", "bbread_index", "bbread_board",
+                  "bbread_post", "parallel_posters")
+MICRO_SCENARIOS = ("render_once", "radio_burst", "trusted_rows")
+SCENARIOS = HTTP_SCENARIOS + MICRO_SCENARIOS
+
+# The portal's bbread shows this many posts per page.
+BBREAD_PAGE_SIZE = 30
+
+
+async def run_http(args: argparse.Namespace, scenarios: list[str]) -> list[Result]:
+    from benchmarks.harness import build
+
+    created = await seeder.seed_from_args(args)
+    harness = await build(args.dsn, created["characters"], args.online, pool_size=args.pool_size)
+    rng = random.Random(args.seed)
+    characters = [act.character for act in harness.online]
+    boards = {key: posts for key, posts in created["boards"].items() if key.isdigit()}
+    board_keys = list(boards)
+
+    def anyone():
+        return rng.choice(characters)
+
+    async def create_post(i):
+        await harness.request("POST", f"/boards/{rng.choice(board_keys)}/posts", anyone(),
+                              json={"title": f"Load post {i}", "body": "Posted by the benchmark."})
+
+    async def list_posts(i):
+        await harness.request("GET", f"/boards/{rng.choice(board_keys)}/posts", anyone(),
+                              params={"limit": 50})
+
+    async def list_post_summaries(i):
+        await harness.request("GET", f"/boards/{rng.choice(board_keys)}/posts", anyone(),
+                              params={"limit": 50, "fields": "summary"})
+
+    async def get_post(i):
+        key = rng.choice(board_keys)
+        await harness.request("GET", f"/boards/{key}/posts/{rng.choice(boards[key])}", anyone())
+
+    # The bbread paths are the HTTP calls BBRead makes, in order.
+    async def bbread_index(i):
+        character = anyone()
+        await harness.board_list(character)
+
+    async def bbread_board(i):
+        character = anyone()
+        await harness.board_list(character)
+        await harness.request("GET", f"/boards/{rng.choice(board_keys)}/posts", character,
+                              params={"limit": BBREAD_PAGE_SIZE, "fields": "summary"})
+
+    async def bbread_post(i):
+        character = anyone()
+        key = rng.choice(board_keys)
+        await harness.board_list(character)
+        await harness.request("GET", f"/boards/{key}/posts/{rng.choice(boards[key])}", character)
+
+    operations = dict(create_post=create_post, list_posts=list_posts, list_post_summaries=list_post_summaries,
+                      get_post=get_post, bbread_index=bbread_index, bbread_board=bbread_board, bbread_post=bbread_post)
+
+    results = list()
+    try:
+        for name in scenarios:
+            if name == "parallel_posters":
+                results.append(await parallel_posters(harness, board_keys[0], args.iterations,
+                                                      args.concurrency, characters))
+                continue
+            delivered, received = harness.hub.delivered, harness.bytes_received
+            result = await drive(name, operations[name], args.iterations, args.concurrency)
+            result.extra["events_delivered"] = harness.hub.delivered - delivered
+            result.extra["bytes_per_call"] = round((harness.bytes_received - received) / max(1, len(result.samples)))
+            results.append(result)
+    finally:
+        await harness.close()
+    return results
+
+
+async def parallel_posters(harness, board_key: str, iterations: int, concurrency: int, characters) -> Result:
+    """
+    Many characters posting to one board at once. Also checks that post numbers stayed
+    unique; the counters allow gaps but never duplicates.
+    """
+    async def post(i):
+        await harness.request("POST", f"/boards/{board_key}/posts", characters[i % len(characters)],
+                              json={"title": f"Race {i}", "body": "Parallel post."})
+
+    result = await drive("parallel_posters", post, iterations, concurrency)
+    duplicates = await harness.pool.fetchval(
+        "SELECT COUNT(*) FROM (SELECT p.post_order FROM board_posts p JOIN board_view b ON b.id = p.board_id "
+        "WHERE b.board_key = $1 AND p.sub_order = 0 AND p.deleted_at IS NULL "
+        "GROUP BY p.post_order HAVING COUNT(*) > 1) d", board_key)
+    result.extra["duplicate_post_numbers"] = duplicates
+    result.extra["concurrency"] = concurrency
+    return result
+
+
+async def run_micro(args: argparse.Namespace, scenarios: list[str]) -> list[Result]:
+    from benchmarks.harness import SimulatedHub
+
+    results = list()
+    if "render_once" in scenarios:
+        results.extend(micro.render_once(args.online, max(10, args.iterations // 10)))
+    if "radio_burst" in scenarios:
+        results.extend(await micro.radio_burst(args.radio_listeners, 5000, max(10, args.iterations // 10),
+                                               SimulatedHub()))
+    if "trusted_rows" in scenarios:
+        results.extend(await micro.trusted_rows(args.listing_rows, max(5, args.iterations // 40)))
+    return results
+
+
+async def main_async(args: argparse.Namespace) -> dict:
+    scenarios = args.scenarios or list(SCENARIOS)
+    if unknown := set(scenarios) - set(SCENARIOS):
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    started = time.time()
+    results = await run_micro(args, scenarios)
+    if not args.micro_only and (http := [name for name in scenarios if name in HTTP_SCENARIOS]):
+        if not args.dsn:
+            raise SystemExit("--dsn is required for the HTTP scenarios; use --micro-only to skip them.")
+        results.extend(await run_http(args, http))
+    return {
+        "started_at": started,
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key != "dsn"},
+        "results": [result.summary() for result in results],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    seeder.add_arguments(parser)
+    parser._option_string_actions["--dsn"].required = False
+    parser.add_argument("--online", type=int, default=100, help="Simulated online characters.")
+    parser.add_argument("--iterations", type=int, default=200, help="Calls per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Calls in flight at once.")
+    parser.add_argument("--pool-size", type=int, default=20)
+    parser.add_argument("--radio-listeners", type=int, default=10000)
+    parser.add_argument("--listing-rows", type=int, default=10000, help="Posts in the trusted_rows listing.")
+    parser.add_argument("--scenarios", nargs="*", choices=SCENARIOS)
+    parser.add_argument("--micro-only", action="store_true", help="Run only the scenarios that need no database.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text)
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
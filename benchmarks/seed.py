@@ -0,0 +1,150 @@
+"""
+Seed a local Postgres with benchmark boards, factions, members and posts.
+
+Users and characters belong to mudforge itself, so the seeder reuses characters that
+already exist (create them through the game first). Everything it creates is named
+"Bench ..." and removed again by --reset.
+
+    python -m benchmarks.seed --dsn postgresql://localhost/mush --characters 200 --posts 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import string
+
+import asyncpg
+
+
+def abbreviation(i: int) -> str:
+    # Board keys are <letters><digits>, so faction abbreviations must be letters only.
+    letters = ""
+    i += 1
+    while i:
+        i, remainder = divmod(i - 1, 26)
+        letters = string.ascii_uppercase[remainder] + letters
+    return f"BF{letters}"
+
+
+async def reset(conn: asyncpg.Connection):
+    async with conn.transaction():
+        await conn.execute("DELETE FROM boards WHERE name LIKE 'Bench %'")
+        await conn.execute("DELETE FROM faction_members WHERE faction_id IN "
+                           "(SELECT id FROM factions WHERE name LIKE 'Bench %')")
+        await conn.execute("DELETE FROM factions WHERE name LIKE 'Bench %'")
+
+
+async def seed(conn: asyncpg.Connection, characters: int, factions: int, members: int, boards: int, posts: int,
+               replies: int, body_size: int, rng: random.Random) -> dict:
+    """
+    Returns what was created: the characters used, and every board's key with its post keys.
+    """
+    rows = await conn.fetch("SELECT id, user_id, name FROM characters ORDER BY name LIMIT $1", characters)
+    if len(rows) < characters:
+        raise SystemExit(f"Only {len(rows)} characters exist; create more or lower --characters.")
+    chosen = [dict(id=str(row["id"]), user_id=str(row["user_id"]), name=row["name"]) for row in rows]
+
+    spoofs = list()
+    for row in rows:
+        spoofs.append(await conn.fetchval(
+            "INSERT INTO character_spoofs (character_id, spoofed_name) VALUES ($1, $2) "
+            "ON CONFLICT (character_id, spoofed_name) DO UPDATE SET updated_at = character_spoofs.updated_at "
+            "RETURNING id", row["id"], row["name"]))
+
+    created_boards = list()
+    async with conn.transaction():
+        for order in range(1, boards + 1):
+            board_id = await conn.fetchval("INSERT INTO boards (name, board_order) VALUES ($1, $2) RETURNING id",
+                                           f"Bench Public {order}", 1000 + order)
+            created_boards.append((board_id, str(1000 + order)))
+
+        for i in range(factions):
+            abbr = abbreviation(i)
+            faction_id = await conn.fetchval(
+                "INSERT INTO factions (name, abbreviation, member_permissions) VALUES ($1, $2, $3) RETURNING id",
+                f"Bench Faction {i}", abbr, ["bbread"])
+            ranks = dict()
+            for value, permissions in ((1, ["bbadmin"]), (2, ["bbadmin"]), (3, []), (4, [])):
+                ranks[value] = await conn.fetchval(
+                    "INSERT INTO faction_ranks (faction_id, name, value, permissions) VALUES ($1, $2, $3, $4) "
+                    "RETURNING id", faction_id, f"Rank {value}", value, permissions)
+            sample = rng.sample(rows, min(members, len(rows)))
+            await conn.copy_records_to_table(
+                "faction_members", columns=("faction_id", "character_id", "rank_id"),
+                records=[(faction_id, row["id"], ranks[rng.choice((1, 2, 3, 4, 4, 4))]) for row in sample])
+            locks = json.dumps({"read": f"faction({abbr})", "post": f"faction({abbr})"})
+            board_id = await conn.fetchval(
+                "INSERT INTO boards (name, board_order, faction_id, locks) VALUES ($1, 1, $2, $3::jsonb) RETURNING id",
+                f"Bench {abbr} Board", faction_id, locks)
+            created_boards.append((board_id, f"{abbr}1"))
+
+        body = "".join(rng.choices(string.ascii_letters + "     ", k=body_size))
+        records = list()
+        keys: dict[str, list[str]] = dict()
+        for board_id, board_key in created_boards:
+            keys[board_key] = list()
+            for post_order in range(1, posts + 1):
+                records.append((board_id, post_order, 0, rng.choice(spoofs), f"Bench post {post_order}", body))
+                keys[board_key].append(str(post_order))
+                for sub_order in range(1, replies + 1):
+                    records.append((board_id, post_order, sub_order, rng.choice(spoofs),
+                                    f"RE: Bench post {post_order}", body))
+        await conn.copy_records_to_table(
+            "board_posts", columns=("board_id", "post_order", "sub_order", "spoof_id", "title", "body"),
+            records=records)
+
+        board_ids = [board_id for board_id, board_key in created_boards]
+        await conn.execute(
+            "INSERT INTO board_post_counters (board_id, post_order, last_value) "
+            "SELECT board_id, 0, MAX(post_order) FROM board_posts WHERE board_id = ANY($1::int[]) GROUP BY board_id "
+            "UNION ALL "
+            "SELECT board_id, post_order, MAX(sub_order) FROM board_posts WHERE board_id = ANY($1::int[]) "
+            "GROUP BY board_id, post_order "
+            "ON CONFLICT (board_id, post_order) DO UPDATE SET last_value = EXCLUDED.last_value", board_ids)
+
+    return {"characters": chosen, "boards": keys, "posts": len(records)}
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--dsn", required=True, help="Postgres DSN of a game database with mudforge-mush migrated.")
+    parser.add_argument("--characters", type=int, default=100, help="Existing characters to use.")
+    parser.add_argument("--factions", type=int, default=5)
+    parser.add_argument("--members", type=int, default=50, help="Members per faction.")
+    parser.add_argument("--boards", type=int, default=5, help="Public boards; each faction also gets one.")
+    parser.add_argument("--posts", type=int, default=500, help="Posts per board.")
+    parser.add_argument("--replies", type=int, default=2, help="Replies per post.")
+    parser.add_argument("--body-size", type=int, default=600, help="Characters per post body.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed, for reproducible data.")
+
+
+async def seed_from_args(args: argparse.Namespace) -> dict:
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        await reset(conn)
+        return await seed(conn, args.characters, args.factions, args.members, args.boards, args.posts,
+                          args.replies, args.body_size, random.Random(args.seed))
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_arguments(parser)
+    parser.add_argument("--reset", action="store_true", help="Only remove previously seeded data.")
+    args = parser.parse_args()
+    if args.reset:
+        async def only_reset():
+            conn = await asyncpg.connect(args.dsn)
+            try:
+                await reset(conn)
+            finally:
+                await conn.close()
+        asyncio.run(only_reset())
+        return
+    created = asyncio.run(seed_from_args(args))
+    print(json.dumps({"boards": len(created["boards"]), "posts": created["posts"],
+                      "characters": len(created["characters"])}))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,27 @@
+import typing
+
 from mudforge.models.characters import CharacterModel, ActiveAs
 from mudforge.api.locks import HasLocks
 from mudforge_mush.models.boards import BoardModel, BoardPostModel
-from mudforge_mush.db.factions import get_faction
+from mudforge_mush.db.factions import get_faction, get_effective_permissions_many, prefetch_memberships
 
-async def board_admin(active: ActiveAs, faction_id: int | None) -> bool:
+async def board_admin(active: ActiveAs, faction_id: int | None, faction: typing.Optional["Faction"] = None) -> bool:
     if faction_id is not None:
-        faction_model = await get_faction(faction_id)
-        from .factions import Faction
-        faction = Faction(faction_model)
+        if faction is None:
+            faction_model = await get_faction(faction_id)
+            from .factions import Faction
+            faction = Faction(faction_model)
         return await faction.access(active, "bbadmin")
     return active.user.admin_level > 3
 
 class Board(HasLocks):
 
-    def __init__(self, model: BoardModel):
+    def __init__(self, model: BoardModel, faction: typing.Optional["Faction"] = None):
         self.model = model
+        self.faction = faction
 
     async def is_admin(self, active: ActiveAs) -> bool:
-        return await board_admin(active, self.model.faction_id)
+        return await board_admin(active, self.model.faction_id, self.faction)
 
     async def check_override(self, active: ActiveAs, access_type: str) -> bool:
         if await self.is_admin(active):
@@ -26,4 +30,33 @@ class Board(HasLocks):
             case "read":
                 if await self.check(active, "post"):
                     return True
-        return False
\ No newline at end of file
+        return False
+
+
+async def board_audience(model: BoardModel, online: typing.Iterable[ActiveAs]) -> tuple[list[ActiveAs], list[ActiveAs]]:
+    """
+    Partition the online characters into those who administrate the board and those
+    who may merely read it. Characters who can do neither are left out.
+
+    Faction boards fetch the faction and all uncached memberships up front, so the
+    cost is a fixed number of queries no matter how many characters are online. The
+    same goes for faction() clauses in the board's locks.
+    """
+    online = list(online)
+    await prefetch_memberships(act.character.id for act in online)
+    faction = None
+    if model.faction_id is not None:
+        from .factions import Faction
+        faction_model = await get_faction(model.faction_id)
+        permissions = await get_effective_permissions_many(faction_model, [act.character for act in online])
+        faction = Faction(faction_model, permissions=permissions)
+    board = Board(model, faction=faction)
+
+    admins = list()
+    readers = list()
+    for act in online:
+        if await board.is_admin(act):
+            admins.append(act)
+        elif await board.access(act, "read"):
+            readers.append(act)
+    return admins, readers
@@ -0,0 +1,166 @@
+import asyncio
+import uuid
+from collections import deque
+from datetime import datetime, timezone
+
+from mudforge.models.characters import CharacterModel, ActiveAs
+from mudforge.api.locks import HasLocks
+
+from mudforge_mush.models.channels import ChannelModel, ChannelMessageModel
+from mudforge_mush.db import channels as channels_db
+from mudforge_mush.db import listen
+from mudforge_mush.events import channels as ev_channels
+from mudforge_mush.api.fanout import fanout
+
+# How many recent lines each channel keeps in memory for recall.
+HISTORY_SIZE = 200
+
+
+class Channel(HasLocks):
+
+    def __init__(self, model: ChannelModel):
+        self.model = model
+
+    async def check_override(self, acting: ActiveAs, access_type: str) -> bool:
+        return acting.user.admin_level > 3
+
+
+class ChannelState:
+    """
+    The live side of a channel: a ring of its recent lines and the set of characters
+    listening to it. Both are loaded once and then maintained in memory, so sending
+    and recalling lines never re-reads members or history.
+
+    Other processes' changes arrive on the mush_channels feed: membership changes update
+    listeners, and lines written elsewhere mark the history stale until the next recall.
+    """
+
+    def __init__(self, model: ChannelModel):
+        self.model = model
+        self.history: deque[ChannelMessageModel] = deque(maxlen=HISTORY_SIZE)
+        self.listeners: set[uuid.UUID] = set()
+        self.stale = False
+
+
+class ChannelHub:
+    """
+    Every live channel's model by name, and the state of each channel in use. Channel
+    names are resolved here rather than in the database; the mush_channels feed reloads
+    the names whenever a channel is changed or deleted anywhere.
+    """
+
+    def __init__(self):
+        self.channels: dict[int, ChannelState] = dict()
+        # Keyed by lower-cased name, as channel names are CITEXT.
+        self.names: dict[str, ChannelModel] = dict()
+        self.loaded = False
+        # Counts local invalidations, to spot one that happens during a load.
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+    async def load(self):
+        await listen.ensure_listening()
+        if self.loaded:
+            return
+        async with self.lock:
+            if self.loaded:
+                return
+            generation = self.generation
+            names = {model.name.lower(): model async for model in channels_db.list_channels()}
+            self.names = names
+            # Don't trust names that were invalidated while they loaded.
+            self.loaded = generation == self.generation
+
+    def add(self, model: ChannelModel):
+        self.names[model.name.lower()] = model
+
+    async def find(self, name: str) -> ChannelModel:
+        """
+        A live channel by name. Creating a channel sends no notification, so a name not
+        found in memory is looked up once in the database before it is reported missing.
+        """
+        await self.load()
+        if (model := self.names.get(name.lower(), None)) is None:
+            model = await channels_db.get_channel_by_name(name)
+            self.add(model)
+        return model
+
+    async def state(self, model: ChannelModel) -> ChannelState:
+        await listen.ensure_listening()
+        if (state := self.channels.get(model.id, None)) is not None:
+            state.model = model
+            return state
+        async with self.lock:
+            if (state := self.channels.get(model.id, None)) is None:
+                state = ChannelState(model)
+                state.listeners = await channels_db.get_listeners(model)
+                state.history.extend(await channels_db.recent_messages(model, HISTORY_SIZE))
+                self.channels[model.id] = state
+        return state
+
+    async def set_listening(self, model: ChannelModel, character: CharacterModel, listening: bool):
+        await channels_db.set_membership(model, character, listening)
+        state = await self.state(model)
+        if listening:
+            state.listeners.add(character.id)
+        else:
+            state.listeners.discard(character.id)
+
+    async def send(self, model: ChannelModel, character: CharacterModel, message: str) -> ChannelMessageModel:
+        state = await self.state(model)
+        line = ChannelMessageModel(channel_id=model.id, character_id=character.id, character_name=character.name,
+                                   message=message, created_at=datetime.now(timezone.utc))
+        state.history.append(line)
+        channels_db.record_message(line)
+        event = ev_channels.ChannelMessage(channel_name=model.name, speaker=character.name, message=message)
+        fanout((character_id, event) for character_id in state.listeners)
+        return line
+
+    async def recall(self, model: ChannelModel, count: int) -> list[ChannelMessageModel]:
+        state = await self.state(model)
+        if state.stale:
+            # Write our own buffered lines first so the reload interleaves them correctly.
+            state.stale = False
+            await channels_db.MESSAGE_WRITER.flush()
+            lines = await channels_db.recent_messages(model, HISTORY_SIZE)
+            state.history.clear()
+            state.history.extend(lines)
+        if count >= len(state.history):
+            return list(state.history)
+        return list(state.history)[-count:]
+
+
+    def forget_names(self):
+        self.generation += 1
+        self.loaded = False
+
+    def invalidate(self, *args):
+        self.channels.clear()
+        self.forget_names()
+
+    def on_notify(self, data):
+        if not isinstance(data, dict):
+            self.invalidate()
+        elif "lines" in data:
+            if data.get("origin", None) == channels_db.PROCESS_ID:
+                return
+            for channel_id in data["lines"]:
+                if (state := self.channels.get(channel_id, None)) is not None:
+                    state.stale = True
+        elif "character_id" in data:
+            if (state := self.channels.get(data["channel_id"], None)) is None:
+                return
+            character_id = uuid.UUID(data["character_id"])
+            if data.get("listening", False):
+                state.listeners.add(character_id)
+            else:
+                state.listeners.discard(character_id)
+        else:
+            # The channel itself changed, e.g. its locks, name or a delete; load it afresh.
+            self.channels.pop(data.get("channel_id", None), None)
+            self.forget_names()
+
+
+CHANNEL_HUB = ChannelHub()
+
+listen.register("mush_channels", CHANNEL_HUB.on_notify, on_lost=CHANNEL_HUB.invalidate)
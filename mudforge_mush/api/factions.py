@@ -1,30 +1,27 @@
+import uuid
+
 from mudforge.models.characters import CharacterModel, ActiveAs
 from mudforge.api.locks import HasLocks
 from mudforge_mush.models.factions import FactionModel
-from mudforge_mush.db.factions import get_membership
+from mudforge_mush.db.factions import get_effective_permissions, EffectivePermissions
 
 
 class Faction(HasLocks):
 
-    def __init__(self, model: FactionModel):
+    def __init__(self, model: FactionModel, permissions: dict[uuid.UUID, EffectivePermissions | None] | None = None):
         self.model = model
+        # Optional prefetched effective permissions, keyed by character id.
+        self.permissions = permissions
+
+    async def effective_permissions(self, character: CharacterModel) -> EffectivePermissions | None:
+        if self.permissions is not None and character.id in self.permissions:
+            return self.permissions[character.id]
+        return await get_effective_permissions(self.model, character)
 
     async def has_permission(self, character: CharacterModel, permission: str) -> bool:
-        if not (membership_data := await get_membership(self.model, character)):
+        if not (effective := await self.effective_permissions(character)):
             return False
-        # Leaders pass everything.
-        if membership_data["rank"] <= 1:
-            return True
-        access = permission.lower()
-        permissions = set()
-        permissions.update(self.model.member_permissions)
-        permissions.update(self.model.public_permissions)
-        permissions.update(membership_data["rank_permissions"])
-        permissions.update(membership_data["permissions"])
-        if access in permissions:
-            return True
-
-        return False
+        return effective.allows(permission)
 
     async def check_override(self, acting: ActiveAs, access_type: str) -> bool:
-        return await self.has_permission(acting.character, access_type)
\ No newline at end of file
+        return await self.has_permission(acting.character, access_type)
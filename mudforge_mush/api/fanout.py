@@ -0,0 +1,71 @@
+import mudforge
+import asyncio
+import dataclasses
+import logging
+import time
+import typing
+import uuid
+
+from mudforge.events.base import EventBase
+
+from mudforge_mush import metrics
+
+logger = logging.getLogger(__name__)
+
+# Default number of deliveries allowed in flight at once for a single fan-out.
+FANOUT_CONCURRENCY = 32
+
+# Fan-outs still delivering. Holding references keeps the tasks from being garbage collected.
+_pending: set[asyncio.Task] = set()
+
+
+@dataclasses.dataclass(slots=True)
+class FanoutReport:
+    event: str
+    recipients: int
+    started: float
+    duration: float = 0.0
+    failures: dict[uuid.UUID, BaseException] = dataclasses.field(default_factory=dict)
+
+
+async def _deliver(report: FanoutReport, deliveries: list[tuple[uuid.UUID, EventBase]], concurrency: int) -> FanoutReport:
+    iterator = iter(deliveries)
+
+    async def worker():
+        # Workers share one iterator, so at most `concurrency` sends are ever in flight.
+        for character_id, event in iterator:
+            try:
+                await mudforge.EVENT_HUB.send(character_id, event)
+            except Exception as err:
+                report.failures[character_id] = err
+
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, len(deliveries)))))
+    report.duration = time.perf_counter() - report.started
+    metrics.fanout(report.event).observe(report.recipients, report.duration, len(report.failures))
+    if report.failures:
+        logger.warning("Fan-out of %s failed for %d of %d recipients in %.1fms", report.event,
+                       len(report.failures), report.recipients, report.duration * 1000)
+    else:
+        logger.debug("Fan-out of %s reached %d recipients in %.1fms", report.event,
+                     report.recipients, report.duration * 1000)
+    return report
+
+
+def fanout(deliveries: typing.Iterable[tuple[uuid.UUID, EventBase]], concurrency: int | None = None) -> asyncio.Task:
+    """
+    Deliver events to many characters concurrently, without waiting for delivery.
+
+    Args:
+        deliveries: (character_id, event) pairs.
+        concurrency: Maximum sends in flight at once. Defaults to FANOUT_CONCURRENCY.
+
+    Returns:
+        A task resolving to the FanoutReport, once every delivery has been attempted.
+    """
+    deliveries = list(deliveries)
+    name = type(deliveries[0][1]).__name__ if deliveries else "nothing"
+    report = FanoutReport(event=name, recipients=len(deliveries), started=time.perf_counter())
+    task = asyncio.create_task(_deliver(report, deliveries, concurrency or FANOUT_CONCURRENCY))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return task
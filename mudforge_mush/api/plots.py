@@ -0,0 +1,101 @@
+import asyncio
+import html
+import typing
+import uuid
+from datetime import datetime, timezone
+
+from rich.markup import MarkupError
+from rich.text import Text
+
+from mudforge.models.characters import CharacterModel
+
+from mudforge_mush.models.plots import SceneModel, ScenePose
+from mudforge_mush.db import plots as plots_db
+from mudforge_mush.db.cache import TTLCache
+
+
+class SceneRoster:
+    """
+    Participants of scenes that are being posed in, kept in memory so that posing does
+    not re-read them. A participant row is written only on a character's first pose.
+    """
+
+    def __init__(self):
+        self.scenes = TTLCache(max_size=1000, ttl=3600)
+        self.lock = asyncio.Lock()
+
+    async def participants(self, scene: SceneModel) -> dict[uuid.UUID, int]:
+        if (found := self.scenes.get(scene.id, None)) is not None:
+            return found
+        async with self.lock:
+            if (found := self.scenes.get(scene.id, None)) is None:
+                found = await plots_db.get_participants(scene)
+                self.scenes.set(scene.id, found)
+        return found
+
+    def discard(self, scene: SceneModel):
+        self.scenes.discard(scene.id)
+
+
+SCENE_ROSTER = SceneRoster()
+
+
+async def pose(scene: SceneModel, character: CharacterModel, text: str) -> ScenePose:
+    participants = await SCENE_ROSTER.participants(scene)
+    if character.id not in participants:
+        await plots_db.add_participant(scene, character)
+        participants[character.id] = 0
+    line = ScenePose(scene_id=scene.id, character_id=character.id, character_name=character.name,
+                     pose=text, created_at=datetime.now(timezone.utc))
+    plots_db.record_pose(line)
+    return line
+
+
+async def finish(scene: SceneModel, resolution: str | None = None) -> SceneModel:
+    # Poses still buffered in the writer must reach scene_poses before compaction reads it.
+    await plots_db.POSE_WRITER.flush()
+    scene = await plots_db.compact_scene(scene, resolution)
+    SCENE_ROSTER.discard(scene)
+    return scene
+
+
+def plain(text: str) -> str:
+    try:
+        return Text.from_markup(text).plain
+    except MarkupError:
+        return text
+
+
+# Each exporter turns a stream of poses into a stream of text chunks, holding one pose
+# at a time, for use with a StreamingResponse.
+
+async def export_text(scene: SceneModel, poses: typing.AsyncIterable[ScenePose]) -> typing.AsyncGenerator[str, None]:
+    yield f"{scene.name}\n{'=' * len(scene.name)}\n\n"
+    async for line in poses:
+        yield f"[{line.created_at:%Y-%m-%d %H:%M}] {line.character_name}\n{plain(line.pose)}\n\n"
+
+
+async def export_html(scene: SceneModel, poses: typing.AsyncIterable[ScenePose]) -> typing.AsyncGenerator[str, None]:
+    name = html.escape(scene.name)
+    yield f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{name}</title></head><body>\n<h1>{name}</h1>\n"
+    async for line in poses:
+        yield (f"<div class=\"pose\"><span class=\"poser\">{html.escape(line.character_name)}</span> "
+               f"<time datetime=\"{line.created_at.isoformat()}\">{line.created_at:%Y-%m-%d %H:%M}</time>"
+               f"<p>{html.escape(plain(line.pose))}</p></div>\n")
+    yield "</body></html>\n"
+
+
+async def export_json(scene: SceneModel, poses: typing.AsyncIterable[ScenePose]) -> typing.AsyncGenerator[str, None]:
+    yield f"{{\"scene\": {scene.model_dump_json()}, \"poses\": ["
+    separator = ""
+    async for line in poses:
+        yield separator + line.model_dump_json()
+        separator = ", "
+    yield "]}"
+
+
+EXPORTERS = {
+    "text": (export_text, "text/plain; charset=utf-8"),
+    "html": (export_html, "text/html; charset=utf-8"),
+    "json": (export_json, "application/json"),
+}
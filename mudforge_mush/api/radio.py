@@ -0,0 +1,179 @@
+import asyncio
+import bisect
+import uuid
+from decimal import Decimal
+
+from mudforge.db.characters import list_online
+from mudforge.models.characters import CharacterModel
+
+from mudforge_mush.db import radio as radio_db
+from mudforge_mush.db import listen
+from mudforge_mush.events import radio as ev_radio
+from mudforge_mush.api.fanout import fanout
+
+# Frequencies are indexed as integers in thousandths, matching the NUMERIC(9, 3) column.
+SCALE = 1000
+
+
+def to_key(frequency: Decimal) -> int:
+    return int(frequency * SCALE)
+
+
+def from_key(key: int) -> Decimal:
+    return Decimal(key) / SCALE
+
+
+class RadioIndex:
+    """
+    Maps frequencies to the online characters tuned to them, and characters to every
+    frequency they are tuned to, online or not.
+
+    Transmitting is a single dictionary lookup that only ever finds online listeners:
+    logging out takes a character's frequencies out of the index and logging in puts
+    them back, so the online list is read once, at load, and never per message. Range
+    scans bisect a sorted list of the frequencies that currently have listeners.
+
+    Tuning and presence changes from every process arrive on the mush_radio feed.
+    """
+
+    def __init__(self):
+        self.listeners: dict[int, set[uuid.UUID]] = dict()
+        self.tuned: dict[uuid.UUID, set[int]] = dict()
+        self.online: set[uuid.UUID] = set()
+        self.active: list[int] = list()
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def load(self):
+        if self.loaded:
+            return
+        async with self.lock:
+            if self.loaded:
+                return
+            # Losing the listener invalidates the index, so this runs again after a reconnect.
+            await listen.ensure_listening()
+            self.listeners.clear()
+            self.tuned.clear()
+            self.active.clear()
+            self.online = {act.character.id for act in await list_online()}
+            async for frequency, character_id in radio_db.list_tuned():
+                self.add(to_key(frequency), character_id)
+            self.loaded = True
+
+    def invalidate(self, *args):
+        self.loaded = False
+
+    def _listen(self, key: int, character_id: uuid.UUID):
+        if (listeners := self.listeners.get(key, None)) is None:
+            listeners = self.listeners[key] = set()
+            bisect.insort(self.active, key)
+        listeners.add(character_id)
+
+    def _unlisten(self, key: int, character_id: uuid.UUID):
+        if (listeners := self.listeners.get(key, None)) is not None:
+            listeners.discard(character_id)
+            if not listeners:
+                del self.listeners[key]
+                del self.active[bisect.bisect_left(self.active, key)]
+
+    def add(self, key: int, character_id: uuid.UUID):
+        self.tuned.setdefault(character_id, set()).add(key)
+        if character_id in self.online:
+            self._listen(key, character_id)
+
+    def remove(self, key: int, character_id: uuid.UUID):
+        self._unlisten(key, character_id)
+        if (keys := self.tuned.get(character_id, None)) is not None:
+            keys.discard(key)
+            if not keys:
+                del self.tuned[character_id]
+
+    def login(self, character_id: uuid.UUID):
+        if character_id in self.online:
+            return
+        self.online.add(character_id)
+        for key in self.tuned.get(character_id, ()):
+            self._listen(key, character_id)
+
+    def logout(self, character_id: uuid.UUID):
+        if character_id not in self.online:
+            return
+        self.online.discard(character_id)
+        for key in self.tuned.get(character_id, ()):
+            self._unlisten(key, character_id)
+
+    def listening(self, key: int) -> set[uuid.UUID]:
+        return self.listeners.get(key, set())
+
+    def is_tuned(self, character_id: uuid.UUID, key: int) -> bool:
+        return key in self.tuned.get(character_id, ())
+
+    def frequencies_of(self, character_id: uuid.UUID) -> list[int]:
+        return sorted(self.tuned.get(character_id, set()))
+
+    def scan(self, low: int, high: int) -> list[tuple[int, set[uuid.UUID]]]:
+        """
+        Every frequency between low and high inclusive that has online listeners, with them.
+        """
+        start = bisect.bisect_left(self.active, low)
+        end = bisect.bisect_right(self.active, high)
+        return [(key, self.listeners[key]) for key in self.active[start:end]]
+
+    def on_notify(self, data):
+        if not self.loaded:
+            return
+        if not isinstance(data, dict) or "character_id" not in data:
+            self.invalidate()
+            return
+        character_id = uuid.UUID(data["character_id"])
+        if "online" in data:
+            if data["online"]:
+                self.login(character_id)
+            else:
+                self.logout(character_id)
+        elif data.get("listening", False):
+            self.add(to_key(Decimal(data["frequency"])), character_id)
+        else:
+            self.remove(to_key(Decimal(data["frequency"])), character_id)
+
+
+RADIO_INDEX = RadioIndex()
+
+listen.register("mush_radio", RADIO_INDEX.on_notify, on_lost=RADIO_INDEX.invalidate)
+
+
+async def tune(character: CharacterModel, frequency: Decimal, listening: bool = True):
+    await RADIO_INDEX.load()
+    await radio_db.set_tuned(frequency, character, listening)
+    # A character tuning through the API is online, whether or not its login was seen.
+    RADIO_INDEX.login(character.id)
+    if listening:
+        RADIO_INDEX.add(to_key(frequency), character.id)
+    else:
+        RADIO_INDEX.remove(to_key(frequency), character.id)
+
+
+async def transmit(character: CharacterModel, frequency: Decimal, message: str) -> int:
+    """
+    Send a message to every online character tuned to the frequency. Returns how many
+    were sent it.
+    """
+    await RADIO_INDEX.load()
+    listeners = RADIO_INDEX.listening(to_key(frequency))
+    event = ev_radio.RadioMessage(frequency=f"{frequency:.3f}", speaker=character.name, message=message)
+    fanout((character_id, event) for character_id in listeners)
+    return len(listeners)
+
+
+# Session hooks: mudforge calls these when a character logs in or out (see
+# [game.session_hooks] in the plugin config). Every process's index is updated through
+# mush_radio, this one's included.
+
+async def on_login(character: CharacterModel):
+    RADIO_INDEX.login(character.id)
+    await radio_db.publish_presence(character.id, True)
+
+
+async def on_logout(character: CharacterModel):
+    RADIO_INDEX.logout(character.id)
+    await radio_db.publish_presence(character.id, False)
@@ -0,0 +1,110 @@
+import asyncio
+
+from mudforge_mush.models.regions import RegionModel
+from mudforge_mush.models.rooms import RoomModel
+from mudforge_mush.db import regions as regions_db
+from mudforge_mush.db import listen
+
+
+class RegionTree:
+    """
+    An in-process mirror of region_closure for lock checks.
+
+    Each region maps to the frozenset of its ancestors, itself included, so asking whether
+    a region lies inside another is one dictionary lookup and one set membership test.
+    Moving a region rewrites the ancestor sets of its subtree only.
+    """
+
+    def __init__(self):
+        self.parents: dict[int, int | None] = dict()
+        self.children: dict[int, set[int]] = dict()
+        self.ancestors: dict[int, frozenset[int]] = dict()
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def load(self):
+        await listen.ensure_listening()
+        if self.loaded:
+            return
+        async with self.lock:
+            if self.loaded:
+                return
+            self.parents.clear()
+            self.children.clear()
+            self.ancestors.clear()
+            async for region in regions_db.list_regions():
+                self.parents[region.id] = region.parent_id
+                self.children.setdefault(region.id, set())
+            for region_id, parent_id in self.parents.items():
+                if parent_id is not None:
+                    self.children.setdefault(parent_id, set()).add(region_id)
+            for region_id, parent_id in self.parents.items():
+                if parent_id is None:
+                    self._rebuild(region_id)
+            self.loaded = True
+
+    def invalidate(self, *args):
+        self.loaded = False
+
+    def _rebuild(self, region_id: int):
+        # Recompute ancestor sets for a subtree, top down, without recursion.
+        parent_id = self.parents.get(region_id, None)
+        above = self.ancestors.get(parent_id, frozenset()) if parent_id is not None else frozenset()
+        pending = [(region_id, above)]
+        while pending:
+            current, above = pending.pop()
+            mine = self.ancestors[current] = above | {current}
+            pending.extend((child, mine) for child in self.children.get(current, ()))
+
+    def add(self, region_id: int, parent_id: int | None):
+        self.parents[region_id] = parent_id
+        self.children.setdefault(region_id, set())
+        self.ancestors[region_id] = self.ancestors.get(parent_id, frozenset()) | {region_id}
+        if parent_id is not None:
+            self.children.setdefault(parent_id, set()).add(region_id)
+
+    def move(self, region_id: int, parent_id: int | None):
+        if region_id not in self.parents:
+            self.add(region_id, parent_id)
+            return
+        if (old_parent := self.parents[region_id]) == parent_id:
+            return
+        if old_parent is not None:
+            self.children.get(old_parent, set()).discard(region_id)
+        if parent_id is not None:
+            self.children.setdefault(parent_id, set()).add(region_id)
+        self.parents[region_id] = parent_id
+        self._rebuild(region_id)
+
+    def remove(self, region_id: int):
+        # The database detaches the children (ON DELETE SET NULL); do the same here.
+        for child in list(self.children.pop(region_id, ())):
+            self.parents[child] = None
+            self._rebuild(child)
+        if (parent_id := self.parents.pop(region_id, None)) is not None:
+            self.children.get(parent_id, set()).discard(region_id)
+        self.ancestors.pop(region_id, None)
+
+    def contains(self, ancestor_id: int, region_id: int) -> bool:
+        """
+        Whether region_id is ancestor_id or lies anywhere beneath it.
+        """
+        return ancestor_id in self.ancestors.get(region_id, ())
+
+    def room_in(self, room: RoomModel, ancestor_id: int) -> bool:
+        return self.contains(ancestor_id, room.region_id)
+
+    def on_notify(self, data):
+        if not self.loaded:
+            return
+        if not isinstance(data, dict) or "region_id" not in data:
+            self.invalidate()
+        elif data.get("deleted", False):
+            self.remove(data["region_id"])
+        else:
+            self.move(data["region_id"], data.get("parent_id", None))
+
+
+REGION_TREE = RegionTree()
+
+listen.register("mush_regions", REGION_TREE.on_notify, on_lost=REGION_TREE.invalidate)
@@ -0,0 +1,157 @@
+import asyncio
+from array import array
+from collections import deque
+
+from mudforge_mush.models.rooms import RoomModel, ExitModel, RoomPath
+from mudforge_mush.db import rooms as rooms_db
+from mudforge_mush.db.cache import TTLCache
+from mudforge_mush.db import listen
+
+
+class RoomGraph:
+    """
+    The room/exit graph held in memory.
+
+    Rooms are numbered with dense integer indices. Each room's exits are parallel
+    arrays of destination indices and exit ids, so traversal touches no dictionaries.
+    Exits are added and removed incrementally; shortest paths are memoized until the
+    next exit change. Changes made by any process arrive on the mush_rooms feed; an
+    edited room is re-read the next time it is asked for.
+    """
+
+    def __init__(self):
+        self.index: dict[int, int] = dict()
+        self.rooms: list[RoomModel] = list()
+        self.destinations: list[array] = list()
+        self.exit_ids: list[array] = list()
+        self.exits: dict[int, ExitModel] = dict()
+        self.stale: set[int] = set()
+        self.paths = TTLCache(max_size=4096, ttl=float("inf"))
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    async def load(self):
+        await listen.ensure_listening()
+        if self.loaded:
+            return
+        async with self.lock:
+            if self.loaded:
+                return
+            self.index.clear()
+            self.rooms.clear()
+            self.destinations.clear()
+            self.exit_ids.clear()
+            self.exits.clear()
+            self.stale.clear()
+            self.paths.clear()
+            async for room in rooms_db.list_rooms():
+                self.add_room(room)
+            async for exit_model in rooms_db.list_exits():
+                self.add_exit(exit_model)
+            self.loaded = True
+
+    def add_room(self, room: RoomModel) -> int:
+        if (idx := self.index.get(room.id, None)) is not None:
+            self.rooms[idx] = room
+            return idx
+        idx = self.index[room.id] = len(self.rooms)
+        self.rooms.append(room)
+        self.destinations.append(array("i"))
+        self.exit_ids.append(array("i"))
+        return idx
+
+    async def room(self, room_id: int) -> RoomModel:
+        await self.load()
+        if (idx := self.index.get(room_id, None)) is None or room_id in self.stale:
+            # Rooms created or edited since the graph loaded are read on demand.
+            self.stale.discard(room_id)
+            idx = self.add_room(await rooms_db.get_room(room_id))
+        return self.rooms[idx]
+
+    def invalidate(self, *args):
+        self.loaded = False
+
+    def add_exit(self, exit_model: ExitModel):
+        # Re-adding an exit replaces it, so a local change and its notification agree.
+        self.remove_exit(exit_model.id)
+        idx = self.index[exit_model.room_id]
+        self.destinations[idx].append(self.index[exit_model.destination_id])
+        self.exit_ids[idx].append(exit_model.id)
+        self.exits[exit_model.id] = exit_model
+        self.paths.clear()
+
+    def remove_exit(self, exit_id: int):
+        if (exit_model := self.exits.pop(exit_id, None)) is None:
+            return
+        idx = self.index[exit_model.room_id]
+        position = self.exit_ids[idx].index(exit_id)
+        del self.exit_ids[idx][position]
+        del self.destinations[idx][position]
+        self.paths.clear()
+
+    def on_notify(self, data):
+        if not self.loaded:
+            return
+        if not isinstance(data, dict):
+            self.invalidate()
+        elif "exit_id" in data:
+            if data.get("deleted", False):
+                self.remove_exit(data["exit_id"])
+            elif data["room_id"] in self.index and data["destination_id"] in self.index:
+                self.add_exit(ExitModel(id=data["exit_id"], room_id=data["room_id"],
+                                        destination_id=data["destination_id"], name=data["name"]))
+            else:
+                self.invalidate()
+        elif data.get("room_id", None) in self.index:
+            # A deleted room's exits are deleted with it and arrive separately; reading
+            # it again gives callers a 404.
+            self.stale.add(data["room_id"])
+
+    def exits_of(self, room_id: int) -> list[ExitModel]:
+        if (idx := self.index.get(room_id, None)) is None:
+            return list()
+        return [self.exits[exit_id] for exit_id in self.exit_ids[idx]]
+
+    def path(self, start_id: int, end_id: int) -> RoomPath | None:
+        """
+        The shortest path by exit count between two rooms, or None if there is none.
+        """
+        key = (start_id, end_id)
+        if (found := self.paths.get(key, False)) is not False:
+            return found
+        found = self._search(self.index[start_id], self.index[end_id])
+        self.paths.set(key, found)
+        return found
+
+    def _search(self, start: int, end: int) -> RoomPath | None:
+        # Breadth-first search; previous[n] holds (room index, exit id) we arrived from.
+        previous: dict[int, tuple[int, int]] = {start: (-1, -1)}
+        queue = deque([start])
+        while queue:
+            current = queue.popleft()
+            if current == end:
+                break
+            for destination, exit_id in zip(self.destinations[current], self.exit_ids[current]):
+                if destination not in previous:
+                    previous[destination] = (current, exit_id)
+                    queue.append(destination)
+        else:
+            if end not in previous:
+                return None
+
+        rooms = list()
+        exits = list()
+        current = end
+        while current != start:
+            rooms.append(self.rooms[current].id)
+            current, exit_id = previous[current]
+            exits.append(self.exits[exit_id].name)
+        rooms.append(self.rooms[start].id)
+        rooms.reverse()
+        exits.reverse()
+        return RoomPath(rooms=rooms, exits=exits)
+
+
+ROOM_GRAPH = RoomGraph()
+
+listen.register("mush_rooms", ROOM_GRAPH.on_notify, on_lost=ROOM_GRAPH.invalidate)
@@ -0,0 +1,106 @@
+import asyncio
+import logging
+import typing
+
+from asyncpg import Connection
+
+from mudforge.db.base import from_pool
+
+logger = logging.getLogger(__name__)
+
+
+@from_pool
+async def copy_records(conn: Connection, table: str, columns: typing.Sequence[str], records: list[tuple]) -> int:
+    await conn.copy_records_to_table(table, records=records, columns=columns)
+    return len(records)
+
+
+class BatchWriter:
+    """
+    Buffers rows in memory and persists them with COPY, either every flush_interval
+    seconds or as soon as max_batch rows are waiting, instead of one INSERT per row.
+
+    The flush task starts on the first append. Rows that fail to write are kept and
+    retried on the next flush, up to max_pending rows; beyond that the oldest are dropped.
+    Call close() at shutdown so rows still buffered are written before the process exits.
+
+    on_written, if given, is awaited with each batch once it has been written.
+    """
+
+    def __init__(self, table: str, columns: typing.Sequence[str], flush_interval: float = 1.0,
+                 max_batch: int = 500, max_pending: int = 50000,
+                 on_written: typing.Callable[[list[tuple]], typing.Awaitable[None]] | None = None):
+        self.table = table
+        self.columns = tuple(columns)
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.on_written = on_written
+        self.pending: list[tuple] = list()
+        self.written = 0
+        self.dropped = 0
+        self.task: asyncio.Task | None = None
+        self.wake = asyncio.Event()
+        self.flushing = asyncio.Lock()
+
+    def append(self, record: tuple):
+        self.pending.append(record)
+        if len(self.pending) >= self.max_batch:
+            self.wake.set()
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def flush(self):
+        """
+        Write everything pending. Waits for a flush already in progress, so once this
+        returns every row appended before the call has been attempted.
+        """
+        async with self.flushing:
+            if not self.pending:
+                return
+            records, self.pending = self.pending, list()
+            try:
+                self.written += await copy_records(self.table, self.columns, records)
+            except asyncio.CancelledError:
+                self.pending[:0] = records
+                raise
+            except Exception:
+                logger.exception("Could not write %d rows to %s; will retry.", len(records), self.table)
+                self.pending[:0] = records
+                if (excess := len(self.pending) - self.max_pending) > 0:
+                    del self.pending[:excess]
+                    self.dropped += excess
+                    logger.error("Dropped %d unwritten rows for %s.", excess, self.table)
+                return
+        if self.on_written is not None:
+            try:
+                await self.on_written(records)
+            except Exception:
+                logger.exception("on_written failed for %d rows of %s.", len(records), self.table)
+
+    async def run(self):
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self.wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self.wake.clear()
+                await self.flush()
+        except asyncio.CancelledError:
+            # Cancelled by close() or by the event loop shutting down; write what is left.
+            await self.flush()
+            raise
+
+    async def close(self):
+        """
+        Stop the flush task and write everything still pending.
+        """
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+        await self.flush()
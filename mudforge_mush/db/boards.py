@@ -1,6 +1,10 @@
 import mudforge
 import typing
+import asyncio
+import logging
 from typing import Optional
+from rich.color import ColorSystem
+from rich.console import Console
 from rich.markup import MarkupError
 from rich.text import Text
 from asyncpg import Connection, exceptions
@@ -11,123 +15,529 @@ from mudforge.models.users import UserModel
 from mudforge.models.characters import CharacterModel
 from mudforge.models import validators, fields
 
-from mudforge_mush.models.boards import BoardModel, BoardPostModel, BoardModelPatch, BoardPostModelPatch
+from mudforge_mush.models.boards import (BoardModel, BoardPostModel, BoardModelPatch, BoardPostModelPatch,
+                                         BoardSearchResult, BoardArchivedPostModel, BoardPostSummary,
+                                         BoardPostDetail, BoardArchivedPostDetail)
 from mudforge_mush.models.factions import FactionModel
+from mudforge_mush.db.utils import build_update
+from mudforge_mush.db import listen
+from mudforge_mush.db.identity import identity_mapped
+from mudforge_mush.db.queries import declare, NamedQuery
+from mudforge_mush.db.trusted import trusted
 
+logger = logging.getLogger(__name__)
 
-@from_pool
-async def get_board_by_key(pool: Connection, board_key: str) -> BoardModel:
-    query = "SELECT * FROM board_view WHERE board_key = $1 AND deleted_at IS NULL"
-    board_data = await pool.fetchrow(query, board_key)
-    if not board_data:
+# Posts read back for display skip revalidation; see RowLoader. Boards are still validated,
+# since the catalog builds them once per invalidation and their locks drive access checks.
+post_from_row = trusted(BoardPostModel)
+post_detail_from_row = trusted(BoardPostDetail)
+archived_post_from_row = trusted(BoardArchivedPostModel)
+archived_detail_from_row = trusted(BoardArchivedPostDetail)
+search_result_from_row = trusted(BoardSearchResult)
+summary_from_row = trusted(BoardPostSummary)
+
+
+@identity_mapped("board", lambda board_key: board_key)
+async def get_board_by_key(board_key: str) -> BoardModel:
+    if (board := await BOARD_CATALOG.get(board_key)) is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Board not found.")
-    return BoardModel(**board_data)
+    return board
+
+LIST_BOARDS = declare("boards.list_boards", "SELECT * FROM board_view WHERE deleted_at IS NULL")
 
 @stream
 async def list_boards(conn: Connection) -> typing.AsyncGenerator[BoardModel, None]:
-    query = "SELECT * FROM board_view WHERE deleted_at IS NULL"
-    async for board_data in conn.cursor(query):
+    async for board_data in LIST_BOARDS.cursor(conn):
         yield BoardModel(**board_data)
 
+# One statement, so the version and the boards come from the same snapshot. The join
+# always yields the version row, even when there are no boards.
+LOAD_CATALOG = declare(
+    "boards.load_catalog",
+    "SELECT v.version AS catalog_version, b.* FROM board_catalog_version v "
+    "LEFT JOIN board_view b ON b.deleted_at IS NULL")
+
+@from_pool
+async def load_catalog(conn: Connection) -> tuple[int, dict[str, BoardModel]]:
+    rows = await LOAD_CATALOG.fetch(conn)
+    boards = {row["board_key"]: BoardModel(**row) for row in rows if row["id"] is not None}
+    return rows[0]["catalog_version"], boards
+
+
+class BoardCatalog:
+    """
+    An in-process copy of every live board, keyed by board_key.
+
+    The version is board_catalog_version from the database, bumped by the boards and
+    factions triggers in the same transaction as the change, so every process means the
+    same catalog by the same version and clients can revalidate against any of them.
+    """
+
+    def __init__(self):
+        self.version = 0
+        self.boards: dict[str, BoardModel] | None = None
+        # Counts local invalidations, to spot one that happens during a load.
+        self.generation = 0
+        self.lock = asyncio.Lock()
+
+    def invalidate(self, *args):
+        self.generation += 1
+        self.boards = None
+
+    def on_notify(self, data):
+        # A change this process already loaded, such as its own write, needs no reload.
+        if isinstance(data, dict) and self.boards is not None and data.get("version", 0) <= self.version:
+            return
+        self.invalidate()
+
+    async def load(self) -> tuple[int, dict[str, BoardModel]]:
+        await listen.ensure_listening()
+        if (boards := self.boards) is not None:
+            return self.version, boards
+        async with self.lock:
+            if (boards := self.boards) is not None:
+                return self.version, boards
+            generation = self.generation
+            version, boards = await load_catalog()
+            # Don't keep a catalog that was invalidated while it loaded.
+            if generation == self.generation:
+                self.version, self.boards = version, boards
+            return version, boards
+
+    async def get(self, board_key: str) -> BoardModel | None:
+        version, boards = await self.load()
+        return boards.get(board_key, None)
+
+
+BOARD_CATALOG = BoardCatalog()
+
+
+listen.register("mush_boards", BOARD_CATALOG.on_notify, on_lost=BOARD_CATALOG.invalidate)
+
+
+LIST_POSTS_FOR_BOARD = declare(
+    "boards.list_posts_for_board",
+    "SELECT * FROM board_post_view_full WHERE board_id = $1 AND deleted_at IS NULL "
+    "AND (post_order, sub_order) > ($2, $3) ORDER BY post_order,sub_order LIMIT $4")
 
 @stream
-async def list_posts_for_board(conn: Connection, board: BoardModel) -> typing.AsyncGenerator[BoardPostModel, None]:
-    query = "SELECT * FROM board_post_view_full WHERE board_key = $1 ORDER BY post_order,sub_order"
-    async for post_data in conn.cursor(query, board.board_key):
-        yield BoardPostModel(**post_data)
+async def list_posts_for_board(conn: Connection, board: BoardModel, after: tuple[int, int] | None = None,
+                               limit: int | None = None) -> typing.AsyncGenerator[BoardPostModel, None]:
+    """
+    Stream a board's live posts in (post_order, sub_order) order, optionally starting
+    after a keyset position. This walks the unique_post_order index, so a deep page
+    costs the same as the first.
+    """
+    post_order, sub_order = after if after else (0, -1)
+    async for post_data in LIST_POSTS_FOR_BOARD.cursor(conn, board.id, post_order, sub_order, limit):
+        yield post_from_row(post_data)
+
+# Selects only what a listing shows, straight from the tables, so the board_posts side is
+# answered from unique_post_order's included columns without reading post bodies.
+LIST_POST_SUMMARIES = declare(
+    "boards.list_post_summaries",
+    "SELECT p.id, p.post_order, p.sub_order, "
+    "CASE WHEN p.sub_order = 0 THEN p.post_order::text ELSE p.post_order::text || '.' || p.sub_order::text END "
+    "AS post_key, p.title, p.created_at, p.updated_at, s.character_id, c.name AS character_name, s.spoofed_name "
+    "FROM board_posts p JOIN character_spoofs s ON s.id = p.spoof_id LEFT JOIN characters c ON c.id = s.character_id "
+    "WHERE p.board_id = $1 AND p.deleted_at IS NULL AND (p.post_order, p.sub_order) > ($2, $3) "
+    "ORDER BY p.post_order, p.sub_order LIMIT $4")
+
+@stream
+async def list_post_summaries(conn: Connection, board: BoardModel, after: tuple[int, int] | None = None,
+                              limit: int | None = None) -> typing.AsyncGenerator[BoardPostSummary, None]:
+    """
+    Like list_posts_for_board, but without bodies.
+    """
+    post_order, sub_order = after if after else (0, -1)
+    async for post_data in LIST_POST_SUMMARIES.cursor(conn, board.id, post_order, sub_order, limit):
+        yield summary_from_row(post_data)
+
+INSERT_BOARD = declare("boards.insert_board",
+                       "INSERT INTO boards (faction_id, board_order, name) VALUES ($1, $2, $3) RETURNING *")
+GET_BOARD_VIEW = declare("boards.get_board_view", "SELECT * FROM board_view WHERE id = $1")
 
 @transaction
 async def create_board(conn: Connection, faction: FactionModel | None, board_order: int, board_name: str) -> BoardModel:
     faction_id = faction.id if faction else None
     try:
-        board_row = await conn.fetchrow("INSERT INTO boards (faction_id, board_order, name) VALUES ($1, $2, $3) RETURNING *", faction_id, board_order, board_name)
+        board_row = await INSERT_BOARD.fetchrow(conn, faction_id, board_order, board_name)
     except exceptions.UniqueViolationError as e:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Board using that Faction and Order already exists.")
-    board_row = await conn.fetchrow("SELECT * FROM board_view WHERE id = $1", board_row["id"])
+    board_row = await GET_BOARD_VIEW.fetchrow(conn, board_row["id"])
+    BOARD_CATALOG.invalidate()
     return BoardModel(**board_row)
 
+# Bump when render_body's output changes; posts rendered by an older version are
+# re-rendered when next read.
+RENDER_VERSION = 2
+# Rendered at full colour depth. The portal turns the ANSI back into Text and sends it
+# with send_rich, which reduces it to each client's own colour system.
+RENDER_COLORS = ColorSystem.TRUECOLOR
+_RENDER_CONSOLE = Console(color_system="truecolor", force_terminal=True)
+
+def render_body(body: str, strict: bool = True) -> tuple[str, str]:
+    """
+    Render a post body's markup once, returning it as ANSI text and as plain text with
+    the markup removed. Invalid markup is rejected when strict, or else shown
+    literally, as for bodies written before rendering.
+    """
+    try:
+        text = Text.from_markup(body)
+    except MarkupError as e:
+        if strict:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid markup: {e}")
+        text = Text(body)
+    ansi = "".join(span.style.render(span.text, color_system=RENDER_COLORS) if span.style else span.text
+                   for span in text.render(_RENDER_CONSOLE, end=""))
+    return ansi, text.plain
+
+SAVE_RENDER = declare(
+    "boards.save_render",
+    "UPDATE board_posts SET body_ansi = $2, body_plain = $3, render_version = $4 WHERE id = $1 AND render_version < $4")
+SAVE_ARCHIVED_RENDER = declare(
+    "boards.save_archived_render",
+    "UPDATE board_posts_archive SET body_ansi = $2, body_plain = $3, render_version = $4 "
+    "WHERE id = $1 AND render_version < $4")
+
+async def ensure_rendered(conn: Connection, post: BoardPostDetail | BoardArchivedPostDetail,
+                          save: NamedQuery = SAVE_RENDER) -> BoardPostDetail | BoardArchivedPostDetail:
+    """
+    Bring a post's stored render up to RENDER_VERSION, rendering and saving it now if it
+    is stale. Archived posts are saved back to the archive with SAVE_ARCHIVED_RENDER.
+    """
+    if post.render_version >= RENDER_VERSION:
+        return post
+    post.body_ansi, plain = render_body(post.body, strict=False)
+    post.render_version = RENDER_VERSION
+    await save.execute(conn, post.id, post.body_ansi, plain, RENDER_VERSION)
+    return post
+
+GET_POST_BY_KEY = declare("boards.get_post_by_key",
+                          "SELECT v.*, p.body_ansi, p.render_version FROM board_post_view_full v "
+                          "JOIN board_posts p ON p.id = v.id "
+                          "WHERE v.board_key = $1 AND v.post_key = $2 AND ($3 OR v.deleted_at IS NULL)")
+
 @from_pool
-async def get_post_by_key(conn: Connection, board: BoardModel, post_key: str) -> BoardPostModel:
-    query = "SELECT * FROM board_post_view_full WHERE board_key = $1 AND post_key = $2"
-    post_data = await conn.fetchrow(query, board.board_key, post_key)
+async def get_post_by_key(conn: Connection, board: BoardModel, post_key: str, deleted: bool = False) -> BoardPostDetail:
+    """
+    A live post by key. Soft-deleted posts, which stay in board_posts until the archiver
+    moves them, are included only if deleted is True.
+    """
+    post_data = await GET_POST_BY_KEY.fetchrow(conn, board.board_key, post_key, deleted)
     if not post_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found.")
-    return BoardPostModel(**post_data)
+    return await ensure_rendered(conn, post_detail_from_row(post_data))
 
-@transaction
-async def create_post(conn: Connection, board: BoardModel, post, user: UserModel) -> BoardPostModel:
-    max_order = await conn.fetchval("SELECT MAX(post_order) FROM board_posts WHERE board_id = $1", board.id)
-    post_data = await conn.fetchrow("INSERT INTO board_posts (board_id, title, body, post_order, sub_order, user_id) VALUES ($1, $2, $3, $4, $5, $6) RETURNING *", board.id, post.title, post.body, max_order + 1, 0, post.user_id)
-    read = await conn.fetchrow("INSERT INTO board_posts_read (post_id, user_id) VALUES ($1, $2) RETURNING *", post_data["id"], user.id)
-    post_data = await conn.fetchrow("SELECT * FROM board_post_view WHERE id = $1", post_data["id"])
-    return BoardPostModel(**post_data)
+ALLOCATE_POST_NUMBER = declare(
+    "boards.allocate_post_number",
+    "INSERT INTO board_post_counters (board_id, post_order, last_value) VALUES ($1, $2, 1) "
+    "ON CONFLICT (board_id, post_order) DO UPDATE SET last_value = board_post_counters.last_value + 1 "
+    "RETURNING last_value")
+
+@from_pool
+async def allocate_post_number(conn: Connection, board: BoardModel, post_order: int = 0) -> int:
+    """
+    Atomically allocate the next post number for a board (post_order 0) or the next
+    reply number within a thread. This runs outside the posting transaction, so the
+    counter row is locked only for the duration of this single statement; a failed
+    post simply leaves a gap.
+    """
+    return await ALLOCATE_POST_NUMBER.fetchval(conn, board.id, post_order)
+
+# Excerpts come from the stored plain text, so they show no markup, and are only built
+# for the page of results returned. Posts not yet rendered fall back to their body.
+SEARCH_POSTS = declare(
+    "boards.search_posts",
+    "SELECT r.*, ts_headline('english', COALESCE(p.body_plain, r.body), websearch_to_tsquery('english', $1), "
+    "'MaxWords=30, MinWords=10, StartSel=*, StopSel=*') AS excerpt FROM ("
+    "SELECT v.*, ts_rank_cd(p.search_vector, q) AS rank "
+    "FROM board_posts p JOIN board_post_view_full v ON v.id = p.id, websearch_to_tsquery('english', $1) q "
+    "WHERE p.search_vector @@ q AND p.deleted_at IS NULL AND p.board_id = ANY($2::int[]) "
+    "ORDER BY rank DESC, p.id DESC LIMIT $3 OFFSET $4) r JOIN board_posts p ON p.id = r.id "
+    "ORDER BY r.rank DESC, r.id DESC")
+
+@from_pool
+async def search_posts(conn: Connection, terms: str, board_ids: typing.Iterable[int], limit: int, offset: int = 0) -> list[BoardSearchResult]:
+    """
+    Ranked full-text search over live posts, restricted to the given boards.
+    """
+    board_ids = list(board_ids)
+    if not board_ids:
+        return list()
+    return [search_result_from_row(row) for row in await SEARCH_POSTS.fetch(conn, terms, board_ids, limit, offset)]
+
+# Posts are attributed to a character spoof; a character posting as themselves uses the
+# spoof carrying their own name, created on first use.
+GET_OWN_SPOOF = declare(
+    "boards.get_own_spoof",
+    "INSERT INTO character_spoofs (character_id, spoofed_name) VALUES ($1, $2) "
+    "ON CONFLICT (character_id, spoofed_name) DO UPDATE SET updated_at = character_spoofs.updated_at "
+    "RETURNING id")
+
+async def own_spoof_id(conn: Connection, character: CharacterModel) -> int:
+    """
+    The character_spoofs row for a character posting under their own name. board_posts
+    records the poster only through spoof_id; it has no user or character column.
+    """
+    return await GET_OWN_SPOOF.fetchval(conn, character.id, character.name)
+
+INSERT_POST = declare(
+    "boards.insert_post",
+    "INSERT INTO board_posts (board_id, title, body, post_order, sub_order, spoof_id, body_ansi, body_plain, "
+    "render_version) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9) RETURNING *")
+INSERT_POST_READ = declare("boards.insert_post_read",
+                           "INSERT INTO board_posts_read (post_id, user_id) VALUES ($1, $2) RETURNING *")
+GET_POST_VIEW = declare("boards.get_post_view", "SELECT * FROM board_post_view_full WHERE id = $1")
+# Held until a reply commits, so the archiver can't move the thread from under it.
+LOCK_THREAD = declare(
+    "boards.lock_thread",
+    "SELECT id FROM board_posts WHERE board_id = $1 AND post_order = $2 AND sub_order = 0 AND deleted_at IS NULL "
+    "FOR SHARE")
 
 @transaction
-async def create_reply(conn: Connection, board: BoardModel, post: BoardPostModel, reply, user: UserModel) -> BoardPostModel:
-    sub_order = await conn.fetchval("SELECT MAX(sub_order) FROM board_posts WHERE board_id = $1 AND post_order = $2", board.id, post.post_order)
-    post_data = await conn.fetchrow("INSERT INTO board_posts (board_id, title, body, post_order, sub_order, user_id) VALUES ($1, $2, $3, $4, $5, $6) RETURNING *", board.id, f"RE: {post.title}", reply.body, post.post_order, sub_order + 1, user.id)
-    read = await conn.fetchrow("INSERT INTO board_posts_read (post_id, user_id) VALUES ($1, $2) RETURNING *", post_data["id"], user.id)
-    post_data = await conn.fetchrow("SELECT * FROM board_post_view WHERE id = $1", post_data["id"])
+async def _insert_post(conn: Connection, board: BoardModel, title: str, body: str, rendered: tuple[str, str],
+                       post_order: int, sub_order: int, character: CharacterModel, user: UserModel) -> BoardPostModel:
+    if sub_order and await LOCK_THREAD.fetchval(conn, board.id, post_order) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found.")
+    spoof_id = await own_spoof_id(conn, character)
+    post_data = await INSERT_POST.fetchrow(conn, board.id, title, body, post_order, sub_order, spoof_id, *rendered,
+                                           RENDER_VERSION)
+    read = await INSERT_POST_READ.fetchrow(conn, post_data["id"], user.id)
+    post_data = await GET_POST_VIEW.fetchrow(conn, post_data["id"])
     return BoardPostModel(**post_data)
 
+# Bodies are rendered before a post number is allocated, so rejected markup leaves no gap.
+async def create_post(board: BoardModel, post, character: CharacterModel, user: UserModel) -> BoardPostModel:
+    rendered = render_body(post.body)
+    post_order = await allocate_post_number(board)
+    return await _insert_post(board, post.title, post.body, rendered, post_order, 0, character, user)
 
-@transaction
+async def create_reply(board: BoardModel, post: BoardPostModel, reply, character: CharacterModel, user: UserModel) -> BoardPostModel:
+    rendered = render_body(reply.body)
+    sub_order = await allocate_post_number(board, post.post_order)
+    return await _insert_post(board, f"RE: {post.title}", reply.body, rendered, post.post_order, sub_order,
+                              character, user)
+
+
+def board_view_over(update: str) -> str:
+    """
+    Wrap an UPDATE ... RETURNING * on boards so the statement yields board_view's columns directly.
+    """
+    return (f"WITH b AS ({update}) "
+            "SELECT b.*, CONCAT(COALESCE(f.abbreviation, ''), b.board_order::text) AS board_key, "
+            "f.name AS faction_name, f.abbreviation AS faction_abbreviation "
+            "FROM b LEFT JOIN factions f ON b.faction_id = f.id")
+
+def post_view_over(update: str) -> str:
+    """
+    Wrap an UPDATE ... RETURNING * on board_posts so the statement yields board_post_view_full's columns directly.
+    """
+    return (f"WITH p AS ({update}) "
+            "SELECT p.*, "
+            "CASE WHEN p.sub_order = 0 THEN p.post_order::text ELSE p.post_order::text || '.' || p.sub_order::text END AS post_key, "
+            "s.id AS character_id, s.name AS character_name, s.spoofed_name, s.user_id AS user_id, "
+            "b.board_key, b.name AS board_name, b.faction_id, b.faction_name, b.faction_abbreviation, b.anonymous_name "
+            "FROM p LEFT JOIN character_spoofs_view s ON s.spoof_id = p.spoof_id "
+            "LEFT JOIN board_view b ON p.board_id = b.id")
+
+# PATCH statements are built per request from the fields sent, so only their stats are named.
+UPDATE_BOARD = declare("boards.update_board", None)
+DELETE_BOARD = declare("boards.delete_board", None)
+UPDATE_POST = declare("boards.update_post", None)
+DELETE_POST = declare("boards.delete_post", None)
+
+# Patch field -> column whitelists for build_update.
+BOARD_PATCH_COLUMNS = {
+    "name": "name",
+    "description": "description",
+    "anonymous_name": "anonymous_name",
+    "board_order": "board_order",
+    "locks": "locks",
+    "retention_days": "retention_days",
+}
+
+POST_PATCH_COLUMNS = {
+    "title": "title",
+    "body": "body",
+    # Set alongside body, never from the patch itself.
+    "body_ansi": "body_ansi",
+    "body_plain": "body_plain",
+    "render_version": "render_version",
+}
+
+@from_pool
 async def update_board(conn: Connection, board: BoardModel, patch: BoardModelPatch) -> BoardModel:
     patch_data = patch.model_dump(exclude_unset=True)
     if not patch_data:
         return board # Nothing to update
 
-    if "name" in patch_data:
-        await conn.execute("UPDATE boards SET name=$1 WHERE board_id=$2", patch.name, board.id)
-
-    if "description" in patch_data:
-        await conn.execute("UPDATE boards SET description=$1 WHERE board_id=$2", patch.description, board.id)
-    
-    if "anonymous_name" in patch_data:
-        await conn.execute("UPDATE boards SET anonymous_name=$1 WHERE board_id=$2", patch.anonymous_name, board.id)
-    
-    if "board_order" in patch_data:
-        try:
-            await conn.execute("UPDATE boards SET board_order=$1 WHERE board_id=$2", patch.board_order, board.id)
-        except exceptions.UniqueViolationError as e:
-            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Board using that Faction and Order already exists.")
-    
-    if "lock_data" in patch_data:
-        if patch.lock_data is not None:
-            await conn.execute("UPDATE boards SET lock_data=$1 WHERE board_id=$2", patch.lock_data, board.id)
-        else:
-            await conn.execute("UPDATE boards SET lock_data=json_object() WHERE board_id=$1", board.id)
-    
-    # Update the updated_at timestamp
-    await conn.execute("UPDATE boards SET updated_at=now() WHERE board_id=$1", board.id)
-    return board
+    if "locks" in patch_data and patch_data["locks"] is None:
+        patch_data["locks"] = dict()
 
-@transaction
+    update, args = build_update("boards", patch_data, BOARD_PATCH_COLUMNS, "id", board.id)
+    try:
+        board_data = await UPDATE_BOARD.fetchrow(conn, *args, sql=board_view_over(update))
+    except exceptions.UniqueViolationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Board using that Faction and Order already exists.")
+    BOARD_CATALOG.invalidate()
+    return BoardModel(**board_data)
+
+@from_pool
 async def delete_board(conn: Connection, board: BoardModel) -> BoardModel:
-    await conn.execute("UPDATE boards SET deleted_at=now() WHERE board_id=$1", board.id)
-    board_data = await conn.fetchrow("SELECT * FROM board_view WHERE board_id = $1", board.id)
+    update, args = build_update("boards", dict(), BOARD_PATCH_COLUMNS, "id", board.id, touch="deleted_at")
+    board_data = await DELETE_BOARD.fetchrow(conn, *args, sql=board_view_over(update))
+    BOARD_CATALOG.invalidate()
     return BoardModel(**board_data)
 
 
-@transaction
+@from_pool
 async def delete_post(conn: Connection, post: BoardPostModel) -> BoardPostModel:
-    await conn.execute("UPDATE board_posts SET deleted_at=now() WHERE post_id=$1", post.id)
-    post_data = await conn.fetchrow("SELECT * FROM board_post_view WHERE id = $1", post.id)
+    update, args = build_update("board_posts", dict(), POST_PATCH_COLUMNS, "id", post.id, touch="deleted_at")
+    post_data = await DELETE_POST.fetchrow(conn, *args, sql=post_view_over(update))
     return BoardPostModel(**post_data)
 
-@transaction
+@from_pool
 async def update_post(conn: Connection, post: BoardPostModel, patch: BoardPostModelPatch) -> BoardPostModel:
     patch_data = patch.model_dump(exclude_unset=True)
     if not patch_data:
         return post
 
-    if "title" in patch_data:
-        await conn.execute("UPDATE board_posts SET title=$1 WHERE post_id=$2", patch.title, patch.id)
+    if patch_data.get("body") is not None:
+        patch_data["body_ansi"], patch_data["body_plain"] = render_body(patch_data["body"])
+        patch_data["render_version"] = RENDER_VERSION
+    update, args = build_update("board_posts", patch_data, POST_PATCH_COLUMNS, "id", post.id)
+    post_data = await UPDATE_POST.fetchrow(conn, *args, sql=post_view_over(update))
+    return BoardPostModel(**post_data)
+
+
+# Archival. Posts leave board_posts by moving, id and all, into board_posts_archive; each
+# statement takes at most $1 rows and skips rows another archiver already has locked.
+_ARCHIVE_COLUMNS = ("id, board_id, post_order, sub_order, spoof_id, title, body, created_at, updated_at, deleted_at, "
+                    "body_ansi, body_plain, render_version")
+
+ARCHIVE_DELETED = declare(
+    "boards.archive_deleted",
+    "WITH picked AS (SELECT id FROM board_posts WHERE deleted_at IS NOT NULL ORDER BY id LIMIT $1 "
+    "FOR UPDATE SKIP LOCKED), "
+    f"moved AS (DELETE FROM board_posts WHERE id IN (SELECT id FROM picked) RETURNING {_ARCHIVE_COLUMNS}), "
+    f"archived AS (INSERT INTO board_posts_archive ({_ARCHIVE_COLUMNS}, archive_reason) "
+    "SELECT *, 'deleted' FROM moved RETURNING id) "
+    "SELECT COUNT(*) FROM archived")
 
-    if "body" in patch_data:
-        await conn.execute("UPDATE board_posts SET body=$1 WHERE post_id=$2", patch.body, patch.id)
+# A thread expires as a whole, once even its newest post is older than the board's retention.
+ARCHIVE_EXPIRED = declare(
+    "boards.archive_expired",
+    "WITH picked AS (SELECT p.id FROM board_posts p JOIN boards b ON b.id = p.board_id "
+    "WHERE b.retention_days IS NOT NULL AND p.deleted_at IS NULL "
+    "AND NOT EXISTS (SELECT 1 FROM board_posts r WHERE r.board_id = p.board_id AND r.post_order = p.post_order "
+    "AND r.created_at > now() - make_interval(days => b.retention_days)) "
+    "ORDER BY p.id LIMIT $1 FOR UPDATE OF p SKIP LOCKED), "
+    f"moved AS (DELETE FROM board_posts WHERE id IN (SELECT id FROM picked) RETURNING {_ARCHIVE_COLUMNS}), "
+    f"archived AS (INSERT INTO board_posts_archive ({_ARCHIVE_COLUMNS}, archive_reason) "
+    "SELECT *, 'retention' FROM moved RETURNING id) "
+    "SELECT COUNT(*) FROM archived")
 
-    # Update the updated_at timestamp
-    await conn.execute("UPDATE board_posts SET updated_at=now() WHERE post_id=$1", patch.id)
-    post_data = await conn.fetchrow("SELECT * FROM board_post_view WHERE id = $1", patch.id)
-    return BoardPostModel(**post_data)
\ No newline at end of file
+@from_pool
+async def archive_deleted(conn: Connection, limit: int) -> int:
+    return await ARCHIVE_DELETED.fetchval(conn, limit)
+
+@from_pool
+async def archive_expired(conn: Connection, limit: int) -> int:
+    return await ARCHIVE_EXPIRED.fetchval(conn, limit)
+
+
+class BoardArchiver:
+    """
+    Periodically moves soft-deleted posts, and threads past their board's retention_days,
+    into board_posts_archive. Work is done in batches of batch_size rows, each its own
+    short transaction, so live posting never waits long on the archiver.
+
+    The boards router starts it at application startup and stops it at shutdown. Running
+    it in several processes is safe; they skip each other's rows.
+    """
+
+    def __init__(self, interval: float = 300.0, batch_size: int = 1000):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.archived = {"deleted": 0, "retention": 0}
+        self.task: asyncio.Task | None = None
+
+    def ensure_running(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None and not self.task.done():
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        self.task = None
+
+    async def run_once(self) -> int:
+        """
+        Archive everything currently due. Returns the number of posts moved.
+        """
+        moved = 0
+        for reason, archive in (("deleted", archive_deleted), ("retention", archive_expired)):
+            while True:
+                count = await archive(self.batch_size)
+                self.archived[reason] += count
+                moved += count
+                if count < self.batch_size:
+                    break
+        return moved
+
+    async def run(self):
+        while True:
+            try:
+                if (moved := await self.run_once()):
+                    logger.info("Archived %d board posts.", moved)
+            except Exception:
+                logger.exception("Board archival failed; will retry.")
+            await asyncio.sleep(self.interval)
+
+
+ARCHIVER = BoardArchiver()
+
+
+LIST_ARCHIVED_POSTS = declare(
+    "boards.list_archived_posts",
+    "SELECT * FROM board_post_archive_view_full WHERE board_id = $1 AND ($2 OR deleted_at IS NULL) "
+    "AND (post_order, sub_order, id) > ($3, $4, $5) ORDER BY post_order, sub_order, id LIMIT $6")
+
+@stream
+async def list_archived_posts(conn: Connection, board: BoardModel, deleted: bool = False,
+                              after: tuple[int, int, int] | None = None,
+                              limit: int | None = None) -> typing.AsyncGenerator[BoardArchivedPostModel, None]:
+    """
+    Stream a board's archived posts in post order. Archived soft-deleted posts are
+    included only if deleted is True. A post key can recur in the archive, so the
+    keyset position also carries the post id.
+    """
+    post_order, sub_order, post_id = after if after else (0, -1, 0)
+    async for post_data in LIST_ARCHIVED_POSTS.cursor(conn, board.id, deleted, post_order, sub_order, post_id, limit):
+        yield archived_post_from_row(post_data)
+
+GET_ARCHIVED_POST = declare(
+    "boards.get_archived_post",
+    "SELECT v.*, a.body_ansi, a.render_version FROM board_post_archive_view_full v "
+    "JOIN board_posts_archive a ON a.id = v.id "
+    "WHERE v.board_id = $1 AND v.post_order = $2 AND v.sub_order = $3 AND ($4 OR v.deleted_at IS NULL) "
+    "ORDER BY v.archived_at DESC, v.id DESC LIMIT 1")
+
+@from_pool
+async def get_archived_post_by_key(conn: Connection, board: BoardModel, post_key: str,
+                                   deleted: bool = False) -> BoardArchivedPostDetail:
+    """
+    The most recently archived post with this key.
+    """
+    post_order, _, sub_order = post_key.partition(".")
+    if not post_order.isdigit() or not (sub_order or "0").isdigit():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found.")
+    post_data = await GET_ARCHIVED_POST.fetchrow(conn, board.id, int(post_order), int(sub_order or 0), deleted)
+    if not post_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found.")
+    return await ensure_rendered(conn, archived_detail_from_row(post_data), SAVE_ARCHIVED_RENDER)
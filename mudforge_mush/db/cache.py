@@ -0,0 +1,71 @@
+import time
+import typing
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    A small in-process LRU cache whose entries also expire after a fixed time-to-live.
+
+    Hit, miss and eviction counters are kept so the cache can be sized from real traffic.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.data: OrderedDict[typing.Hashable, tuple[float, typing.Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        if (entry := self.data.get(key, None)) is None:
+            return False
+        return entry[0] > time.monotonic()
+
+    def get(self, key: typing.Hashable, default: typing.Any = _MISSING) -> typing.Any:
+        """
+        Retrieve a cached value. Raises KeyError on a miss unless a default is given.
+        """
+        entry = self.data.get(key, None)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self.data.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            del self.data[key]
+        self.misses += 1
+        if default is _MISSING:
+            raise KeyError(key)
+        return default
+
+    def set(self, key: typing.Hashable, value: typing.Any):
+        self.data[key] = (time.monotonic() + self.ttl, value)
+        self.data.move_to_end(key)
+        while len(self.data) > self.max_size:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def discard(self, key: typing.Hashable):
+        self.data.pop(key, None)
+
+    def discard_where(self, predicate: typing.Callable[[typing.Hashable], bool]):
+        for key in [k for k in self.data if predicate(k)]:
+            del self.data[key]
+
+    def clear(self):
+        self.data.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self.data),
+            "max_size": self.max_size,
+        }
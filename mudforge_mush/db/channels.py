@@ -0,0 +1,97 @@
+import mudforge
+import json
+import typing
+import uuid
+from datetime import datetime
+
+from asyncpg import Connection, exceptions
+from fastapi import HTTPException, status
+
+from mudforge.db.base import transaction, from_pool, stream
+from mudforge.models.characters import CharacterModel
+
+from mudforge_mush.models.channels import ChannelModel, ChannelMemberModel, ChannelMessageModel
+from mudforge_mush.db.batching import BatchWriter
+from mudforge_mush.db.queries import declare
+
+# Identifies this process in line announcements, so it can skip its own.
+PROCESS_ID = uuid.uuid4().hex
+
+
+ANNOUNCE_LINES = declare("channels.announce_lines", "SELECT pg_notify('mush_channels', $1)")
+
+@from_pool
+async def announce_lines(conn: Connection, records: list[tuple]):
+    """
+    Tell other processes which channels gained lines, once per written batch rather than
+    once per line, so they reload those channels' history on their next recall.
+    """
+    payload = json.dumps({"lines": sorted({record[0] for record in records}), "origin": PROCESS_ID})
+    await ANNOUNCE_LINES.execute(conn, payload)
+
+
+# Chat lines are written with COPY in batches rather than one INSERT each.
+MESSAGE_WRITER = BatchWriter("channel_messages", ("channel_id", "character_id", "message", "created_at"),
+                             flush_interval=2.0, on_written=announce_lines)
+
+
+LIST_CHANNELS = declare("channels.list_channels",
+                        "SELECT * FROM channels WHERE deleted_at IS NULL ORDER BY category, name")
+
+@stream
+async def list_channels(conn: Connection) -> typing.AsyncGenerator[ChannelModel, None]:
+    async for channel_data in LIST_CHANNELS.cursor(conn):
+        yield ChannelModel(**channel_data)
+
+GET_CHANNEL_BY_NAME = declare("channels.get_channel_by_name",
+                              "SELECT * FROM channels WHERE name = $1 AND deleted_at IS NULL")
+
+@from_pool
+async def get_channel_by_name(conn: Connection, name: str) -> ChannelModel:
+    channel_data = await GET_CHANNEL_BY_NAME.fetchrow(conn, name)
+    if not channel_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Channel not found.")
+    return ChannelModel(**channel_data)
+
+CREATE_CHANNEL = declare("channels.create_channel",
+                         "INSERT INTO channels (name, category, description) VALUES ($1, $2, $3) RETURNING *")
+
+@from_pool
+async def create_channel(conn: Connection, name: str, category: str, description: str | None) -> ChannelModel:
+    try:
+        channel_data = await CREATE_CHANNEL.fetchrow(conn, name, category, description)
+    except exceptions.UniqueViolationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A channel with that name already exists.")
+    return ChannelModel(**channel_data)
+
+GET_LISTENERS = declare("channels.get_listeners",
+                        "SELECT character_id FROM channel_members WHERE channel_id = $1 AND listening = TRUE")
+
+@from_pool
+async def get_listeners(conn: Connection, channel: ChannelModel) -> set[uuid.UUID]:
+    return {row["character_id"] for row in await GET_LISTENERS.fetch(conn, channel.id)}
+
+SET_MEMBERSHIP = declare(
+    "channels.set_membership",
+    "INSERT INTO channel_members (channel_id, character_id, listening) VALUES ($1, $2, $3) "
+    "ON CONFLICT (channel_id, character_id) DO UPDATE SET listening = EXCLUDED.listening, updated_at = now() "
+    "RETURNING *")
+
+@from_pool
+async def set_membership(conn: Connection, channel: ChannelModel, character: CharacterModel, listening: bool) -> ChannelMemberModel:
+    member_data = await SET_MEMBERSHIP.fetchrow(conn, channel.id, character.id, listening)
+    return ChannelMemberModel(**member_data)
+
+RECENT_MESSAGES = declare(
+    "channels.recent_messages",
+    "SELECT m.channel_id, m.character_id, c.name AS character_name, m.message, m.created_at "
+    "FROM channel_messages m LEFT JOIN characters c ON c.id = m.character_id "
+    "WHERE m.channel_id = $1 ORDER BY m.id DESC LIMIT $2")
+
+@from_pool
+async def recent_messages(conn: Connection, channel: ChannelModel, count: int) -> list[ChannelMessageModel]:
+    rows = await RECENT_MESSAGES.fetch(conn, channel.id, count)
+    return [ChannelMessageModel(**row) for row in reversed(rows)]
+
+def record_message(message: ChannelMessageModel):
+    MESSAGE_WRITER.append((message.channel_id, message.character_id, message.message, message.created_at))
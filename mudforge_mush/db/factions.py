@@ -1,6 +1,8 @@
 import mudforge
 import typing
 import uuid
+import asyncio
+import dataclasses
 
 from asyncpg import Connection, exceptions
 from fastapi import HTTPException, status
@@ -10,34 +12,303 @@ from mudforge.models.users import UserModel
 from mudforge.models.characters import CharacterModel, ActiveAs
 
 from mudforge_mush.models.factions import FactionModel
+from mudforge_mush.db.cache import TTLCache
+from mudforge_mush.db import listen
+from mudforge_mush.db.identity import identity_mapped
+from mudforge_mush.db.queries import declare
 
+GET_FACTION = declare("factions.get_faction", "SELECT * FROM factions WHERE id = $1 LIMIT 1")
+
+@identity_mapped("faction", lambda faction_id: faction_id)
 @from_pool
 async def get_faction(conn: Connection, faction_id: int) -> FactionModel:
-    query = "SELECT * FROM factions WHERE id = $1 LIMIT 1"
-    faction_data = await conn.fetchrow(query, faction_id)
+    faction_data = await GET_FACTION.fetchrow(conn, faction_id)
     if not faction_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Faction not found.")
     return FactionModel(**faction_data)
 
+FIND_FACTION = declare("factions.find_faction", "SELECT * FROM factions WHERE name = $1 LIMIT 1")
+
 @from_pool
 async def find_faction(conn: Connection, name: str) -> FactionModel:
-    query = "SELECT * FROM factions WHERE name = $1 LIMIT 1"
-    faction_data = await conn.fetchrow(query, name)
+    faction_data = await FIND_FACTION.fetchrow(conn, name)
     if not faction_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Faction not found.")
     return FactionModel(**faction_data)
 
+FIND_FACTION_ABBREVIATION = declare("factions.find_faction_abbreviation", "SELECT * FROM factions WHERE abbreviation = $1 LIMIT 1")
+
 @from_pool
 async def find_faction_abbreviation(conn: Connection, abbreviation: str) -> FactionModel:
-    query = "SELECT * FROM factions WHERE abbreviation = $1 LIMIT 1"
-    faction_data = await conn.fetchrow(query, abbreviation)
+    faction_data = await FIND_FACTION_ABBREVIATION.fetchrow(conn, abbreviation)
     if not faction_data:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Faction not found.")
     return FactionModel(**faction_data)
 
 
+LIST_FACTIONS = declare("factions.list_factions", "SELECT * FROM factions WHERE deleted_at IS NULL")
+
+@stream
+async def list_factions(conn: Connection) -> typing.AsyncGenerator[FactionModel, None]:
+    async for faction_data in LIST_FACTIONS.cursor(conn):
+        yield FactionModel(**faction_data)
+
+
+class FactionCatalog:
+    """
+    An in-process copy of every live faction, by id and by lowercased abbreviation,
+    for lock evaluation. Dropped whenever a faction row changes.
+    """
+
+    def __init__(self):
+        self.factions: dict[int, FactionModel] | None = None
+        self.abbreviations: dict[str, FactionModel] = dict()
+        self.lock = asyncio.Lock()
+
+    def invalidate(self, *args):
+        self.factions = None
+
+    async def load(self) -> dict[int, FactionModel]:
+        await listen.ensure_listening()
+        if (factions := self.factions) is not None:
+            return factions
+        async with self.lock:
+            if (factions := self.factions) is None:
+                factions = {faction.id: faction async for faction in list_factions()}
+                self.abbreviations = {faction.abbreviation.lower(): faction for faction in factions.values()}
+                self.factions = factions
+        return factions
+
+    async def get(self, faction_id: int) -> FactionModel | None:
+        return (await self.load()).get(faction_id, None)
+
+    async def find_abbreviation(self, abbreviation: str) -> FactionModel | None:
+        await self.load()
+        return self.abbreviations.get(abbreviation.lower(), None)
+
+
+FACTION_CATALOG = FactionCatalog()
+
+
+GET_MEMBERSHIP = declare("factions.get_membership", "SELECT * from faction_members_view WHERE faction_id = $1 AND character_id = $2 LIMIT 1")
+
+@identity_mapped("membership", lambda faction, character: (faction.id, character.id))
 @from_pool
 async def get_membership(conn: Connection, faction: FactionModel, character: CharacterModel) -> dict | None:
-    query = "SELECT * from faction_members_view WHERE faction_id = $1 AND character_id = $2 LIMIT 1"
-    membership_data = await conn.fetchrow(query, faction.id, character.id)
-    return membership_data
\ No newline at end of file
+    membership_data = await GET_MEMBERSHIP.fetchrow(conn, faction.id, character.id)
+    return membership_data
+
+
+GET_MEMBERSHIPS = declare("factions.get_memberships", "SELECT * from faction_members_view WHERE faction_id = $1 AND character_id = ANY($2::uuid[])")
+
+@from_pool
+async def get_memberships(conn: Connection, faction: FactionModel, characters: typing.Iterable[CharacterModel]) -> dict[uuid.UUID, dict]:
+    character_ids = list({c.id for c in characters})
+    if not character_ids:
+        return dict()
+    return {row["character_id"]: row for row in await GET_MEMBERSHIPS.fetch(conn, faction.id, character_ids)}
+
+
+GET_ALL_MEMBERSHIPS = declare("factions.get_all_memberships", "SELECT * from faction_members_view WHERE character_id = ANY($1::uuid[])")
+
+@from_pool
+async def get_all_memberships(conn: Connection, character_ids: list[uuid.UUID]) -> list:
+    return await GET_ALL_MEMBERSHIPS.fetch(conn, character_ids)
+
+
+class PermissionTable:
+    """
+    A faction's permission vocabulary compiled into integer bit positions.
+
+    Every rank's effective mask (faction member and public permissions plus the rank's
+    own) is precomputed, so checking a permission is a dictionary lookup and a single
+    bitwise AND. Tables are rebuilt only when the faction's permission data changes.
+    """
+    __slots__ = ("faction_id", "signature", "bits", "base_mask", "rank_masks")
+
+    def __init__(self, faction: FactionModel, ranks: typing.Iterable):
+        self.faction_id = faction.id
+        self.signature = self.signature_of(faction)
+        self.bits: dict[str, int] = dict()
+        self.base_mask = self.mask_of(faction.member_permissions, extend=True) | self.mask_of(faction.public_permissions, extend=True)
+        self.rank_masks: dict[int, int] = dict()
+        for rank in ranks:
+            self.rank_masks[rank["id"]] = self.base_mask | self.mask_of(rank["permissions"], extend=True)
+
+    @staticmethod
+    def signature_of(faction: FactionModel) -> tuple[frozenset[str], frozenset[str]]:
+        return frozenset(faction.member_permissions), frozenset(faction.public_permissions)
+
+    def bit(self, permission: str) -> int:
+        return self.bits.get(permission.lower(), 0)
+
+    def mask_of(self, permissions: typing.Iterable[str], extend: bool = False) -> int:
+        mask = 0
+        for permission in permissions:
+            permission = permission.lower()
+            if (bit := self.bits.get(permission, 0)):
+                mask |= bit
+            elif extend:
+                bit = self.bits[permission] = 1 << len(self.bits)
+                mask |= bit
+        return mask
+
+    def rank_mask(self, rank_id: int, rank_permissions: typing.Iterable[str]) -> int:
+        if (mask := self.rank_masks.get(rank_id, None)) is None:
+            # A rank created after this table was compiled.
+            mask = self.rank_masks[rank_id] = self.base_mask | self.mask_of(rank_permissions, extend=True)
+        return mask
+
+
+@dataclasses.dataclass(slots=True, frozen=True)
+class EffectivePermissions:
+    """
+    Everything a single member may do within a faction, as a mask over the faction's
+    compiled PermissionTable.
+    """
+    rank: int
+    mask: int
+    table: PermissionTable
+
+    @classmethod
+    def from_membership(cls, table: PermissionTable, membership_data) -> "EffectivePermissions":
+        mask = table.rank_mask(membership_data["rank_id"], membership_data["rank_permissions"])
+        mask |= table.mask_of(membership_data["permissions"], extend=True)
+        return cls(rank=membership_data["rank_value"], mask=mask, table=table)
+
+    def allows(self, permission: str) -> bool:
+        # Leaders pass everything.
+        if self.rank <= 1:
+            return True
+        return bool(self.mask & self.table.bit(permission))
+
+
+# Compiled permission tables, keyed by faction id.
+PERMISSION_TABLES: dict[int, PermissionTable] = dict()
+
+
+GET_FACTION_RANKS = declare("factions.get_faction_ranks", "SELECT id, permissions FROM faction_ranks WHERE faction_id = $1")
+
+@from_pool
+async def get_faction_ranks(conn: Connection, faction: FactionModel) -> list:
+    return await GET_FACTION_RANKS.fetch(conn, faction.id)
+
+
+async def get_permission_table(faction: FactionModel) -> PermissionTable:
+    table = PERMISSION_TABLES.get(faction.id, None)
+    if table is not None and table.signature == PermissionTable.signature_of(faction):
+        return table
+    table = PERMISSION_TABLES[faction.id] = PermissionTable(faction, await get_faction_ranks(faction))
+    # Cached masks refer to the previous table's bit positions.
+    PERMISSION_CACHE.discard_where(lambda key: key[0] == faction.id)
+    return table
+
+
+# Keyed by (faction_id, character_id). Non-members are cached as None.
+PERMISSION_CACHE = TTLCache(max_size=20000, ttl=600.0)
+
+# Keyed by character_id: the ids of every faction the character belongs to.
+MEMBERSHIP_CACHE = TTLCache(max_size=20000, ttl=600.0)
+
+
+def _on_faction_notify(data):
+    if not isinstance(data, dict):
+        _on_listener_lost()
+        return
+    faction_id = data.get("faction_id", None)
+    if data.get("table", None) == "factions":
+        FACTION_CATALOG.invalidate()
+    if data.get("table", None) == "faction_members" and data.get("character_id", None):
+        character_id = uuid.UUID(data["character_id"])
+        PERMISSION_CACHE.discard((faction_id, character_id))
+        MEMBERSHIP_CACHE.discard(character_id)
+    else:
+        # Faction or rank permissions changed; every member of that faction is affected.
+        PERMISSION_TABLES.pop(faction_id, None)
+        PERMISSION_CACHE.discard_where(lambda key: key[0] == faction_id)
+
+
+def _on_listener_lost():
+    # Notifications may have been missed while disconnected.
+    PERMISSION_TABLES.clear()
+    PERMISSION_CACHE.clear()
+    MEMBERSHIP_CACHE.clear()
+    FACTION_CATALOG.invalidate()
+
+
+listen.register("mush_factions", _on_faction_notify, on_lost=_on_listener_lost)
+
+
+async def get_effective_permissions_many(faction: FactionModel, characters: typing.Iterable[CharacterModel]) -> dict[uuid.UUID, EffectivePermissions | None]:
+    """
+    Resolve effective permissions for many characters at once. Cached entries are used
+    where possible and every miss is filled with a single query.
+    """
+    await listen.ensure_listening()
+    table = await get_permission_table(faction)
+    results = dict()
+    missing = list()
+    for character in characters:
+        try:
+            results[character.id] = PERMISSION_CACHE.get((faction.id, character.id))
+        except KeyError:
+            if (faction_ids := MEMBERSHIP_CACHE.get(character.id, None)) is not None and faction.id not in faction_ids:
+                results[character.id] = None
+            else:
+                missing.append(character)
+    if missing:
+        memberships = await get_memberships(faction, missing)
+        for character in missing:
+            effective = None
+            if (membership_data := memberships.get(character.id, None)) is not None:
+                effective = EffectivePermissions.from_membership(table, membership_data)
+            PERMISSION_CACHE.set((faction.id, character.id), effective)
+            results[character.id] = effective
+    return results
+
+
+async def get_effective_permissions(faction: FactionModel, character: CharacterModel) -> EffectivePermissions | None:
+    await listen.ensure_listening()
+    table = await get_permission_table(faction)
+    try:
+        return PERMISSION_CACHE.get((faction.id, character.id))
+    except KeyError:
+        pass
+    effective = None
+    if (membership_data := await get_membership(faction, character)) is not None:
+        effective = EffectivePermissions.from_membership(table, membership_data)
+    PERMISSION_CACHE.set((faction.id, character.id), effective)
+    return effective
+
+
+async def prefetch_memberships(character_ids: typing.Iterable[uuid.UUID]) -> dict[uuid.UUID, frozenset[int]]:
+    """
+    Load every faction membership of many characters with one query, filling both
+    MEMBERSHIP_CACHE and PERMISSION_CACHE. Returns the faction ids per character.
+
+    Lock evaluation calls this before checking faction clauses, so a lock naming several
+    factions, or one evaluated for everyone online, costs at most one query.
+    """
+    await listen.ensure_listening()
+    results = dict()
+    missing = list()
+    for character_id in character_ids:
+        try:
+            results[character_id] = MEMBERSHIP_CACHE.get(character_id)
+        except KeyError:
+            missing.append(character_id)
+    if not missing:
+        return results
+
+    found: dict[uuid.UUID, set[int]] = {character_id: set() for character_id in missing}
+    for membership_data in await get_all_memberships(missing):
+        if (faction := await FACTION_CATALOG.get(membership_data["faction_id"])) is None:
+            continue
+        table = await get_permission_table(faction)
+        effective = EffectivePermissions.from_membership(table, membership_data)
+        PERMISSION_CACHE.set((faction.id, membership_data["character_id"]), effective)
+        found[membership_data["character_id"]].add(faction.id)
+    for character_id, faction_ids in found.items():
+        results[character_id] = frozenset(faction_ids)
+        MEMBERSHIP_CACHE.set(character_id, results[character_id])
+    return results
@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+import contextvars
+import functools
+import typing
+
+
+class RequestScope:
+    """
+    A per-request identity map. Lookups wrapped with identity_mapped() are loaded at
+    most once per scope and the same object is handed to every caller, including
+    concurrent ones. Named queries (db.queries) count their round trips here.
+    """
+    __slots__ = ("objects", "round_trips", "hits")
+
+    def __init__(self):
+        self.objects: dict[tuple, asyncio.Future] = dict()
+        self.round_trips = 0
+        self.hits = 0
+
+
+_SCOPE: contextvars.ContextVar[RequestScope | None] = contextvars.ContextVar("mush_request_scope", default=None)
+
+
+@contextlib.contextmanager
+def request_scope() -> typing.Iterator[RequestScope]:
+    scope = RequestScope()
+    token = _SCOPE.set(scope)
+    try:
+        yield scope
+    finally:
+        _SCOPE.reset(token)
+
+
+def current_scope() -> RequestScope | None:
+    return _SCOPE.get()
+
+
+def count_round_trip(count: int = 1):
+    if (scope := _SCOPE.get()) is not None:
+        scope.round_trips += count
+
+
+def identity_mapped(kind: str, key: typing.Callable[..., typing.Hashable]):
+    """
+    Share a lookup's result within the current request scope.
+
+    key receives the wrapped function's arguments and returns what identifies the
+    result, such as a primary key. Outside a request scope calls pass straight through.
+    Failures, such as a 404, are shared the same way as results.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if (scope := _SCOPE.get()) is None:
+                return await func(*args, **kwargs)
+            identity = (kind, key(*args, **kwargs))
+            if (future := scope.objects.get(identity, None)) is not None:
+                scope.hits += 1
+                return await asyncio.shield(future)
+            future = scope.objects[identity] = asyncio.get_running_loop().create_future()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                    # Mark it retrieved; waiters re-raise it from the future themselves.
+                    future.exception()
+                else:
+                    # Cancelled; let a later caller try again.
+                    del scope.objects[identity]
+                    future.cancel()
+                raise
+            future.set_result(result)
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+import mudforge
+import asyncio
+import json
+import typing
+
+from asyncpg import Connection
+
+# channel -> callbacks receiving the decoded NOTIFY payload (None if it was not JSON).
+_callbacks: dict[str, list[typing.Callable[[typing.Any], None]]] = dict()
+# Called when the listening connection is lost, since notifications may have been missed.
+_lost_callbacks: list[typing.Callable[[], None]] = list()
+
+_listener: Connection | None = None
+_attached: set[str] = set()
+_lock = asyncio.Lock()
+
+
+def register(channel: str, callback: typing.Callable[[typing.Any], None],
+             on_lost: typing.Callable[[], None] | None = None):
+    """
+    Register a callback for a NOTIFY channel. This is meant to be called at import time;
+    the channel is LISTENed to on the next call to ensure_listening().
+    """
+    _callbacks.setdefault(channel, list()).append(callback)
+    if on_lost is not None:
+        _lost_callbacks.append(on_lost)
+
+
+def _dispatch(connection, pid, channel, payload):
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        data = None
+    for callback in _callbacks.get(channel, list()):
+        callback(data)
+
+
+def _on_lost(connection):
+    global _listener
+    _listener = None
+    _attached.clear()
+    for callback in _lost_callbacks:
+        callback()
+
+
+async def ensure_listening():
+    """
+    Ensure one dedicated pooled connection is LISTENing on every registered channel.
+    Cheap to call repeatedly; the connection is re-established if it was lost.
+    """
+    global _listener
+    if _listener is not None and _attached.issuperset(_callbacks):
+        return
+    async with _lock:
+        if _listener is None:
+            conn = await mudforge.PGPOOL.acquire()
+            conn.add_termination_listener(_on_lost)
+            _listener = conn
+        for channel in set(_callbacks) - _attached:
+            await _listener.add_listener(channel, _dispatch)
+            _attached.add(channel)
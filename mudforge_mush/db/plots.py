@@ -0,0 +1,150 @@
+import mudforge
+import typing
+import uuid
+import zlib
+
+from asyncpg import Connection, exceptions
+from fastapi import HTTPException, status
+
+from mudforge.db.base import transaction, from_pool, stream
+from mudforge.models.characters import CharacterModel
+
+from mudforge_mush.models.plots import SceneModel, ScenePose
+from mudforge_mush.db.batching import BatchWriter
+
+# Poses are written with COPY in batches rather than one transaction each.
+POSE_WRITER = BatchWriter("scene_poses", ("scene_id", "character_id", "character_name", "pose", "created_at"),
+                          flush_interval=2.0)
+
+# How much of a compacted log is read from the database at a time while exporting.
+LOG_CHUNK_SIZE = 64 * 1024
+
+
+@stream
+async def list_scenes(conn: Connection) -> typing.AsyncGenerator[SceneModel, None]:
+    query = "SELECT * FROM scenes ORDER BY id DESC"
+    async for scene_data in conn.cursor(query):
+        yield SceneModel(**scene_data)
+
+@from_pool
+async def get_scene(conn: Connection, scene_id: int) -> SceneModel:
+    scene_data = await conn.fetchrow("SELECT * FROM scenes WHERE id = $1", scene_id)
+    if not scene_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Scene not found.")
+    return SceneModel(**scene_data)
+
+@transaction
+async def create_scene(conn: Connection, name: str, description: str | None, owner: CharacterModel) -> SceneModel:
+    try:
+        scene_data = await conn.fetchrow("INSERT INTO scenes (name, description, started_at) VALUES ($1, $2, now()) "
+                                         "RETURNING *", name, description)
+    except exceptions.UniqueViolationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A scene by that name already exists.")
+    await conn.execute("INSERT INTO scene_participants (scene_id, character_id, participant_type) VALUES ($1, $2, 3)",
+                       scene_data["id"], owner.id)
+    return SceneModel(**scene_data)
+
+@from_pool
+async def get_participants(conn: Connection, scene: SceneModel) -> dict[uuid.UUID, int]:
+    rows = await conn.fetch("SELECT character_id, participant_type FROM scene_participants WHERE scene_id = $1",
+                            scene.id)
+    return {row["character_id"]: row["participant_type"] for row in rows}
+
+@from_pool
+async def add_participant(conn: Connection, scene: SceneModel, character: CharacterModel, participant_type: int = 0):
+    await conn.execute("INSERT INTO scene_participants (scene_id, character_id, participant_type) VALUES ($1, $2, $3) "
+                       "ON CONFLICT (scene_id, character_id) DO NOTHING", scene.id, character.id, participant_type)
+
+def record_pose(pose: ScenePose):
+    POSE_WRITER.append((pose.scene_id, pose.character_id, pose.character_name, pose.pose, pose.created_at))
+
+@transaction
+async def compact_scene(conn: Connection, scene: SceneModel, resolution: str | None = None) -> SceneModel:
+    """
+    End a scene and fold its poses into one compressed scene_logs row.
+
+    Poses are read with a cursor and fed through the compressor as they arrive, so only
+    the compressed output is held in memory. Callers should flush POSE_WRITER first;
+    poses that still arrive later are picked up by fold_late_poses.
+    """
+    scene_data = await conn.fetchrow("UPDATE scenes SET ended_at = now(), updated_at = now(), "
+                                     "resolution = COALESCE($2, resolution) "
+                                     "WHERE id = $1 AND ended_at IS NULL RETURNING *", scene.id, resolution)
+    if not scene_data:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="That scene has already ended.")
+
+    compressor = zlib.compressobj(level=9)
+    chunks = list()
+    count = 0
+    size = 0
+    query = ("SELECT scene_id, character_id, character_name, pose, created_at FROM scene_poses "
+             "WHERE scene_id = $1 ORDER BY created_at, id")
+    async for pose_data in conn.cursor(query, scene.id):
+        line = ScenePose(**pose_data).model_dump_json().encode("utf-8") + b"\n"
+        size += len(line)
+        count += 1
+        if compressed := compressor.compress(line):
+            chunks.append(compressed)
+    chunks.append(compressor.flush())
+
+    await conn.execute("INSERT INTO scene_logs (scene_id, pose_count, log_size, log_data) VALUES ($1, $2, $3, $4)",
+                       scene.id, count, size, b"".join(chunks))
+    await conn.execute("DELETE FROM scene_poses WHERE scene_id = $1", scene.id)
+    return SceneModel(**scene_data)
+
+@transaction
+async def fold_late_poses(conn: Connection, scene: SceneModel) -> int:
+    """
+    Append poses that reached scene_poses after the scene was compacted, such as ones
+    still buffered in another process's writer, to its log as a further zlib stream.
+    Returns how many were folded in.
+    """
+    if await conn.fetchval("SELECT 1 FROM scene_logs WHERE scene_id = $1 FOR UPDATE", scene.id) is None:
+        return 0
+    rows = await conn.fetch("DELETE FROM scene_poses WHERE scene_id = $1 "
+                            "RETURNING id, scene_id, character_id, character_name, pose, created_at", scene.id)
+    if not rows:
+        return 0
+    lines = b"".join(ScenePose(**pose_data).model_dump_json().encode("utf-8") + b"\n"
+                     for pose_data in sorted(rows, key=lambda row: (row["created_at"], row["id"])))
+    await conn.execute("UPDATE scene_logs SET pose_count = pose_count + $2, log_size = log_size + $3, "
+                       "log_data = log_data || $4 WHERE scene_id = $1",
+                       scene.id, len(rows), len(lines), zlib.compress(lines, level=9))
+    return len(rows)
+
+@stream
+async def stream_poses(conn: Connection, scene: SceneModel) -> typing.AsyncGenerator[ScenePose, None]:
+    """
+    Yield a scene's poses in order, from its compacted log and then from the live table,
+    which holds every pose until compaction and any that arrived after it.
+    The log is fetched and decompressed LOG_CHUNK_SIZE bytes at a time.
+    """
+    length = await conn.fetchval("SELECT octet_length(log_data) FROM scene_logs WHERE scene_id = $1", scene.id)
+
+    decompressor = zlib.decompressobj()
+    remainder = b""
+    for offset in range(0, length or 0, LOG_CHUNK_SIZE):
+        # substring() on bytea is 1-based.
+        chunk = await conn.fetchval("SELECT substring(log_data FROM $2 FOR $3) FROM scene_logs WHERE scene_id = $1",
+                                    scene.id, offset + 1, LOG_CHUNK_SIZE)
+        data = b""
+        while chunk:
+            data += decompressor.decompress(chunk)
+            # fold_late_poses appends further zlib streams; carry on into the next one.
+            if decompressor.eof:
+                chunk = decompressor.unused_data
+                decompressor = zlib.decompressobj()
+            else:
+                chunk = b""
+        lines = (remainder + data).split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield ScenePose.model_validate_json(line)
+    for line in (remainder + decompressor.flush()).split(b"\n"):
+        if line:
+            yield ScenePose.model_validate_json(line)
+
+    query = ("SELECT scene_id, character_id, character_name, pose, created_at FROM scene_poses "
+             "WHERE scene_id = $1 ORDER BY created_at, id")
+    async for pose_data in conn.cursor(query, scene.id):
+        yield ScenePose(**pose_data)
@@ -0,0 +1,126 @@
+import time
+import typing
+
+from asyncpg import Connection
+
+from mudforge_mush.metrics import Histogram
+from mudforge_mush.db.identity import count_round_trip
+
+# Rows a cursor fetches per round trip; asyncpg's default.
+CURSOR_PREFETCH = 50
+
+
+class NamedQuery:
+    """
+    One SQL statement, declared once under a name and executed through that name.
+
+    Because the text of a named query never changes, asyncpg's per-connection statement
+    cache prepares it once on each pooled connection and reuses the plan afterwards.
+    Every execution records its latency, the rows it returned and any failure.
+
+    Queries whose text is built at runtime, such as PATCH updates, are declared with
+    sql=None and given their text at each call; they share one set of stats.
+    """
+    __slots__ = ("name", "sql", "calls", "rows", "errors", "latency")
+
+    def __init__(self, name: str, sql: str | None):
+        self.name = name
+        self.sql = sql
+        self.calls = 0
+        self.rows = 0
+        self.errors = 0
+        self.latency = Histogram()
+
+    def _text(self, sql: str | None) -> str:
+        if (text := sql or self.sql) is None:
+            raise ValueError(f"Query {self.name} has no fixed text and none was given.")
+        return text
+
+    def record(self, elapsed: float, rows: int, failed: bool = False):
+        self.calls += 1
+        self.rows += rows
+        self.latency.observe(elapsed)
+        if failed:
+            self.errors += 1
+
+    async def _run(self, method: typing.Callable, sql: str | None, args: tuple, count: typing.Callable[[typing.Any], int]):
+        text = self._text(sql)
+        count_round_trip()
+        started = time.perf_counter()
+        try:
+            result = await method(text, *args)
+        except Exception:
+            self.record(time.perf_counter() - started, 0, failed=True)
+            raise
+        self.record(time.perf_counter() - started, count(result))
+        return result
+
+    async def fetch(self, conn: Connection, *args, sql: str | None = None) -> list:
+        return await self._run(conn.fetch, sql, args, len)
+
+    async def fetchrow(self, conn: Connection, *args, sql: str | None = None):
+        return await self._run(conn.fetchrow, sql, args, lambda row: 0 if row is None else 1)
+
+    async def fetchval(self, conn: Connection, *args, sql: str | None = None):
+        return await self._run(conn.fetchval, sql, args, lambda value: 0 if value is None else 1)
+
+    async def execute(self, conn: Connection, *args, sql: str | None = None) -> str:
+        return await self._run(conn.execute, sql, args, lambda status: 0)
+
+    async def cursor(self, conn: Connection, *args, sql: str | None = None) -> typing.AsyncGenerator[typing.Any, None]:
+        """
+        Iterate a cursor. Only time spent waiting on the database is counted, not time
+        the consumer spends between rows. Each batch of CURSOR_PREFETCH rows is one
+        round trip.
+        """
+        iterator = conn.cursor(self._text(sql), *args, prefetch=CURSOR_PREFETCH).__aiter__()
+        count_round_trip()
+        elapsed = 0.0
+        rows = 0
+        failed = False
+        try:
+            while True:
+                if rows and rows % CURSOR_PREFETCH == 0:
+                    # The previous batch is used up, so this row needs another fetch.
+                    count_round_trip()
+                started = time.perf_counter()
+                try:
+                    row = await iterator.__anext__()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    failed = True
+                    raise
+                finally:
+                    elapsed += time.perf_counter() - started
+                rows += 1
+                yield row
+        finally:
+            self.record(elapsed, rows, failed=failed)
+
+
+# Every declared query, by name.
+QUERIES: dict[str, NamedQuery] = dict()
+
+
+def declare(name: str, sql: str | None) -> NamedQuery:
+    if (query := QUERIES.get(name, None)) is not None:
+        if query.sql != sql:
+            raise ValueError(f"Query {name} is already declared with different text.")
+        return query
+    query = QUERIES[name] = NamedQuery(name, sql)
+    return query
+
+
+def query_stats() -> list[dict[str, typing.Any]]:
+    """
+    Stats for every query that has run, slowest total time first.
+    """
+    stats = list()
+    for query in QUERIES.values():
+        if not query.calls:
+            continue
+        stats.append({"name": query.name, "calls": query.calls, "rows": query.rows, "errors": query.errors,
+                      **query.latency.snapshot()})
+    stats.sort(key=lambda entry: entry["sum"], reverse=True)
+    return stats
@@ -0,0 +1,51 @@
+import mudforge
+import json
+import typing
+import uuid
+from decimal import Decimal
+
+from asyncpg import Connection, exceptions
+
+from mudforge.db.base import transaction, from_pool, stream
+from mudforge.models.characters import CharacterModel
+
+from mudforge_mush.db.queries import declare
+
+LIST_TUNED = declare(
+    "radio.list_tuned",
+    "SELECT f.frequency, m.character_id FROM frequency_members m "
+    "JOIN frequencies f ON f.id = m.frequency_id "
+    "WHERE m.listening = TRUE AND f.frequency IS NOT NULL")
+
+@stream
+async def list_tuned(conn: Connection) -> typing.AsyncGenerator[tuple[Decimal, uuid.UUID], None]:
+    async for row in LIST_TUNED.cursor(conn):
+        yield row["frequency"], row["character_id"]
+
+GET_FREQUENCY = declare("radio.get_frequency", "SELECT id FROM frequencies WHERE frequency = $1")
+CREATE_FREQUENCY = declare(
+    "radio.create_frequency",
+    "INSERT INTO frequencies (name, frequency) VALUES ($1, $2) "
+    "ON CONFLICT (frequency) WHERE frequency IS NOT NULL DO UPDATE SET updated_at = now() RETURNING id")
+SET_MEMBER = declare(
+    "radio.set_member",
+    "INSERT INTO frequency_members (frequency_id, character_id, listening) VALUES ($1, $2, $3) "
+    "ON CONFLICT (frequency_id, character_id) DO UPDATE SET listening = EXCLUDED.listening, updated_at = now()")
+
+@transaction
+async def set_tuned(conn: Connection, frequency: Decimal, character: CharacterModel, listening: bool):
+    frequency_id = await GET_FREQUENCY.fetchval(conn, frequency)
+    if frequency_id is None:
+        if not listening:
+            return
+        frequency_id = await CREATE_FREQUENCY.fetchval(conn, f"{frequency:.3f}", frequency)
+    await SET_MEMBER.execute(conn, frequency_id, character.id, listening)
+
+PUBLISH = declare("radio.publish", "SELECT pg_notify('mush_radio', $1)")
+
+@from_pool
+async def publish_presence(conn: Connection, character_id: uuid.UUID, online: bool):
+    """
+    Tell every process's radio index that a character logged in or out.
+    """
+    await PUBLISH.execute(conn, json.dumps({"character_id": str(character_id), "online": online}))
@@ -0,0 +1,53 @@
+import mudforge
+import typing
+
+from asyncpg import Connection, exceptions
+from fastapi import HTTPException, status
+
+from mudforge.db.base import transaction, from_pool, stream
+
+from mudforge_mush.models.regions import RegionModel
+from mudforge_mush.models.rooms import RoomModel
+
+
+@stream
+async def list_regions(conn: Connection) -> typing.AsyncGenerator[RegionModel, None]:
+    query = "SELECT id, name, parent_id FROM regions ORDER BY id"
+    async for region_data in conn.cursor(query):
+        yield RegionModel(**region_data)
+
+@from_pool
+async def get_region(conn: Connection, region_id: int) -> RegionModel:
+    region_data = await conn.fetchrow("SELECT id, name, parent_id FROM regions WHERE id = $1", region_id)
+    if not region_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Region not found.")
+    return RegionModel(**region_data)
+
+@from_pool
+async def create_region(conn: Connection, name: str, parent_id: int | None) -> RegionModel:
+    try:
+        region_data = await conn.fetchrow("INSERT INTO regions (name, parent_id) VALUES ($1, $2) "
+                                          "RETURNING id, name, parent_id", name, parent_id)
+    except exceptions.ForeignKeyViolationError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parent region not found.")
+    return RegionModel(**region_data)
+
+@from_pool
+async def set_parent(conn: Connection, region: RegionModel, parent_id: int | None) -> RegionModel:
+    # region_closure is rewritten for the moved subtree by the mush_region_closure trigger.
+    try:
+        region_data = await conn.fetchrow("UPDATE regions SET parent_id = $2, updated_at = now() WHERE id = $1 "
+                                          "RETURNING id, name, parent_id", region.id, parent_id)
+    except exceptions.ForeignKeyViolationError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parent region not found.")
+    except exceptions.CheckViolationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A region cannot be moved inside itself.")
+    return RegionModel(**region_data)
+
+@stream
+async def rooms_in_region(conn: Connection, region: RegionModel) -> typing.AsyncGenerator[RoomModel, None]:
+    query = ("SELECT r.id, r.region_id, r.name, r.description FROM region_closure c "
+             "JOIN region_rooms r ON r.region_id = c.descendant_id "
+             "WHERE c.ancestor_id = $1 ORDER BY r.id")
+    async for room_data in conn.cursor(query, region.id):
+        yield RoomModel(**room_data)
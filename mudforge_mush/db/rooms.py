@@ -0,0 +1,43 @@
+import mudforge
+import typing
+
+from asyncpg import Connection, exceptions
+from fastapi import HTTPException, status
+
+from mudforge.db.base import transaction, from_pool, stream
+
+from mudforge_mush.models.rooms import RoomModel, ExitModel
+
+
+@stream
+async def list_rooms(conn: Connection) -> typing.AsyncGenerator[RoomModel, None]:
+    query = "SELECT id, region_id, name, description FROM region_rooms"
+    async for room_data in conn.cursor(query):
+        yield RoomModel(**room_data)
+
+@stream
+async def list_exits(conn: Connection) -> typing.AsyncGenerator[ExitModel, None]:
+    query = "SELECT id, room_id, destination_id, name FROM room_exits ORDER BY room_id, name"
+    async for exit_data in conn.cursor(query):
+        yield ExitModel(**exit_data)
+
+@from_pool
+async def get_room(conn: Connection, room_id: int) -> RoomModel:
+    query = "SELECT id, region_id, name, description FROM region_rooms WHERE id = $1"
+    room_data = await conn.fetchrow(query, room_id)
+    if not room_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found.")
+    return RoomModel(**room_data)
+
+@from_pool
+async def create_exit(conn: Connection, room: RoomModel, name: str, destination: RoomModel) -> ExitModel:
+    try:
+        exit_data = await conn.fetchrow("INSERT INTO room_exits (room_id, destination_id, name) VALUES ($1, $2, $3) "
+                                        "RETURNING id, room_id, destination_id, name", room.id, destination.id, name)
+    except exceptions.UniqueViolationError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="That room already has an exit by that name.")
+    return ExitModel(**exit_data)
+
+@from_pool
+async def delete_exit(conn: Connection, exit_id: int):
+    await conn.execute("DELETE FROM room_exits WHERE id = $1", exit_id)
@@ -0,0 +1,57 @@
+import functools
+import json
+import types
+import typing
+
+import pydantic
+
+M = typing.TypeVar("M", bound=pydantic.BaseModel)
+
+
+def _json(value: typing.Any) -> typing.Any:
+    return json.loads(value) if isinstance(value, (str, bytes)) else value
+
+
+def _converter(annotation: typing.Any) -> typing.Callable[[typing.Any], typing.Any] | None:
+    """
+    The conversion validation would make from what asyncpg returns for this field's
+    type, or None if asyncpg already returns the right type.
+    """
+    origin = typing.get_origin(annotation)
+    if origin in (typing.Union, types.UnionType):
+        members = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return _converter(members[0]) if len(members) == 1 else None
+    if origin in (set, frozenset) or annotation in (set, frozenset):
+        return origin or annotation
+    if origin is dict or annotation is dict:
+        return _json
+    return None
+
+
+class RowLoader(typing.Generic[M]):
+    """
+    Builds a model from a row this plugin wrote, using model_construct instead of
+    validating it again. Field validators such as rich_text ran when the row was
+    written; only the type conversions asyncpg's values need, such as JSON text to
+    dicts and arrays to sets, are applied here.
+
+    Only use this for rows read back from the database, never for client input.
+    """
+    __slots__ = ("model", "converters")
+
+    def __init__(self, model: type[M]):
+        self.model = model
+        self.converters = {name: convert for name, field in model.model_fields.items()
+                           if (convert := _converter(field.annotation))}
+
+    def __call__(self, row: typing.Mapping[str, typing.Any]) -> M:
+        data = dict(row)
+        for name, convert in self.converters.items():
+            if (value := data.get(name)) is not None:
+                data[name] = convert(value)
+        return self.model.model_construct(**data)
+
+
+@functools.cache
+def trusted(model: type[M]) -> RowLoader[M]:
+    return RowLoader(model)
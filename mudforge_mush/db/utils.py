@@ -0,0 +1,31 @@
+import typing
+
+
+def build_update(table: str, patch_data: dict[str, typing.Any], columns: dict[str, str], key_column: str,
+                 key_value: typing.Any, touch: str | None = "updated_at") -> tuple[str, list]:
+    """
+    Coalesce a PATCH into a single UPDATE ... RETURNING * statement.
+
+    Args:
+        table: The table to update.
+        patch_data: Usually a Patch model's model_dump(exclude_unset=True).
+        columns: Whitelist mapping patch field names to column names. Fields not in it are rejected.
+        key_column: The column identifying the row to update.
+        key_value: The value of key_column for the row.
+        touch: A timestamp column to set to now(), or None.
+
+    Returns:
+        The query and its positional arguments.
+    """
+    if (unknown := set(patch_data) - set(columns)):
+        raise ValueError(f"Unpatchable fields for {table}: {', '.join(sorted(unknown))}")
+    assignments = list()
+    args = list()
+    for field, value in patch_data.items():
+        args.append(value)
+        assignments.append(f"{columns[field]}=${len(args)}")
+    if touch:
+        assignments.append(f"{touch}=now()")
+    args.append(key_value)
+    query = f"UPDATE {table} SET {', '.join(assignments)} WHERE {key_column}=${len(args)} RETURNING *"
+    return query, args
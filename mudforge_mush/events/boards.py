@@ -1,5 +1,7 @@
 from pydantic import Field
+import abc
 import datetime
+import typing
 from mudforge.events.base import EventBase
 from rich.markup import escape
 
@@ -7,66 +9,99 @@ class _BoardEvent(EventBase):
     board_key: str
     board_name: str
     faction_name: str | None
+    # The final markup, rendered once when the event is created, so each receiving
+    # connection only has to send it. It is left out when the event is serialized; a
+    # process receiving the event renders it again, once, as it is rebuilt.
+    rendered: str | None = Field(default=None, exclude=True)
+
+    def model_post_init(self, __context: typing.Any):
+        super().model_post_init(__context)
+        if self.rendered is None:
+            self.rendered = self.format_message(self.render_message())
+
+    @abc.abstractmethod
+    def render_message(self) -> str:
+        ...
 
     def format_message(self, message: str):
         escaped_message = escape(message)
         fac_header = f"[Faction BBS-{self.faction_name}]" if self.faction_name else '[BBS]'
         return f"[bold]{escape(fac_header)}[/] {self.board_key} ({self.board_name}): {escaped_message}"
 
+    async def handle_event(self, conn: "BaseConnection"):
+        await conn.send_rich(self.rendered)
+
 
 class BoardCreate(_BoardEvent):
     enactor: str
 
-    async def handle_event(self, conn: "BaseConnection"):
-        await conn.send_rich(self.format_message(f"Created by {self.enactor}."))
+    def render_message(self) -> str:
+        return f"Created by {self.enactor}."
 
 
 class BoardDelete(_BoardEvent):
     enactor: str
 
-    async def handle_event(self, conn: "BaseConnection"):
-        await conn.send_rich(self.format_message(f"Deleted by {self.enactor}."))
+    def render_message(self) -> str:
+        return f"Deleted by {self.enactor}."
 
 
 class BoardUpdate(_BoardEvent):
     enactor: str
     changes: dict[str, tuple[str | None, str | None]]
 
-    async def handle_event(self, conn: "BaseConnection"):
+    def render_message(self) -> str:
         change_str = ", ".join([f"{k} changed from {v[0]} to {v[1]}" for k, v in self.changes.items()])
-        await conn.send_rich(self.format_message(f"Updated by {self.enactor}. {change_str}."))
+        return f"Updated by {self.enactor}. {change_str}."
 
 
 class _PostEvent(_BoardEvent):
     post_key: str
     post_title: str
-    post_body: str
-    character_name: str | None
+    post_body: str = ""
+    character_name: str | None = None
     poster_name: str
 
+    @classmethod
+    def variants(cls, character_name: str | None, poster_name: str, anonymous_name: str | None = None,
+                 **kwargs) -> tuple[typing.Self, typing.Self]:
+        """
+        Build the pre-rendered (public, admin) pair of this event. Only the admin variant
+        reveals the character behind the poster's name; on an anonymous board the public
+        variant carries the board's anonymous name instead.
+        """
+        return (cls(poster_name=anonymous_name or poster_name, **kwargs),
+                cls(character_name=character_name, poster_name=poster_name, **kwargs))
+
+    @property
+    def poster(self) -> str:
+        if self.character_name and self.character_name != self.poster_name:
+            return f"{self.poster_name} ({self.character_name})"
+        return self.poster_name
+
 
 class BoardPostCreate(_PostEvent):
 
-    async def handle_event(self, conn: "BaseConnection"):
-        await conn.send_rich(self.format_message(f"{self.poster_name} posted {self.post_key} '{self.post_title}'."))
+    def render_message(self) -> str:
+        return f"{self.poster} posted {self.post_key} '{self.post_title}'."
 
 
 class BoardReplyCreate(_PostEvent):
 
-    async def handle_event(self, conn: "BaseConnection"):
-        await conn.send_rich(self.format_message(f"{self.character_name} replied with {self.post_key} '{self.post_title}'."))
+    def render_message(self) -> str:
+        return f"{self.poster} replied with {self.post_key} '{self.post_title}'."
 
 class BoardPostDelete(_PostEvent):
     enactor: str
 
-    async def handle_event(self, conn: "BaseConnection"):
-        await conn.send_rich(self.format_message(f"Post {self.post_key} '{self.post_title}' deleted by {self.enactor}."))
+    def render_message(self) -> str:
+        return f"Post {self.post_key} '{self.post_title}' deleted by {self.enactor}."
 
 
 class BoardPostUpdate(_PostEvent):
     enactor: str
     changes: dict[str, tuple[str | None, str | None]]
 
-    async def handle_event(self, conn: "BaseConnection"):
+    def render_message(self) -> str:
         change_str = ", ".join([f"{k} changed from {v[0]} to {v[1]}" for k, v in self.changes.items()])
-        await conn.send_rich(self.format_message(f"Post {self.post_key} '{self.post_title}' updated by {self.enactor}. {change_str}."))
\ No newline at end of file
+        return f"Post {self.post_key} '{self.post_title}' updated by {self.enactor}. {change_str}."
@@ -0,0 +1,29 @@
+import typing
+from pydantic import Field
+from mudforge.events.base import EventBase
+from rich.markup import escape
+
+
+class ChannelMessage(EventBase):
+    channel_name: str
+    speaker: str
+    message: str
+    # Rendered once when the event is created; see events.boards.
+    rendered: str | None = Field(default=None, exclude=True)
+
+    def model_post_init(self, __context: typing.Any):
+        super().model_post_init(__context)
+        if self.rendered is None:
+            self.rendered = self.render_message()
+
+    def render_message(self) -> str:
+        header = f"[bold]{escape(f'[{self.channel_name}]')}[/]"
+        # MUSH convention: a leading : poses and a leading ; poses without a space.
+        if self.message.startswith(":"):
+            return f"{header} {escape(self.speaker)} {self.message[1:]}"
+        if self.message.startswith(";"):
+            return f"{header} {escape(self.speaker)}{self.message[1:]}"
+        return f"{header} {escape(self.speaker)}: {self.message}"
+
+    async def handle_event(self, conn: "BaseConnection"):
+        await conn.send_rich(self.rendered)
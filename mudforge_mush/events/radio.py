@@ -0,0 +1,20 @@
+import typing
+from pydantic import Field
+from mudforge.events.base import EventBase
+from rich.markup import escape
+
+
+class RadioMessage(EventBase):
+    frequency: str
+    speaker: str
+    message: str
+    # Rendered once when the event is created; see events.boards.
+    rendered: str | None = Field(default=None, exclude=True)
+
+    def model_post_init(self, __context: typing.Any):
+        super().model_post_init(__context)
+        if self.rendered is None:
+            self.rendered = f"[bold]{escape(f'[Radio {self.frequency}]')}[/] {escape(self.speaker)}: {self.message}"
+
+    async def handle_event(self, conn: "BaseConnection"):
+        await conn.send_rich(self.rendered)
@@ -25,22 +25,10 @@ class FactionModel(SoftDeleteMixin):
     public_permissions: set[str]
 
     async def has_permission(self, character: "CharacterModel", permission: str) -> bool:
-        from .factions import get_membership
-        if not (membership_data := await get_membership(self, character)):
+        from mudforge_mush.db.factions import get_effective_permissions
+        if not (effective := await get_effective_permissions(self, character)):
             return False
-        # Leaders pass everything.
-        if membership_data["rank"] <= 1:
-            return True
-        access = permission.lower()
-        permissions = set()
-        permissions.update(self.member_permissions)
-        permissions.update(self.public_permissions)
-        permissions.update(membership_data["rank_permissions"])
-        permissions.update(membership_data["permissions"])
-        if access in permissions:
-            return True
-
-        return False
+        return effective.allows(permission)
     
     async def check_permission(self, acting: ActiveAs, permission: str) -> bool:
         if acting.user.admin_level > 4:
@@ -1,4 +1,29 @@
 from mudforge.game.lockhandler import LockArguments
 
-async def faction(args: LockArguments):
-    pass
\ No newline at end of file
+from mudforge_mush.db.factions import FACTION_CATALOG, prefetch_memberships, get_effective_permissions
+
+
+async def faction(args: LockArguments) -> bool:
+    """
+    faction(ABBR) passes for members of the faction.
+    faction(ABBR, 3) passes for members of rank 3 or better; lower rank numbers are senior.
+    faction(ABBR, permission) passes for members holding that faction permission.
+
+    All of the character's memberships are fetched together and cached, so every
+    faction clause in a lock is answered by the first clause's query.
+    """
+    if not args.args:
+        return False
+    if (faction_model := await FACTION_CATALOG.find_abbreviation(args.args[0].strip())) is None:
+        return False
+    character = args.acting.character
+    memberships = await prefetch_memberships([character.id])
+    if faction_model.id not in memberships[character.id]:
+        return False
+    if len(args.args) < 2 or not (requirement := args.args[1].strip()):
+        return True
+    if (effective := await get_effective_permissions(faction_model, character)) is None:
+        return False
+    if requirement.isdigit():
+        return effective.rank <= int(requirement)
+    return effective.allows(requirement)
@@ -0,0 +1,404 @@
+"""
+Bulk importer for Myrddin's BBS, as run on PennMUSH and TinyMUX.
+
+The input is an @decompile dump of the board objects, which both servers can produce:
+
+    @create Announcements
+    &HDR_1 Announcements=Welcome!|Mon Jan 01 12:00:00 2001|#123|978350400
+    &BDY_1 Announcements=Hello and welcome.%r%rEnjoy your stay.
+
+The dump is parsed as a stream: lines become attributes, attributes become posts, and
+posts are loaded in batches with COPY. Each batch commits together with a checkpoint, so
+an interrupted import resumes where it stopped when run again with the same --source.
+
+    python -m mudforge_mush.importers.myrddin --dsn postgresql://localhost/mush \\
+        --file bboards.txt --posters posters.json --fallback Archivist
+
+--posters is a JSON object mapping legacy dbrefs to character names. Posts by anyone not
+in it, or whose character doesn't exist here, are attributed to the --fallback character
+under a spoof carrying the legacy name, so the board still shows who wrote them.
+
+Every post is validated the same way as one made through the API; posts that still fail
+after normalising are logged and skipped rather than failing their batch.
+"""
+import argparse
+import asyncio
+import dataclasses
+import datetime
+import itertools
+import json
+import logging
+import os
+import re
+import time
+import typing
+import uuid
+
+import asyncpg
+import pydantic
+from asyncpg import Connection
+from rich.markup import escape
+
+from mudforge_mush.db.boards import RENDER_VERSION, render_body
+from mudforge_mush.db.queries import declare
+from mudforge_mush.models.boards import PostCreate
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("board_id", "post_order", "sub_order", "spoof_id", "title", "body", "created_at", "updated_at",
+           "body_ansi", "body_plain", "render_version")
+
+_ATTRIBUTE = re.compile(r"^&(?P<attr>[^\s]+)\s+(?P<target>[^=]+?)=(?P<value>.*)$")
+_POST_ATTRIBUTE = re.compile(r"^(?P<kind>HDR|BDY)_(?P<number>\d+)$", re.IGNORECASE)
+_SUBSTITUTIONS = {"r": "\n", "t": "\t", "b": " ", "%": "%"}
+_DATE_FORMATS = ("%a %b %d %H:%M:%S %Y", "%m/%d/%Y", "%m/%d/%y", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d")
+
+# Legacy titles are cut to this many characters. Titles are stored in unique_post_order's
+# INCLUDE columns, so one overlong title could exceed the index's row size and abort a batch.
+MAX_TITLE_LENGTH = 200
+
+
+@dataclasses.dataclass(slots=True)
+class LegacyPost:
+    board: str
+    number: int
+    title: str
+    poster: str
+    created_at: datetime.datetime | None
+    body: str = ""
+
+
+class Progress:
+    """
+    Bytes read from the dump and posts seen, for reporting how far along an import is.
+    """
+
+    def __init__(self, total_bytes: int = 0):
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.posts = 0
+        self.orphaned = 0
+        self.rejected = 0
+        self.started = time.perf_counter()
+
+    def report(self, loaded: int, done: int):
+        """
+        loaded is the posts loaded by this run, which the rate is taken from; done also
+        counts those loaded by earlier runs of a resumed import.
+        """
+        elapsed = time.perf_counter() - self.started
+        percent = f"{self.bytes_read / self.total_bytes:.1%}" if self.total_bytes else "?"
+        logger.info("%s read, %d posts done (%d this run, %d rejected), %.0f posts/s", percent, done, loaded,
+                    self.rejected, loaded / elapsed if elapsed else 0.0)
+
+
+def unescape(value: str) -> str:
+    """
+    Undo @decompile's escaping: %r, %t, %b and %% substitutions and backslash escapes.
+    Other % codes, such as colour, are left for whoever renders the post.
+    """
+    out = list()
+    chars = iter(value)
+    for c in chars:
+        if c == "\\":
+            out.append(next(chars, ""))
+        elif c == "%":
+            code = next(chars, "")
+            if (sub := _SUBSTITUTIONS.get(code.lower())) is not None:
+                out.append(sub)
+            else:
+                out.append(c + code)
+        else:
+            out.append(c)
+    return "".join(out)
+
+
+def parse_timestamp(fields: typing.Iterable[str]) -> datetime.datetime | None:
+    """
+    Myrddin versions differ in what the header holds after the title; prefer epoch
+    seconds when present, then any recognizable date.
+    """
+    dates = list()
+    for field in fields:
+        if field.isdigit() and len(field) >= 9:
+            return datetime.datetime.fromtimestamp(int(field), tz=datetime.timezone.utc)
+        dates.append(field)
+    for field in dates:
+        for fmt in _DATE_FORMATS:
+            try:
+                return datetime.datetime.strptime(field, fmt).replace(tzinfo=datetime.timezone.utc)
+            except ValueError:
+                continue
+    return None
+
+
+def parse_header(value: str) -> tuple[str, str, datetime.datetime | None]:
+    """
+    Returns the title, the poster's dbref (or "" if none is recorded) and when it was posted.
+    """
+    fields = [field.strip() for field in value.split("|")]
+    title = fields[0] or "(untitled)"
+    poster = next((field for field in fields[1:] if re.fullmatch(r"#\d+", field)), "")
+    return title, poster, parse_timestamp(field for field in fields[1:] if field != poster)
+
+
+def read_lines(path: str, progress: Progress, encoding: str = "utf-8") -> typing.Iterator[str]:
+    with open(path, "rb") as f:
+        for raw in f:
+            progress.bytes_read += len(raw)
+            yield raw.decode(encoding, errors="replace").rstrip("\r\n")
+
+
+def parse_attributes(lines: typing.Iterable[str]) -> typing.Iterator[tuple[str, str, str]]:
+    """
+    Yields (board name, attribute, raw value) for every attribute set in the dump.
+    Objects referenced by dbref are named through any @name seen earlier.
+    """
+    names: dict[str, str] = dict()
+    for line in lines:
+        if line.startswith("@create "):
+            name = line[8:].split("=", 1)[0].strip()
+            names[name] = name
+        elif line.startswith("@name "):
+            target, _, name = line[6:].partition("=")
+            names[target.strip()] = name.strip()
+        elif (match := _ATTRIBUTE.match(line)):
+            target = match["target"].strip()
+            yield names.get(target, target), match["attr"], match["value"]
+
+
+def parse_posts(attributes: typing.Iterable[tuple[str, str, str]], progress: Progress) -> typing.Iterator[LegacyPost]:
+    """
+    Pair each HDR_n with its BDY_n. A post is yielded as soon as both halves have been
+    seen, so only posts whose halves are apart in the dump are held in memory.
+    """
+    headers: dict[tuple[str, int], LegacyPost] = dict()
+    bodies: dict[tuple[str, int], str] = dict()
+    for board, attr, value in attributes:
+        if not (match := _POST_ATTRIBUTE.match(attr)):
+            continue
+        key = (board, int(match["number"]))
+        if match["kind"].upper() == "HDR":
+            title, poster, created_at = parse_header(unescape(value))
+            post = LegacyPost(board, key[1], title, poster, created_at)
+            if (body := bodies.pop(key, None)) is None:
+                headers[key] = post
+                continue
+            post.body = body
+        else:
+            if (post := headers.pop(key, None)) is None:
+                bodies[key] = unescape(value)
+                continue
+            post.body = unescape(value)
+        progress.posts += 1
+        yield post
+    # Headers without a body still make a post; bodies without a header can't.
+    for post in headers.values():
+        progress.posts += 1
+        yield post
+    if bodies:
+        progress.orphaned += len(bodies)
+        logger.warning("Skipped %d bodies with no header.", len(bodies))
+
+
+def validate(post: LegacyPost) -> LegacyPost | None:
+    """
+    Normalise a legacy post and validate it as PostCreate would validate a new one.
+    Legacy text is not Rich markup, so brackets in the body are escaped. Returns None,
+    after logging why, for a post that still fails.
+    """
+    title = " ".join(post.title.split())[:MAX_TITLE_LENGTH] or "(untitled)"
+    try:
+        checked = PostCreate(title=title, body=escape(post.body))
+    except pydantic.ValidationError as err:
+        logger.warning("Skipped post %d on %s: %s", post.number, post.board,
+                       "; ".join(error["msg"] for error in err.errors()))
+        return None
+    return dataclasses.replace(post, title=checked.title, body=checked.body)
+
+
+def batched(items: typing.Iterable, size: int) -> typing.Iterator[list]:
+    iterator = iter(items)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+GET_CHECKPOINT = declare("importers.get_checkpoint", "SELECT * FROM board_imports WHERE source = $1")
+SAVE_CHECKPOINT = declare(
+    "importers.save_checkpoint",
+    "INSERT INTO board_imports (source, posts_done, boards) VALUES ($1, $2, $3::jsonb) "
+    "ON CONFLICT (source) DO UPDATE SET posts_done = EXCLUDED.posts_done, boards = EXCLUDED.boards, "
+    "updated_at = now()")
+FINISH_CHECKPOINT = declare("importers.finish_checkpoint",
+                            "UPDATE board_imports SET finished_at = now() WHERE source = $1")
+FIND_BOARD = declare(
+    "importers.find_board",
+    "SELECT b.id, COALESCE(c.last_value, 0) AS last_value FROM boards b "
+    "LEFT JOIN board_post_counters c ON c.board_id = b.id AND c.post_order = 0 "
+    "WHERE b.name = $1 AND b.faction_id IS NULL AND b.deleted_at IS NULL")
+CREATE_BOARD = declare(
+    "importers.create_board",
+    "INSERT INTO boards (name, board_order) "
+    "SELECT $1, COALESCE(MAX(board_order), 0) + 1 FROM boards WHERE faction_id IS NULL AND deleted_at IS NULL "
+    "RETURNING id")
+FIND_CHARACTERS = declare("importers.find_characters", "SELECT id, name FROM characters WHERE name = ANY($1::text[])")
+UPSERT_SPOOFS = declare(
+    "importers.upsert_spoofs",
+    "INSERT INTO character_spoofs (character_id, spoofed_name) "
+    "SELECT * FROM unnest($1::uuid[], $2::text[]) "
+    "ON CONFLICT (character_id, spoofed_name) DO UPDATE SET updated_at = character_spoofs.updated_at "
+    "RETURNING id, character_id, spoofed_name")
+ADVANCE_COUNTERS = declare(
+    "importers.advance_counters",
+    "INSERT INTO board_post_counters (board_id, post_order, last_value) "
+    "SELECT board_id, 0, last_value FROM unnest($1::int[], $2::int[]) AS t(board_id, last_value) "
+    "ON CONFLICT (board_id, post_order) DO UPDATE "
+    "SET last_value = GREATEST(board_post_counters.last_value, EXCLUDED.last_value)")
+
+
+class Resolver:
+    """
+    Maps legacy boards and posters to rows here, creating boards and spoofs as they are
+    first met. Posts keep their legacy numbers, shifted past any posts an existing board
+    of the same name already had.
+    """
+
+    def __init__(self, posters: dict[str, str], fallback: uuid.UUID, boards: dict[str, dict]):
+        self.posters = posters
+        self.fallback = fallback
+        self.boards = boards
+        # Names are CITEXT, so both maps are keyed case-insensitively.
+        self.characters: dict[str, uuid.UUID] = dict()
+        self.spoofs: dict[tuple[uuid.UUID, str], int] = dict()
+
+    def spoof_key(self, poster: str) -> tuple[str, str]:
+        """
+        The character name to post as and the name to show, for a legacy dbref.
+        """
+        name = self.posters.get(poster)
+        return (name or "").lower(), name or (f"Unknown {poster}" if poster else "Unknown")
+
+    async def prepare(self, conn: Connection, posts: list[LegacyPost]):
+        for board in dict.fromkeys(post.board for post in posts):
+            if board in self.boards:
+                continue
+            if (found := await FIND_BOARD.fetchrow(conn, board)):
+                self.boards[board] = {"board_id": found["id"], "offset": found["last_value"]}
+            else:
+                self.boards[board] = {"board_id": await CREATE_BOARD.fetchval(conn, board), "offset": 0}
+
+        wanted = {name for post in posts if (name := self.posters.get(post.poster))
+                  and name.lower() not in self.characters}
+        if wanted:
+            for row in await FIND_CHARACTERS.fetch(conn, list(wanted)):
+                self.characters[row["name"].lower()] = row["id"]
+
+        missing = dict()
+        for post in posts:
+            name, shown = self.spoof_key(post.poster)
+            key = (self.characters.get(name, self.fallback), shown.lower())
+            if key not in self.spoofs:
+                missing[key] = shown
+        if missing:
+            character_ids = [character_id for character_id, lowered in missing]
+            for row in await UPSERT_SPOOFS.fetch(conn, character_ids, list(missing.values())):
+                self.spoofs[(row["character_id"], row["spoofed_name"].lower())] = row["id"]
+
+    def record(self, post: LegacyPost, now: datetime.datetime) -> tuple:
+        board = self.boards[post.board]
+        name, shown = self.spoof_key(post.poster)
+        spoof_id = self.spoofs[(self.characters.get(name, self.fallback), shown.lower())]
+        created_at = post.created_at or now
+        # Rendered as it is loaded, as the API renders new posts, so no imported post is
+        # rendered again on its first read.
+        body_ansi, body_plain = render_body(post.body, strict=False)
+        return (board["board_id"], board["offset"] + post.number, 0, spoof_id, post.title, post.body,
+                created_at, created_at, body_ansi, body_plain, RENDER_VERSION)
+
+
+async def load_batch(conn: Connection, source: str, resolver: Resolver, posts: list[LegacyPost], done: int,
+                     progress: Progress) -> tuple[int, int]:
+    """
+    Load one batch and record the checkpoint in the same transaction. Returns the new
+    number of posts done, which counts rejected posts so a resumed import skips them too,
+    and how many were loaded.
+    """
+    now = datetime.datetime.now(datetime.timezone.utc)
+    valid = [checked for post in posts if (checked := validate(post)) is not None]
+    progress.rejected += len(posts) - len(valid)
+    async with conn.transaction():
+        if valid:
+            await resolver.prepare(conn, valid)
+            records = [resolver.record(post, now) for post in valid]
+            await conn.copy_records_to_table("board_posts", records=records, columns=COLUMNS)
+            highest: dict[int, int] = dict()
+            for record in records:
+                highest[record[0]] = max(highest.get(record[0], 0), record[1])
+            await ADVANCE_COUNTERS.execute(conn, list(highest), list(highest.values()))
+        done += len(posts)
+        await SAVE_CHECKPOINT.execute(conn, source, done, json.dumps(resolver.boards))
+    return done, len(valid)
+
+
+async def import_dump(conn: Connection, path: str, source: str, posters: dict[str, str], fallback: uuid.UUID,
+                      batch_size: int = 5000, encoding: str = "utf-8") -> int:
+    """
+    Import a Myrddin dump, resuming from source's checkpoint if it has one. Returns the
+    number of posts loaded by this run.
+    """
+    checkpoint = await GET_CHECKPOINT.fetchrow(conn, source)
+    done = checkpoint["posts_done"] if checkpoint else 0
+    boards = checkpoint["boards"] if checkpoint else dict()
+    if isinstance(boards, str):
+        boards = json.loads(boards)
+    if checkpoint and checkpoint["finished_at"]:
+        logger.info("%s was already imported; nothing to do.", source)
+        return 0
+    if done:
+        logger.info("Resuming %s after %d posts.", source, done)
+
+    progress = Progress(os.path.getsize(path))
+    resolver = Resolver(posters, fallback, boards)
+    posts = parse_posts(parse_attributes(read_lines(path, progress, encoding)), progress)
+    loaded = 0
+    for batch in batched(itertools.islice(posts, done, None), batch_size):
+        done, count = await load_batch(conn, source, resolver, batch, done, progress)
+        loaded += count
+        progress.report(loaded, done)
+    await FINISH_CHECKPOINT.execute(conn, source)
+    logger.info("Finished %s after %d posts (%d loaded this run, %d rejected).", source, done, loaded,
+                progress.rejected)
+    return loaded
+
+
+async def main_async(args: argparse.Namespace):
+    posters = dict()
+    if args.posters:
+        with open(args.posters) as f:
+            posters = json.load(f)
+    conn = await asyncpg.connect(args.dsn)
+    try:
+        if (fallback := await conn.fetchval("SELECT id FROM characters WHERE name = $1", args.fallback)) is None:
+            raise SystemExit(f"No character named {args.fallback} to attribute unknown posters to.")
+        await import_dump(conn, args.file, args.source or os.path.basename(args.file), posters, fallback,
+                          args.batch_size, args.encoding)
+    finally:
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dsn", required=True)
+    parser.add_argument("--file", required=True, help="The @decompile dump of the board objects.")
+    parser.add_argument("--source", help="Checkpoint name; defaults to the dump's file name.")
+    parser.add_argument("--posters", help="JSON file mapping legacy dbrefs to character names.")
+    parser.add_argument("--fallback", required=True, help="Character to attribute unmapped posters to.")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
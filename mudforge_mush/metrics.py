@@ -0,0 +1,137 @@
+import bisect
+import typing
+
+# Upper bounds in seconds, from half a millisecond to ten seconds.
+DEFAULT_BOUNDS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram. Observing a value is a bisect and two additions, cheap
+    enough to leave on everywhere. Buckets are non-cumulative here and summed when
+    exported.
+    """
+    __slots__ = ("bounds", "counts", "count", "total")
+
+    def __init__(self, bounds: typing.Sequence[float] = DEFAULT_BOUNDS):
+        self.bounds = tuple(bounds)
+        # One extra bucket for values above the last bound.
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q: float) -> float:
+        """
+        The upper bound of the bucket holding the q-th quantile; an estimate, never an
+        underestimate except above the last bound.
+        """
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return self.bounds[-1]
+
+    def snapshot(self) -> dict[str, typing.Any]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+# Bounds for counts rather than seconds: round trips per request, recipients per fan-out.
+COUNT_BOUNDS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250, 500, 1000, 2500)
+
+
+class RouteMetrics:
+    """
+    Everything recorded for one route: request latency, database round trips per
+    request, and responses by status code.
+    """
+    __slots__ = ("name", "method", "path", "latency", "round_trips", "statuses")
+
+    def __init__(self, name: str, method: str, path: str):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.latency = Histogram()
+        self.round_trips = Histogram(COUNT_BOUNDS)
+        self.statuses: dict[int, int] = dict()
+
+    def observe(self, elapsed: float, round_trips: int, status_code: int):
+        self.latency.observe(elapsed)
+        self.round_trips.observe(round_trips)
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+
+# Keyed by (method, endpoint's qualified name). The path template alone is ambiguous,
+# since it may or may not include the router's mount prefix.
+ROUTES: dict[tuple[str, str], RouteMetrics] = dict()
+
+
+def route(name: str, method: str, path: str) -> RouteMetrics:
+    if (metrics := ROUTES.get((method, name), None)) is None:
+        metrics = ROUTES[(method, name)] = RouteMetrics(name, method, path)
+    return metrics
+
+
+class FanoutMetrics:
+    __slots__ = ("recipients", "duration", "failures")
+
+    def __init__(self):
+        self.recipients = Histogram(COUNT_BOUNDS)
+        self.duration = Histogram()
+        self.failures = 0
+
+    def observe(self, recipients: int, duration: float, failures: int):
+        self.recipients.observe(recipients)
+        self.duration.observe(duration)
+        self.failures += failures
+
+
+# Keyed by event class name.
+FANOUTS: dict[str, FanoutMetrics] = dict()
+
+
+def fanout(event: str) -> FanoutMetrics:
+    if (metrics := FANOUTS.get(event, None)) is None:
+        metrics = FANOUTS[event] = FanoutMetrics()
+    return metrics
+
+
+def _escape(value: typing.Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: dict[str, typing.Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def histogram_lines(name: str, histogram: Histogram, labels: dict[str, typing.Any]) -> typing.Iterator[str]:
+    """
+    A histogram in the Prometheus text exposition format, with cumulative buckets.
+    """
+    seen = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        seen += count
+        yield f"{name}_bucket{_labels({**labels, 'le': bound})} {seen}"
+    yield f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {histogram.count}"
+    yield f"{name}_sum{_labels(labels)} {histogram.total}"
+    yield f"{name}_count{_labels(labels)} {histogram.count}"
+
+
+def sample_line(name: str, value: typing.Any, labels: dict[str, typing.Any]) -> str:
+    return f"{name}{_labels(labels)} {value}"
@@ -0,0 +1,47 @@
+BEGIN TRANSACTION;
+
+-- Lightweight change feed for the in-process faction permission cache.
+-- Payloads only carry keys, so they stay well under the NOTIFY size limit.
+CREATE OR REPLACE FUNCTION mush_faction_notify() RETURNS TRIGGER AS $$
+DECLARE
+    row_data JSONB;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := to_jsonb(OLD);
+    ELSE
+        row_data := to_jsonb(NEW);
+    END IF;
+
+    IF TG_TABLE_NAME = 'factions' THEN
+        PERFORM pg_notify('mush_factions', json_build_object('table', TG_TABLE_NAME,
+                                                             'faction_id', row_data->'id')::text);
+    ELSE
+        PERFORM pg_notify('mush_factions', json_build_object('table', TG_TABLE_NAME,
+                                                             'faction_id', row_data->'faction_id',
+                                                             'character_id', row_data->'character_id')::text);
+    END IF;
+
+    -- A member moved between factions or characters must invalidate the old key too.
+    IF TG_OP = 'UPDATE' AND TG_TABLE_NAME = 'faction_members' THEN
+        row_data := to_jsonb(OLD);
+        PERFORM pg_notify('mush_factions', json_build_object('table', TG_TABLE_NAME,
+                                                             'faction_id', row_data->'faction_id',
+                                                             'character_id', row_data->'character_id')::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER factions_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON factions
+    FOR EACH ROW EXECUTE FUNCTION mush_faction_notify();
+
+CREATE TRIGGER faction_ranks_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON faction_ranks
+    FOR EACH ROW EXECUTE FUNCTION mush_faction_notify();
+
+CREATE TRIGGER faction_members_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON faction_members
+    FOR EACH ROW EXECUTE FUNCTION mush_faction_notify();
+
+COMMIT;
@@ -0,0 +1,25 @@
+BEGIN TRANSACTION;
+
+-- Post numbers are handed out from counter rows rather than MAX() scans.
+CREATE TABLE board_post_counters
+(
+    board_id   INT NOT NULL,
+    -- 0 holds the board's next top-level post number, any other value is that thread's reply counter.
+    post_order INT NOT NULL,
+    last_value INT NOT NULL,
+    PRIMARY KEY (board_id, post_order),
+    CONSTRAINT fk_board
+        FOREIGN KEY (board_id) REFERENCES boards (id) ON DELETE CASCADE
+);
+
+INSERT INTO board_post_counters (board_id, post_order, last_value)
+SELECT board_id, 0, MAX(post_order)
+FROM board_posts
+GROUP BY board_id;
+
+INSERT INTO board_post_counters (board_id, post_order, last_value)
+SELECT board_id, post_order, MAX(sub_order)
+FROM board_posts
+GROUP BY board_id, post_order;
+
+COMMIT;
@@ -0,0 +1,47 @@
+BEGIN TRANSACTION;
+
+-- The board catalog's version, shared by every process. It is bumped inside the
+-- transaction that changes the catalog, so a version always names the same contents.
+CREATE TABLE board_catalog_version
+(
+    only_row BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (only_row),
+    version  BIGINT  NOT NULL
+);
+
+INSERT INTO board_catalog_version (only_row, version) VALUES (TRUE, 1);
+
+-- Change feed for the in-process board catalog.
+CREATE OR REPLACE FUNCTION mush_board_notify() RETURNS TRIGGER AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    UPDATE board_catalog_version SET version = version + 1 RETURNING version INTO new_version;
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('mush_boards', json_build_object('board_id', OLD.id, 'version', new_version)::text);
+    ELSE
+        PERFORM pg_notify('mush_boards', json_build_object('board_id', NEW.id, 'version', new_version)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER boards_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON boards
+    FOR EACH ROW EXECUTE FUNCTION mush_board_notify();
+
+-- Board keys and faction names in the catalog come from the faction row.
+CREATE OR REPLACE FUNCTION mush_board_catalog_faction() RETURNS TRIGGER AS $$
+DECLARE
+    new_version BIGINT;
+BEGIN
+    UPDATE board_catalog_version SET version = version + 1 RETURNING version INTO new_version;
+    PERFORM pg_notify('mush_boards', json_build_object('faction_id', OLD.id, 'version', new_version)::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER factions_board_catalog
+    AFTER UPDATE OR DELETE ON factions
+    FOR EACH ROW EXECUTE FUNCTION mush_board_catalog_faction();
+
+COMMIT;
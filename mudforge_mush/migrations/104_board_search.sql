@@ -0,0 +1,12 @@
+BEGIN TRANSACTION;
+
+-- Full-text search over board posts. As a stored generated column, the vector is
+-- maintained by every INSERT and UPDATE of title/body.
+ALTER TABLE board_posts
+    ADD COLUMN search_vector TSVECTOR
+        GENERATED ALWAYS AS (setweight(to_tsvector('english', title), 'A') ||
+                             setweight(to_tsvector('english', body), 'B')) STORED;
+
+CREATE INDEX board_posts_search ON board_posts USING GIN (search_vector) WHERE deleted_at IS NULL;
+
+COMMIT;
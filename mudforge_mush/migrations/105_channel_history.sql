@@ -0,0 +1,6 @@
+BEGIN TRANSACTION;
+
+-- Recall loads the newest lines of a channel when its history ring is first filled.
+CREATE INDEX channel_messages_recent ON channel_messages (channel_id, id DESC);
+
+COMMIT;
@@ -0,0 +1,9 @@
+BEGIN TRANSACTION;
+
+-- Frequencies are tuned by number. Named frequencies may still exist without one.
+ALTER TABLE frequencies ADD COLUMN frequency NUMERIC(9, 3) NULL;
+CREATE UNIQUE INDEX unique_frequency_number ON frequencies (frequency) WHERE frequency IS NOT NULL;
+
+CREATE UNIQUE INDEX unique_frequency_member ON frequency_members (frequency_id, character_id);
+
+COMMIT;
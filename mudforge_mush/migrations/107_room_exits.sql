@@ -0,0 +1,23 @@
+BEGIN TRANSACTION;
+
+CREATE TABLE room_exits
+(
+    id             SERIAL PRIMARY KEY,
+    room_id        INT       NOT NULL,
+    destination_id INT       NOT NULL,
+    name           CITEXT    NOT NULL,
+    created_at     TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at     TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_room
+        FOREIGN KEY (room_id) REFERENCES region_rooms (id) ON DELETE CASCADE,
+    CONSTRAINT fk_destination
+        FOREIGN KEY (destination_id) REFERENCES region_rooms (id) ON DELETE CASCADE
+);
+
+CREATE UNIQUE INDEX unique_room_exit ON room_exits (room_id, name);
+
+CREATE TRIGGER room_exits_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON room_exits
+    FOR EACH ROW EXECUTE FUNCTION notify_table_change();
+
+COMMIT;
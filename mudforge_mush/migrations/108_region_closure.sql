@@ -0,0 +1,71 @@
+BEGIN TRANSACTION;
+
+-- Every (ancestor, descendant) pair of the region tree, including each region paired
+-- with itself at depth 0. "Is B inside A?" and "everything under A" are single
+-- lookups on the primary key or on the descendant index.
+CREATE TABLE region_closure
+(
+    ancestor_id   INT NOT NULL,
+    descendant_id INT NOT NULL,
+    depth         INT NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    CONSTRAINT fk_ancestor
+        FOREIGN KEY (ancestor_id) REFERENCES regions (id) ON DELETE CASCADE,
+    CONSTRAINT fk_descendant
+        FOREIGN KEY (descendant_id) REFERENCES regions (id) ON DELETE CASCADE
+);
+
+CREATE INDEX region_closure_descendant ON region_closure (descendant_id, ancestor_id);
+
+WITH RECURSIVE tree AS (
+    SELECT id AS ancestor_id, id AS descendant_id, 0 AS depth FROM regions
+    UNION ALL
+    SELECT tree.ancestor_id, r.id, tree.depth + 1
+    FROM tree
+    JOIN regions r ON r.parent_id = tree.descendant_id
+)
+INSERT INTO region_closure (ancestor_id, descendant_id, depth)
+SELECT ancestor_id, descendant_id, depth FROM tree;
+
+CREATE INDEX region_rooms_region ON region_rooms (region_id);
+
+-- Keeps region_closure in step with regions.parent_id. Re-parenting only touches the
+-- rows linking the moved subtree to its old and new ancestors.
+CREATE OR REPLACE FUNCTION mush_region_closure() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO region_closure (ancestor_id, descendant_id, depth)
+        SELECT ancestor_id, NEW.id, depth + 1 FROM region_closure WHERE descendant_id = NEW.parent_id
+        UNION ALL
+        SELECT NEW.id, NEW.id, 0;
+    ELSIF TG_OP = 'UPDATE' AND NEW.parent_id IS DISTINCT FROM OLD.parent_id THEN
+        IF NEW.parent_id IS NOT NULL AND EXISTS (
+            SELECT 1 FROM region_closure WHERE ancestor_id = NEW.id AND descendant_id = NEW.parent_id
+        ) THEN
+            RAISE EXCEPTION 'region % cannot be moved beneath its own descendant %', NEW.id, NEW.parent_id
+                USING ERRCODE = 'check_violation';
+        END IF;
+        DELETE FROM region_closure
+        WHERE descendant_id IN (SELECT descendant_id FROM region_closure WHERE ancestor_id = NEW.id)
+          AND ancestor_id IN (SELECT ancestor_id FROM region_closure WHERE descendant_id = NEW.id AND ancestor_id <> NEW.id);
+        INSERT INTO region_closure (ancestor_id, descendant_id, depth)
+        SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+        FROM region_closure above
+        CROSS JOIN region_closure below
+        WHERE above.descendant_id = NEW.parent_id AND below.ancestor_id = NEW.id;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('mush_regions', json_build_object('region_id', OLD.id, 'deleted', true)::text);
+    ELSE
+        PERFORM pg_notify('mush_regions', json_build_object('region_id', NEW.id, 'parent_id', NEW.parent_id)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER regions_mush_closure
+    AFTER INSERT OR UPDATE OR DELETE ON regions
+    FOR EACH ROW EXECUTE FUNCTION mush_region_closure();
+
+COMMIT;
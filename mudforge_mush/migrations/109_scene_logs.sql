@@ -0,0 +1,37 @@
+BEGIN TRANSACTION;
+
+-- Poses of scenes still in progress. Rows are appended with COPY in batches and
+-- removed once the scene is compacted into scene_logs.
+CREATE TABLE scene_poses
+(
+    id             BIGSERIAL PRIMARY KEY,
+    scene_id       INT         NOT NULL,
+    character_id   UUID        NOT NULL,
+    character_name TEXT        NOT NULL,
+    pose           TEXT        NOT NULL,
+    created_at     TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_scene
+        FOREIGN KEY (scene_id) REFERENCES scenes (id) ON DELETE CASCADE,
+    CONSTRAINT fk_character
+        FOREIGN KEY (character_id) REFERENCES characters (id) ON DELETE CASCADE
+);
+
+CREATE INDEX scene_poses_scene ON scene_poses (scene_id, created_at, id);
+
+-- A finished scene's poses as one zlib-compressed blob of JSON lines.
+CREATE TABLE scene_logs
+(
+    scene_id   INT         PRIMARY KEY,
+    pose_count INT         NOT NULL,
+    log_size   BIGINT      NOT NULL,
+    log_data   BYTEA       NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT fk_scene
+        FOREIGN KEY (scene_id) REFERENCES scenes (id) ON DELETE CASCADE
+);
+
+-- The blob is already compressed; store it uncompressed out of line so substring()
+-- reads only the requested slice.
+ALTER TABLE scene_logs ALTER COLUMN log_data SET STORAGE EXTERNAL;
+
+COMMIT;
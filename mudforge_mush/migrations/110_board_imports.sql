@@ -0,0 +1,16 @@
+BEGIN TRANSACTION;
+
+-- Checkpoints for bulk imports of legacy board data. A row is updated in the same
+-- transaction as each batch it records, so a resumed import skips exactly what was loaded.
+CREATE TABLE board_imports
+(
+    source      TEXT        PRIMARY KEY,
+    posts_done  BIGINT      NOT NULL DEFAULT 0,
+    -- Legacy board reference -> {"board_id": ..., "offset": ...}.
+    boards      JSONB       NOT NULL DEFAULT json_object(),
+    created_at  TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    updated_at  TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMPTZ NULL
+);
+
+COMMIT;
@@ -0,0 +1,79 @@
+BEGIN TRANSACTION;
+
+-- Cold storage for board posts. Soft-deleted posts, and threads whose newest post is older
+-- than their board's retention, are moved here in batches by the background archiver, so
+-- board_posts and its indexes hold only live data.
+--
+-- This is a separate table rather than a partition of board_posts: partitioning would need
+-- the partition key in board_posts' primary key, and so in board_posts_read's foreign key
+-- and in unique_post_order, and a soft delete would become a cross-partition row move.
+CREATE TABLE board_posts_archive
+(
+    id             BIGINT      PRIMARY KEY,
+    board_id       INT         NOT NULL,
+    post_order     INT         NOT NULL,
+    sub_order      INT         NOT NULL,
+    spoof_id       INT         NOT NULL,
+    title          TEXT        NOT NULL,
+    body           TEXT        NOT NULL,
+    created_at     TIMESTAMPTZ NOT NULL,
+    updated_at     TIMESTAMPTZ NOT NULL,
+    deleted_at     TIMESTAMPTZ NULL,
+    archived_at    TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    -- 'deleted' or 'retention'.
+    archive_reason TEXT        NOT NULL,
+    CONSTRAINT fk_board
+        FOREIGN KEY (board_id) REFERENCES boards (id) ON DELETE CASCADE,
+    CONSTRAINT fk_spoof
+        FOREIGN KEY (spoof_id) REFERENCES character_spoofs (id) ON DELETE CASCADE
+);
+
+CREATE INDEX board_posts_archive_order ON board_posts_archive (board_id, post_order, sub_order, id);
+
+-- Lets the archiver find tombstones without scanning live posts.
+CREATE INDEX board_posts_deleted ON board_posts (id) WHERE deleted_at IS NOT NULL;
+
+-- Days a thread is kept after its newest post; NULL keeps posts forever.
+ALTER TABLE boards
+    ADD COLUMN retention_days INT NULL CHECK (retention_days > 0);
+
+-- board_view was created with b.*, which doesn't pick up new columns, so append it.
+CREATE OR REPLACE VIEW board_view AS
+SELECT b.id,
+       b.name,
+       b.description,
+       b.faction_id,
+       b.board_order,
+       b.anonymous_name,
+       b.created_at,
+       b.updated_at,
+       b.deleted_at,
+       b.locks,
+       CONCAT(COALESCE(f.abbreviation, ''), b.board_order::text) AS board_key,
+       f.name                                                    AS faction_name,
+       f.abbreviation                                            AS faction_abbreviation,
+       b.retention_days
+FROM boards b
+         LEFT JOIN factions f ON b.faction_id = f.id;
+
+CREATE VIEW board_post_archive_view_full AS
+SELECT p.*,
+       CASE
+           WHEN p.sub_order = 0 THEN p.post_order::text
+           ELSE p.post_order::text || '.' || p.sub_order::text
+           END   AS post_key,
+       s.id      as character_id,
+       s.name    as character_name,
+       s.spoofed_name,
+       s.user_id AS user_id,
+       b.board_key,
+       b.name    AS board_name,
+       b.faction_id,
+       b.faction_name,
+       b.faction_abbreviation,
+       b.anonymous_name
+FROM board_posts_archive p
+         LEFT JOIN character_spoofs_view s ON s.spoof_id = p.spoof_id
+         LEFT JOIN board_view b ON p.board_id = b.id;
+
+COMMIT;
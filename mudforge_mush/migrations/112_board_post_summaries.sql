@@ -0,0 +1,10 @@
+BEGIN TRANSACTION;
+
+-- Carry what a board listing shows in the post order index, so listing summaries can be
+-- an index-only scan that never reads post bodies from the heap.
+CREATE UNIQUE INDEX unique_post_order_summary ON board_posts (board_id, post_order, sub_order)
+    INCLUDE (id, title, spoof_id, created_at, updated_at) WHERE deleted_at IS NULL;
+DROP INDEX unique_post_order;
+ALTER INDEX unique_post_order_summary RENAME TO unique_post_order;
+
+COMMIT;
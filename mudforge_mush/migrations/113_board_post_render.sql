@@ -0,0 +1,20 @@
+BEGIN TRANSACTION;
+
+-- Post bodies rendered once when written, as ANSI and as plain text. render_version is the
+-- renderer that produced them; 0 means never rendered. Rows from an older renderer are
+-- re-rendered the next time they are read.
+--
+-- Only get_post serves the render, so the post views, which listings and search read, are
+-- left without these columns.
+ALTER TABLE board_posts
+    ADD COLUMN body_ansi      TEXT NULL,
+    ADD COLUMN body_plain     TEXT NULL,
+    ADD COLUMN render_version INT  NOT NULL DEFAULT 0;
+
+-- Archiving carries the render along, so archived posts aren't rendered again on read.
+ALTER TABLE board_posts_archive
+    ADD COLUMN body_ansi      TEXT NULL,
+    ADD COLUMN body_plain     TEXT NULL,
+    ADD COLUMN render_version INT  NOT NULL DEFAULT 0;
+
+COMMIT;
@@ -0,0 +1,39 @@
+BEGIN TRANSACTION;
+
+-- Change feed for the in-process channel state, so every process sees membership and
+-- lock changes made through any other. New lines are announced by the message writer.
+CREATE OR REPLACE FUNCTION mush_channel_notify() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('mush_channels', json_build_object('channel_id', OLD.id)::text);
+    ELSE
+        PERFORM pg_notify('mush_channels', json_build_object('channel_id', NEW.id)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER channels_mush_notify
+    AFTER UPDATE OR DELETE ON channels
+    FOR EACH ROW EXECUTE FUNCTION mush_channel_notify();
+
+CREATE OR REPLACE FUNCTION mush_channel_member_notify() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('mush_channels', json_build_object('channel_id', OLD.channel_id,
+                                                             'character_id', OLD.character_id,
+                                                             'listening', FALSE)::text);
+    ELSE
+        PERFORM pg_notify('mush_channels', json_build_object('channel_id', NEW.channel_id,
+                                                             'character_id', NEW.character_id,
+                                                             'listening', NEW.listening)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER channel_members_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON channel_members
+    FOR EACH ROW EXECUTE FUNCTION mush_channel_member_notify();
+
+COMMIT;
@@ -0,0 +1,37 @@
+BEGIN TRANSACTION;
+
+-- Change feed for the in-process room graph, so a room edit or an exit built or removed
+-- through one process is seen by every other.
+CREATE OR REPLACE FUNCTION mush_room_notify() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('mush_rooms', json_build_object('room_id', OLD.id, 'deleted', true)::text);
+    ELSE
+        PERFORM pg_notify('mush_rooms', json_build_object('room_id', NEW.id)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER region_rooms_mush_notify
+    AFTER UPDATE OR DELETE ON region_rooms
+    FOR EACH ROW EXECUTE FUNCTION mush_room_notify();
+
+CREATE OR REPLACE FUNCTION mush_room_exit_notify() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('mush_rooms', json_build_object('exit_id', OLD.id, 'deleted', true)::text);
+    ELSE
+        PERFORM pg_notify('mush_rooms', json_build_object('exit_id', NEW.id, 'room_id', NEW.room_id,
+                                                          'destination_id', NEW.destination_id,
+                                                          'name', NEW.name)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER room_exits_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON room_exits
+    FOR EACH ROW EXECUTE FUNCTION mush_room_exit_notify();
+
+COMMIT;
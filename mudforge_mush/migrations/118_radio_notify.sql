@@ -0,0 +1,33 @@
+BEGIN TRANSACTION;
+
+-- Change feed for the in-process radio index, so tuning through one process is heard
+-- through every other. Presence changes are published on the same channel by the
+-- session hooks in api/radio.py.
+CREATE OR REPLACE FUNCTION mush_radio_notify() RETURNS TRIGGER AS $$
+DECLARE
+    member    frequency_members%ROWTYPE;
+    listening BOOLEAN;
+    number    NUMERIC(9, 3);
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        member := OLD;
+        listening := FALSE;
+    ELSE
+        member := NEW;
+        listening := NEW.listening;
+    END IF;
+    SELECT frequency INTO number FROM frequencies WHERE id = member.frequency_id;
+    IF number IS NOT NULL THEN
+        PERFORM pg_notify('mush_radio', json_build_object('character_id', member.character_id,
+                                                          'frequency', number::text,
+                                                          'listening', listening)::text);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER frequency_members_mush_notify
+    AFTER INSERT OR UPDATE OR DELETE ON frequency_members
+    FOR EACH ROW EXECUTE FUNCTION mush_radio_notify();
+
+COMMIT;
@@ -1,5 +1,6 @@
 import uuid
 import pydantic
+import datetime
 from typing import Optional
 
 from mudforge.models.mixins import SoftDeleteMixin
@@ -22,6 +23,7 @@ class BoardModel(SoftDeleteMixin):
     faction_abbreviation: fields.optional_name_line
     board_order: int
     locks: fields.locks
+    retention_days: Optional[int] = None
 
 class BoardModelPatch(pydantic.BaseModel):
     name: fields.optional_name_line = None
@@ -29,6 +31,7 @@ class BoardModelPatch(pydantic.BaseModel):
     anonymous_name: fields.optional_name_line = None
     board_order: Optional[int] = None
     locks: fields.optional_locks
+    retention_days: Optional[int] = pydantic.Field(default=None, ge=1)
 
 class PostCreate(pydantic.BaseModel):
     title: fields.name_line
@@ -39,12 +42,69 @@ class ReplyCreate(pydantic.BaseModel):
 
 class BoardPostModel(SoftDeleteMixin):
     post_key: str
+    post_order: int
+    sub_order: int
     title: fields.name_line
     body: fields.rich_text
     spoofed_name: str
     character_id: Optional[uuid.UUID] = None
     character_name: Optional[str] = None
 
+class BoardPostDetail(BoardPostModel):
+    """
+    A post as get_post serves it: with its body rendered to ANSI once, when written.
+    Listings and search leave the render out.
+    """
+    body_ansi: Optional[str] = None
+    render_version: int = pydantic.Field(default=0, exclude=True)
+
+class BoardPostPage(pydantic.BaseModel):
+    posts: list[BoardPostModel]
+    next_cursor: Optional[str] = None
+
+class BoardPostSummary(pydantic.BaseModel):
+    """
+    What a board listing shows of a post. Bodies are only sent by get_post.
+    """
+    id: int
+    post_key: str
+    post_order: int
+    sub_order: int
+    title: str
+    spoofed_name: str
+    character_id: Optional[uuid.UUID] = None
+    character_name: Optional[str] = None
+    created_at: datetime.datetime
+    updated_at: datetime.datetime
+
+class BoardPostSummaryPage(pydantic.BaseModel):
+    posts: list[BoardPostSummary]
+    next_cursor: Optional[str] = None
+
+class BoardArchivedPostModel(BoardPostModel):
+    archived_at: datetime.datetime
+    archive_reason: str
+
+class BoardArchivedPostDetail(BoardArchivedPostModel):
+    body_ansi: Optional[str] = None
+    render_version: int = pydantic.Field(default=0, exclude=True)
+
+class BoardArchivePage(pydantic.BaseModel):
+    posts: list[BoardArchivedPostModel]
+    next_cursor: Optional[str] = None
+
+class BoardSearchResult(BoardPostModel):
+    board_id: int
+    board_key: str
+    board_name: str
+    rank: float
+    # The matching part of the post's plain text, matched terms between asterisks.
+    excerpt: Optional[str] = None
+
+class BoardSearchPage(pydantic.BaseModel):
+    results: list[BoardSearchResult]
+    next_page: Optional[int] = None
+
 class BoardPostModelPatch(pydantic.BaseModel):
     title: fields.optional_name_line = None
     body: fields.optional_rich_text
@@ -0,0 +1,36 @@
+import uuid
+import pydantic
+from datetime import datetime
+from typing import Optional
+
+from mudforge.models.mixins import SoftDeleteMixin
+from mudforge.models import fields
+
+
+class ChannelCreate(pydantic.BaseModel):
+    name: fields.name_line
+    category: fields.name_line = "Uncategorized"
+    description: fields.optional_rich_text = None
+
+class ChannelModel(SoftDeleteMixin):
+    id: int
+    category: fields.name_line
+    name: fields.name_line
+    description: fields.optional_rich_text
+    locks: fields.locks
+
+class ChannelMemberModel(pydantic.BaseModel):
+    channel_id: int
+    character_id: uuid.UUID
+    listening: bool
+    aliases: list[str]
+
+class ChannelMessageCreate(pydantic.BaseModel):
+    message: fields.rich_text
+
+class ChannelMessageModel(pydantic.BaseModel):
+    channel_id: int
+    character_id: uuid.UUID
+    character_name: str
+    message: str
+    created_at: datetime
@@ -0,0 +1,35 @@
+import uuid
+import pydantic
+from datetime import datetime
+from typing import Optional
+
+from mudforge.models import fields
+
+
+class SceneCreate(pydantic.BaseModel):
+    name: fields.name_line
+    description: fields.optional_rich_text = None
+
+class SceneModel(pydantic.BaseModel):
+    id: int
+    name: fields.name_line
+    description: fields.optional_rich_text = None
+    resolution: fields.optional_rich_text = None
+    created_at: datetime
+    updated_at: datetime
+    scheduled_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    ended_at: Optional[datetime] = None
+
+class SceneFinish(pydantic.BaseModel):
+    resolution: fields.optional_rich_text = None
+
+class PoseCreate(pydantic.BaseModel):
+    pose: fields.rich_text
+
+class ScenePose(pydantic.BaseModel):
+    scene_id: int
+    character_id: uuid.UUID
+    character_name: str
+    pose: str
+    created_at: datetime
@@ -0,0 +1,24 @@
+import uuid
+import pydantic
+from decimal import Decimal
+from typing import Annotated
+
+from mudforge.models import fields
+
+frequency_number = Annotated[Decimal, pydantic.Field(ge=0, max_digits=9, decimal_places=3)]
+
+
+class FrequencyTune(pydantic.BaseModel):
+    frequency: frequency_number
+
+class Transmission(pydantic.BaseModel):
+    frequency: frequency_number
+    message: fields.rich_text
+
+class TransmissionResult(pydantic.BaseModel):
+    frequency: Decimal
+    listeners: int
+
+class FrequencyActivity(pydantic.BaseModel):
+    frequency: Decimal
+    listeners: int
@@ -0,0 +1,17 @@
+import pydantic
+from typing import Optional
+
+from mudforge.models import fields
+
+
+class RegionModel(pydantic.BaseModel):
+    id: int
+    name: fields.name_line
+    parent_id: Optional[int] = None
+
+class RegionCreate(pydantic.BaseModel):
+    name: fields.name_line
+    parent_id: Optional[int] = None
+
+class RegionMove(pydantic.BaseModel):
+    parent_id: Optional[int] = None
@@ -0,0 +1,29 @@
+import pydantic
+from typing import Optional
+
+from mudforge.models import fields
+
+
+class RoomModel(pydantic.BaseModel):
+    id: int
+    region_id: int
+    name: fields.name_line
+    description: fields.optional_rich_text = None
+
+class ExitModel(pydantic.BaseModel):
+    id: int
+    room_id: int
+    destination_id: int
+    name: fields.name_line
+
+class ExitCreate(pydantic.BaseModel):
+    name: fields.name_line
+    destination_id: int
+
+class RoomLook(pydantic.BaseModel):
+    room: RoomModel
+    exits: list[ExitModel]
+
+class RoomPath(pydantic.BaseModel):
+    rooms: list[int]
+    exits: list[str]
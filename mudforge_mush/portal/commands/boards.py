@@ -1,12 +1,47 @@
 import pydantic
+import weakref
 from collections import defaultdict
+from rich.markup import escape
+from rich.text import Text
 from mudforge.portal.commands.base import Command
 from mudforge_mush.models import boards as boards_models
 from mudforge.utils import partial_match
 
+# Per-connection board reading state, such as the page cursors seen so far.
+_SESSIONS: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+PAGE_SIZE = 30
+
+
 class _BBSCommand(Command):
     help_category = "Boards"
 
+    @property
+    def session(self) -> dict:
+        if (state := _SESSIONS.get(self.connection, None)) is None:
+            state = _SESSIONS[self.connection] = dict()
+        return state
+
+    async def board_list(self) -> list[dict]:
+        """
+        Return the boards visible to this character. The session's copy is revalidated
+        with its ETag, so an unchanged list comes back as an empty 304.
+        """
+        cached = self.session.get("boards", None)
+        headers = {"If-None-Match": cached[0]} if cached and cached[0] else dict()
+        response = await self.api_character_call("GET", "/boards/", headers=headers, raw=True)
+        if cached and response.status_code == 304:
+            return cached[1]
+        response.raise_for_status()
+        board_list = response.json()
+        self.session["boards"] = (response.headers.get("ETag", None), board_list)
+        return board_list
+
+    async def find_board(self, board_key: str) -> dict:
+        if not (board := partial_match(board_key, await self.board_list(), key=lambda b: b["board_key"])):
+            raise self.Error("Board not found.")
+        return board
+
 class BBCreate(_BBSCommand):
     name = "bbcreate"
 
@@ -31,7 +66,7 @@ class BBRead(_BBSCommand):
             await self.display_board()
 
     async def display_boards(self):
-        board_list = await self.api_character_call("GET", "/boards/")
+        board_list = await self.board_list()
         categories = defaultdict(list)
         for board in board_list:
             categories[board["faction_name"]].append(board)
@@ -50,14 +85,59 @@ class BBRead(_BBSCommand):
                 table.add_row(board["board_key"], board["name"], board["description"])
             await self.send_rich(table)
 
+    async def fetch_page(self, board_key: str, cursors: list, page: int) -> dict:
+        """
+        Fetch a page of posts. Pages are addressed by keyset cursors, so reaching a page we have
+        not seen yet means walking forward from the furthest page we know about.
+        """
+        while len(cursors) < page:
+            if cursors[-1] is None and len(cursors) > 1:
+                raise self.Error("There are no more pages.")
+            result = await self.api_character_call("GET", f"/boards/{board_key}/posts",
+                                                   params=self.page_params(cursors[-1]))
+            cursors.append(result["next_cursor"])
+        if cursors[page - 1] is None and page > 1:
+            raise self.Error("There are no more pages.")
+        return await self.api_character_call("GET", f"/boards/{board_key}/posts",
+                                             params=self.page_params(cursors[page - 1]))
+
+    def page_params(self, cursor: str | None) -> dict:
+        params = {"limit": PAGE_SIZE, "fields": "summary"}
+        if cursor:
+            params["cursor"] = cursor
+        return params
+
     async def display_board(self):
-        board_list = await self.api_character_call("GET", "/boards/")
-        board = partial_match(self.lsargs, board_list, key=lambda b: b["board_key"])
-        post_list = await self.api_character_call("GET", f"/boards/{board['board_key']}/posts")
+        match self.lsargs.split():
+            case [board_arg]:
+                page = 1
+            case [board_arg, "next"]:
+                page = None
+            case [board_arg, "page", page_arg] if page_arg.isdigit() and int(page_arg) > 0:
+                page = int(page_arg)
+            case _:
+                raise self.Error("Syntax: bbread <board>[ next| page <number>]")
+
+        board = await self.find_board(board_arg)
+
+        # cursors[n] is the cursor that starts page n+1. Page 1 always starts at the beginning.
+        paging = self.session.setdefault("paging", dict())
+        state = paging.setdefault(board["board_key"], {"cursors": [None], "page": 0})
+        if page is None:
+            page = state["page"] + 1
+        elif page == 1:
+            state["cursors"] = [None]
+
+        result = await self.fetch_page(board["board_key"], state["cursors"], page)
+        if len(state["cursors"]) == page:
+            state["cursors"].append(result["next_cursor"])
+        state["page"] = page
+
+        post_list = result["posts"]
         if not post_list:
             await self.send_line("No posts.")
             return
-        table = self.make_table(title=board["name"])
+        table = self.make_table(title=f"{board['name']} (Page {page})")
         table.add_column("Key", max_width=6)
         table.add_column("Title", max_width=20)
         table.add_column("Author", max_width=20)
@@ -65,13 +145,19 @@ class BBRead(_BBSCommand):
         for post in post_list:
             table.add_row(post["post_key"], post["title"], post["spoofed_name"], post["created_at"])
         await self.send_rich(table)
+        if result["next_cursor"]:
+            await self.send_line(f"More posts: bbread {board['board_key']} next")
 
     async def display_post(self):
         board_key, post_key = self.lsargs.split("/", 1)
-        board_list = await self.api_character_call("GET", "/boards/")
-        board = partial_match(self.lsargs, board_list, key=lambda b: b["board_key"])
+        board = await self.find_board(board_key)
         post = await self.api_character_call("GET", f"/boards/{board['board_key']}/posts/{post_key}")
-        await self.send_line(post)
+        await self.send_line(f"{board['name']} {post['post_key']}: {post['title']}")
+        await self.send_line(f"Posted by {post['spoofed_name']} on {post['created_at']}")
+        # The body arrives already rendered; there is no markup to parse here. send_rich
+        # reduces its colours to what this client supports.
+        body = Text.from_ansi(post["body_ansi"]) if post["body_ansi"] is not None else Text(post["body"])
+        await self.send_rich(body)
 
 
 class BBPost(_BBSCommand):
@@ -100,4 +186,33 @@ class BBReply(_BBSCommand):
         except pydantic.ValidationError as e:
             raise self.Error(f"Error: {e}")
         reply_model = await self.api_character_call("POST", f"/boards/{board_key}/posts/{post_key}", json=reply_model.model_dump())
-        await self.send_line("Reply submitted.")
\ No newline at end of file
+        await self.send_line("Reply submitted.")
+
+class BBSearch(_BBSCommand):
+    name = "bbsearch"
+
+    async def func(self):
+        if not self.lsargs:
+            raise self.Error("Syntax: bbsearch <terms>[=<page>]")
+        page = 1
+        if self.rsargs:
+            if not self.rsargs.isdigit() or int(self.rsargs) < 1:
+                raise self.Error("Page must be a positive number.")
+            page = int(self.rsargs)
+        result = await self.api_character_call("GET", "/boards/search",
+                                               params={"q": self.lsargs, "page": page, "limit": PAGE_SIZE})
+        if not result["results"]:
+            await self.send_line("No matching posts.")
+            return
+        table = self.make_table(title=f"Search: {self.lsargs} (Page {page})")
+        table.add_column("Key", max_width=12)
+        table.add_column("Title", max_width=30)
+        table.add_column("Author", max_width=20)
+        table.add_column("PostDate")
+        table.add_column("Excerpt", max_width=40)
+        for post in result["results"]:
+            table.add_row(f"{post['board_key']}/{post['post_key']}", post["title"], post["spoofed_name"], post["created_at"],
+                          escape(post["excerpt"] or ""))
+        await self.send_rich(table)
+        if result["next_page"]:
+            await self.send_line(f"More results: bbsearch {self.lsargs}={result['next_page']}")
@@ -3,12 +3,16 @@ from typing import Annotated
 from pydantic import BaseModel
 
 import re
+import asyncio
+import base64
+import hashlib
 import typing
 import mudforge
+import pydantic
 
 import uuid
 
-from fastapi import APIRouter, Depends, Body, HTTPException, status
+from fastapi import APIRouter, Depends, Body, Query, Request, Response, HTTPException, status
 from fastapi.responses import StreamingResponse
 
 from mudforge.utils import subscription, queue_iterator
@@ -22,18 +26,79 @@ from mudforge.rest.utils import (
 from mudforge.models.users import UserModel
 from mudforge.models.characters import CharacterModel, ActiveAs
 from mudforge.db.characters import list_online
+from mudforge.events.base import EventBase
 
 from mudforge_mush.models.boards import (BoardModel, BoardPostModel, BoardCreate, BoardPostModelPatch,
-                                         BoardModelPatch, PostCreate, ReplyCreate)
-from mudforge_mush.api.boards import Board, board_admin
+                                         BoardModelPatch, BoardPostPage, BoardSearchPage, PostCreate, ReplyCreate,
+                                         BoardArchivedPostModel, BoardArchivePage, BoardPostSummary,
+                                         BoardPostSummaryPage, BoardPostDetail, BoardArchivedPostDetail)
+from mudforge_mush.api.boards import Board, board_admin, board_audience
+from mudforge_mush.api.fanout import fanout
 from mudforge_mush.events import boards as ev_boards
 
-from mudforge_mush.db import boards as boards_db, factions as factions_db
+from mudforge_mush.db import boards as boards_db, factions as factions_db, listen
+from mudforge_mush.db.cache import TTLCache
+from mudforge_mush.rest.routing import ScopedRoute
 
-router = APIRouter()
+router = APIRouter(route_class=ScopedRoute, on_startup=[boards_db.ARCHIVER.ensure_running],
+                   on_shutdown=[boards_db.ARCHIVER.stop])
 
 RE_BOARD_ID = re.compile(r"^(?P<abbr>[a-zA-Z]+)?(?P<order>\d+)$")
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(*position: int) -> str:
+    return base64.urlsafe_b64encode(".".join(str(part) for part in position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, parts: int = 2) -> tuple[int, ...]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        position = tuple(int(part) for part in raw.split("."))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    if len(position) != parts:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    return position
+
+async def notify_board(board_model: BoardModel, notification: EventBase, notification_admin: EventBase | None = None,
+                       readers: bool = True) -> asyncio.Task:
+    """
+    Send a board event to every online character who can see it, without waiting on delivery.
+    Admins receive notification_admin when it is given.
+    """
+    admins, board_readers = await board_audience(board_model, await list_online())
+    deliveries = [(act.character.id, notification_admin or notification) for act in admins]
+    if readers:
+        deliveries.extend((act.character.id, notification) for act in board_readers)
+    return fanout(deliveries)
+
+
+def json_response(value: pydantic.BaseModel) -> Response:
+    """
+    Serialize a response model straight to JSON. Routes returning posts built from
+    trusted rows use this with response_class=Response, documenting their model under
+    responses=, because a response_model would have FastAPI dump each post and
+    validate it again.
+    """
+    return Response(content=value.model_dump_json(), media_type="application/json")
+
+
+def mask_poster(board_model: BoardModel, post: BoardPostModel | BoardPostSummary, admin: bool):
+    """
+    Hide the poster's identity on anonymous boards. Admins see who is behind the mask.
+    """
+    if not board_model.anonymous_name:
+        return
+    if not admin:
+        post.spoofed_name = board_model.anonymous_name
+        post.character_id = None
+        post.character_name = None
+    else:
+        post.spoofed_name = f"{board_model.anonymous_name} ({post.spoofed_name})"
+
 @router.post("/", response_model=BoardModel)
 async def create_board(
     board: Annotated[BoardCreate, Body()],
@@ -59,10 +124,7 @@ async def create_board(
     notification = ev_boards.BoardCreate(board_key=board_row.board_key, board_name=board_row.name,
                                          faction_name=faction.name if faction else None,
                                          enactor=acting.character.name)
-    online = await list_online()
-    for act in online:
-        if await board_admin(act, faction_id):
-            await mudforge.EVENT_HUB.send(act.character.id, notification)
+    await notify_board(board_row, notification, readers=False)
 
     return board_row
 
@@ -93,10 +155,7 @@ async def update_board(
 
     notification = ev_boards.BoardUpdate(board_key=board_model.board_key, board_name=board_model.name, faction_name=board_model.faction_name,
                                          enactor=acting.character.name, changes=changes)
-    online = await list_online()
-    for act in online:
-        if await board.access(act, "read"):
-            await mudforge.EVENT_HUB.send(act.character.id, notification)
+    await notify_board(board_model, notification)
 
     return board_changed
 
@@ -116,27 +175,78 @@ async def delete_board(user: Annotated[UserModel, Depends(get_current_user)],
     notification = ev_boards.BoardDelete(board_key=board_model.board_key, board_name=board_model.name,
                                          faction_name=board_model.faction_name, enactor=acting.character.name)
 
-    online = await list_online()
-    for act in online:
-        if await board.access(act, "read"):
-            await mudforge.EVENT_HUB.send(act.character.id, notification)
+    await notify_board(board_model, notification)
 
     return board_model
     
 
+# Keyed by (catalog version, user id, character id): the keys of the boards they can read.
+# Board and lock edits bump the catalog version, and faction changes clear the cache, since
+# faction() clauses are the lock inputs that change in play. Any other input a read lock
+# consults, such as a user's admin level, is not tracked: a change there can take up to
+# the TTL to show in the board list, and its ETag keeps matching until then.
+VISIBILITY_CACHE = TTLCache(max_size=5000, ttl=60.0)
+
+listen.register("mush_factions", lambda data: VISIBILITY_CACHE.clear(), on_lost=VISIBILITY_CACHE.clear)
+
+
+async def visible_boards(acting: ActiveAs) -> tuple[int, list[BoardModel]]:
+    version, catalog = await boards_db.BOARD_CATALOG.load()
+    key = (version, acting.user.id, acting.character.id)
+    if (board_keys := VISIBILITY_CACHE.get(key, None)) is None:
+        board_keys = tuple([board_key for board_key, board_model in catalog.items()
+                            if await Board(board_model).access(acting, "read")])
+        VISIBILITY_CACHE.set(key, board_keys)
+    return version, [catalog[board_key] for board_key in board_keys if board_key in catalog]
+
+
+def catalog_etag(version: int, boards: list[BoardModel]) -> str:
+    # Visibility differs per character, so the tag covers which boards were visible, not just the version.
+    digest = hashlib.blake2b(",".join(b.board_key for b in boards).encode(), digest_size=8).hexdigest()
+    return f'W/"{version}-{digest}"'
+
+
 @router.get("/", response_model=typing.List[BoardModel])
 async def list_boards(
+    request: Request,
+    response: Response,
     user: Annotated[UserModel, Depends(get_current_user)], character_id: uuid.UUID
 ):
     acting = await get_acting_character(user, character_id)
+    version, boards = await visible_boards(acting)
+    etag = catalog_etag(version, boards)
+    if request.headers.get("if-none-match", None) == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return boards
 
-    async def board_filter():
-        async for board_model in boards_db.list_boards():
-            board = Board(board_model)
-            if await board.access(acting, "read"):
-                yield board_model
 
-    return streaming_list(board_filter())
+@router.get("/search", response_class=Response, responses={200: {"model": BoardSearchPage}})
+async def search_posts(
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+    q: Annotated[str, Query(min_length=1, max_length=200)],
+    page: Annotated[int, Query(ge=1)] = 1,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    acting = await get_acting_character(user, character_id)
+    version, boards = await visible_boards(acting)
+    # Readable boards are resolved once and handed to the query as a set.
+    boards_by_id = {board_model.id: board_model for board_model in boards}
+    results = await boards_db.search_posts(q, boards_by_id.keys(), limit + 1, (page - 1) * limit)
+    next_page = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_page = page + 1
+
+    admin_boards = dict()
+    for result in results:
+        board_model = boards_by_id[result.board_id]
+        if board_model.anonymous_name and board_model.id not in admin_boards:
+            admin_boards[board_model.id] = await Board(board_model).access(acting, "admin")
+        mask_poster(board_model, result, admin_boards.get(board_model.id, False))
+
+    return json_response(BoardSearchPage(results=results, next_page=next_page))
 
 
 @router.get("/{board_key}", response_model=BoardModel)
@@ -155,11 +265,15 @@ async def get_board(
     return board_model
 
 
-@router.get("/{board_key}/posts", response_model=list[BoardPostModel])
+@router.get("/{board_key}/posts", response_class=Response,
+            responses={200: {"model": BoardPostPage | BoardPostSummaryPage}})
 async def list_posts(
     board_key: str,
     user: Annotated[UserModel, Depends(get_current_user)],
     character_id: uuid.UUID,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    fields: typing.Literal["full", "summary"] = "full",
 ):
     acting = await get_acting_character(user, character_id)
     board_model = await boards_db.get_board_by_key(board_key)
@@ -170,29 +284,24 @@ async def list_posts(
             status_code=403, detail="You do not have permission to read this board."
         )
 
-    posts = boards_db.list_posts_for_board(board_model)
-
-    if board_model.anonymous_name:
-        if not admin:
-            async def transform_posts():
-                async for post in posts:
-                    post.spoofed_name = board_model.anonymous_name
-                    post.character_id = None
-                    post.character_name = None
-                    yield post
-            
-            return streaming_list(transform_posts())
-        else:
-            async def transform_posts():
-                async for post in posts:
-                    post.spoofed_name = f"{board_model.anonymous_name} ({post.spoofed_name})"
-                    yield post
-            return streaming_list(transform_posts())
-    
-    return streaming_list(posts)
+    after = decode_cursor(cursor) if cursor else None
+    listing = boards_db.list_post_summaries if fields == "summary" else boards_db.list_posts_for_board
+    # Fetch one extra row to learn whether another page exists.
+    posts = [post async for post in listing(board_model, after, limit + 1)]
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1].post_order, posts[-1].sub_order)
+
+    for post in posts:
+        mask_poster(board_model, post, admin)
 
+    if fields == "summary":
+        return json_response(BoardPostSummaryPage(posts=posts, next_cursor=next_cursor))
+    return json_response(BoardPostPage(posts=posts, next_cursor=next_cursor))
 
-@router.get("/{board_key}/posts/{post_key}", response_model=BoardPostModel)
+
+@router.get("/{board_key}/posts/{post_key}", response_class=Response, responses={200: {"model": BoardPostDetail}})
 async def get_post(
     board_key: str,
     post_key: str,
@@ -207,19 +316,67 @@ async def get_post(
         raise HTTPException(
             status_code=403, detail="You do not have permission to read this board."
         )
-    post = await boards_db.get_post_by_key(board_model, post_key)
+    # Admins can still read a deleted post until it is archived.
+    post = await boards_db.get_post_by_key(board_model, post_key, admin)
+
+    mask_poster(board_model, post, admin)
+    return json_response(post)
+
+
+
+
+
+@router.get("/{board_key}/archive", response_class=Response, responses={200: {"model": BoardArchivePage}})
+async def list_archived_posts(
+    board_key: str,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+    cursor: str | None = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+):
+    acting = await get_acting_character(user, character_id)
+    board_model = await boards_db.get_board_by_key(board_key)
+    board = Board(board_model)
+    admin = await board.access(acting, "admin")
+    if not admin and not await board.access(acting, "read"):
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to read this board."
+        )
 
-    if board_model.anonymous_name:
-        if not admin:
-            post.spoofed_name = board_model.anonymous_name
-            post.character_id = None
-            post.character_name = None
-        else:
-            post.spoofed_name = f"{board_model.anonymous_name} ({post.spoofed_name})"
-    return post
+    after = decode_cursor(cursor, 3) if cursor else None
+    # Deleted posts stay visible to board admins only, as they were before archival.
+    posts = [post async for post in boards_db.list_archived_posts(board_model, admin, after, limit + 1)]
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        next_cursor = encode_cursor(posts[-1].post_order, posts[-1].sub_order, posts[-1].id)
 
+    for post in posts:
+        mask_poster(board_model, post, admin)
 
+    return json_response(BoardArchivePage(posts=posts, next_cursor=next_cursor))
+
+
+@router.get("/{board_key}/archive/{post_key}", response_class=Response,
+            responses={200: {"model": BoardArchivedPostDetail}})
+async def get_archived_post(
+    board_key: str,
+    post_key: str,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    board_model = await boards_db.get_board_by_key(board_key)
+    board = Board(board_model)
+    admin = await board.access(acting, "admin")
+    if not admin and not await board.access(acting, "read"):
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to read this board."
+        )
+    post = await boards_db.get_archived_post_by_key(board_model, post_key, admin)
 
+    mask_poster(board_model, post, admin)
+    return json_response(post)
 
 
 @router.post("/{board_key}/posts", response_model=BoardPostModel)
@@ -237,28 +394,21 @@ async def create_post(
             status_code=403,
             detail="You do not have permission to write to this board.",
         )
-    post_model = await boards_db.create_post(board_model, post, user)
-
-    notification = ev_boards.BoardPostCreate(board_key=board_model.board_key, board_name=board_model.name,
-                                             faction_name=board_model.faction_name, enactor=acting.character.name,
-                                             poster_name=post_model.spoofed_name, post_title=post.title,
-                                             post_key=post_model.post_key)
-    notification_admin = notification.copy()
-    notification_admin.character_name = post_model.character_name
-
-    online = await list_online()
-    for act in online:
-        admin = await board.access(act, "admin")
-        if admin:
-            await mudforge.EVENT_HUB.send(act.character.id, notification_admin)
-            continue
-        if await board.access(act, "read"):
-            await mudforge.EVENT_HUB.send(act.character.id, notification)
+    post_model = await boards_db.create_post(board_model, post, acting.character, user)
+
+    notification, notification_admin = ev_boards.BoardPostCreate.variants(character_name=post_model.character_name,
+                                                                          board_key=board_model.board_key, board_name=board_model.name,
+                                                                          faction_name=board_model.faction_name, enactor=acting.character.name,
+                                                                          poster_name=post_model.spoofed_name, post_title=post.title,
+                                                                          anonymous_name=board_model.anonymous_name,
+                                                                          post_key=post_model.post_key)
+
+    await notify_board(board_model, notification, notification_admin)
 
     broadcaster = mudforge.BROADCASTERS["boards"]
     await broadcaster.broadcast(notification)
 
-    return post
+    return post_model
 
 
 
@@ -280,26 +430,19 @@ async def create_reply_post(
             status_code=403,
             detail="You do not have permission to write to this board.",
         )
-    post = await boards_db.get_post_by_key(board, post_key)
-    reply_model = await boards_db.create_reply(board_model, post, reply, user)
-
-    notification = ev_boards.BoardReplyCreate(board_key=board_model.board_key, board_name=board_model.name,
-                                             faction_name=board_model.faction_name, enactor=acting.character.name,
-                                             poster_name=reply_model.spoofed_name, post_title=post.title,
-                                             post_key=reply_model.post_key)
-    notification_admin = notification.copy()
-    notification_admin.character_name = reply_model.character_name
-
-    online = await list_online()
-    for act in online:
-        admin = await board.access(act, "admin")
-        if admin:
-            await mudforge.EVENT_HUB.send(act.character.id, notification_admin)
-            continue
-        if await board.access(act, "read"):
-            await mudforge.EVENT_HUB.send(act.character.id, notification)
-
-    return reply
+    post = await boards_db.get_post_by_key(board_model, post_key)
+    reply_model = await boards_db.create_reply(board_model, post, reply, acting.character, user)
+
+    notification, notification_admin = ev_boards.BoardReplyCreate.variants(character_name=reply_model.character_name,
+                                                                           board_key=board_model.board_key, board_name=board_model.name,
+                                                                           faction_name=board_model.faction_name, enactor=acting.character.name,
+                                                                           poster_name=reply_model.spoofed_name, post_title=post.title,
+                                                                           anonymous_name=board_model.anonymous_name,
+                                                                           post_key=reply_model.post_key)
+
+    await notify_board(board_model, notification, notification_admin)
+
+    return reply_model
 
 @router.delete("/{board_key}/posts/{post_key}", response_model=BoardPostModel)
 async def delete_post(
@@ -319,22 +462,14 @@ async def delete_post(
     post = await boards_db.get_post_by_key(board_model, post_key)
     post_model = await boards_db.delete_post(post)
 
-    notification = ev_boards.BoardPostDelete(board_key=board_model.board_key, board_name=board_model.name,
-                                             faction_name=board_model.faction_name, enactor=acting.character.name,
-                                             poster_name=post_model.spoofed_name, post_title=post.title,
-                                             post_key=post_model.post_key)
+    notification, notification_admin = ev_boards.BoardPostDelete.variants(character_name=post_model.character_name,
+                                                                          board_key=board_model.board_key, board_name=board_model.name,
+                                                                          faction_name=board_model.faction_name, enactor=acting.character.name,
+                                                                          poster_name=post_model.spoofed_name, post_title=post.title,
+                                                                          anonymous_name=board_model.anonymous_name,
+                                                                          post_key=post_model.post_key)
 
-    notification_admin = notification.copy()
-    notification_admin.character_name = post_model.character_name
-
-    online = await list_online()
-    for act in online:
-        admin = await board.access(act, "admin")
-        if admin:
-            await mudforge.EVENT_HUB.send(act.character.id, notification_admin)
-            continue
-        if await board.access(act, "read"):
-            await mudforge.EVENT_HUB.send(act.character.id, notification)
+    await notify_board(board_model, notification, notification_admin)
 
     return post_model
 
@@ -355,10 +490,20 @@ async def update_post(
             detail="You do not have permission to update this post.",
         )
     post = await boards_db.get_post_by_key(board_model, post_key)
-    post = await boards_db.update_post(post, patch)
+    post_changed = await boards_db.update_post(post, patch)
 
-    notification = BoardPostNotification(board=board, post=post, message="Post updated.")
-    broadcaster = mudforge.BROADCASTERS["boards"]
-    await broadcaster.broadcast(notification)
+    changes = dict()
+    for key, value in patch.model_dump(exclude_unset=True).items():
+        if (old := getattr(post, key)) != value:
+            changes[key] = (str(old), value)
+
+    notification, notification_admin = ev_boards.BoardPostUpdate.variants(character_name=post_changed.character_name,
+                                                                          board_key=board_model.board_key, board_name=board_model.name,
+                                                                          faction_name=board_model.faction_name, enactor=acting.character.name,
+                                                                          poster_name=post_changed.spoofed_name, post_title=post_changed.title,
+                                                                          anonymous_name=board_model.anonymous_name,
+                                                                          post_key=post_changed.post_key, changes=changes)
+
+    await notify_board(board_model, notification, notification_admin)
 
-    return post
\ No newline at end of file
+    return post_changed
\ No newline at end of file
@@ -0,0 +1,117 @@
+from typing import Annotated
+
+import typing
+import uuid
+
+from fastapi import APIRouter, Depends, Body, Query, HTTPException, status
+
+from mudforge.rest.utils import (
+    get_current_user,
+    get_acting_character,
+    streaming_list
+)
+
+from mudforge.models.users import UserModel
+
+from mudforge_mush.models.channels import (ChannelModel, ChannelCreate, ChannelMemberModel, ChannelMessageCreate,
+                                           ChannelMessageModel)
+from mudforge_mush.api.channels import Channel, CHANNEL_HUB, HISTORY_SIZE
+from mudforge_mush.db import channels as channels_db
+from mudforge_mush.rest.routing import ScopedRoute
+
+# Write chat lines still buffered before the process exits.
+router = APIRouter(route_class=ScopedRoute, on_shutdown=[channels_db.MESSAGE_WRITER.close])
+
+
+@router.get("/", response_model=typing.List[ChannelModel])
+async def list_channels(
+    user: Annotated[UserModel, Depends(get_current_user)], character_id: uuid.UUID
+):
+    acting = await get_acting_character(user, character_id)
+
+    async def channel_filter():
+        async for channel_model in channels_db.list_channels():
+            if await Channel(channel_model).access(acting, "see"):
+                yield channel_model
+
+    return streaming_list(channel_filter())
+
+
+@router.post("/", response_model=ChannelModel)
+async def create_channel(
+    channel: Annotated[ChannelCreate, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    if acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to create a channel."
+        )
+    channel_model = await channels_db.create_channel(channel.name, channel.category, channel.description)
+    CHANNEL_HUB.add(channel_model)
+    return channel_model
+
+
+async def _listen(channel_name: str, user: UserModel, character_id: uuid.UUID, listening: bool) -> ChannelMemberModel:
+    acting = await get_acting_character(user, character_id)
+    channel_model = await CHANNEL_HUB.find(channel_name)
+    # Locks are checked once here; sending to the channel uses the resulting listener set.
+    if listening and not await Channel(channel_model).access(acting, "join"):
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to join this channel."
+        )
+    await CHANNEL_HUB.set_listening(channel_model, acting.character, listening)
+    return ChannelMemberModel(channel_id=channel_model.id, character_id=acting.character.id, listening=listening, aliases=[])
+
+
+@router.post("/{channel_name}/join", response_model=ChannelMemberModel)
+async def join_channel(
+    channel_name: str,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    return await _listen(channel_name, user, character_id, True)
+
+
+@router.post("/{channel_name}/leave", response_model=ChannelMemberModel)
+async def leave_channel(
+    channel_name: str,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    return await _listen(channel_name, user, character_id, False)
+
+
+@router.post("/{channel_name}/messages", response_model=ChannelMessageModel)
+async def send_message(
+    channel_name: str,
+    message: Annotated[ChannelMessageCreate, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    channel_model = await CHANNEL_HUB.find(channel_name)
+    state = await CHANNEL_HUB.state(channel_model)
+    if acting.character.id not in state.listeners:
+        raise HTTPException(
+            status_code=403, detail="You must be listening to a channel to speak on it."
+        )
+    return await CHANNEL_HUB.send(channel_model, acting.character, message.message)
+
+
+@router.get("/{channel_name}/messages", response_model=list[ChannelMessageModel])
+async def recall_messages(
+    channel_name: str,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+    count: Annotated[int, Query(ge=1, le=HISTORY_SIZE)] = 20,
+):
+    acting = await get_acting_character(user, character_id)
+    channel_model = await CHANNEL_HUB.find(channel_name)
+    state = await CHANNEL_HUB.state(channel_model)
+    if acting.character.id not in state.listeners and not await Channel(channel_model).access(acting, "join"):
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to read this channel."
+        )
+    return await CHANNEL_HUB.recall(channel_model, count)
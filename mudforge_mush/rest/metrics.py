@@ -0,0 +1,81 @@
+import os
+import secrets
+import typing
+
+from fastapi import APIRouter, Request, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from mudforge_mush import metrics
+from mudforge_mush.db.queries import QUERIES
+from mudforge_mush.db.factions import PERMISSION_CACHE, MEMBERSHIP_CACHE
+from mudforge_mush.db.boards import ARCHIVER
+from mudforge_mush.rest.boards import VISIBILITY_CACHE
+
+router = APIRouter()
+
+# Scrapers send this as a bearer token. The peer address is not trusted, since behind a
+# reverse proxy every request comes from the proxy. Metrics are not served when unset.
+METRICS_TOKEN = os.environ.get("MUSH_METRICS_TOKEN", "")
+
+CACHES = {
+    "faction_permissions": PERMISSION_CACHE,
+    "faction_memberships": MEMBERSHIP_CACHE,
+    "board_visibility": VISIBILITY_CACHE,
+}
+
+
+def exposition() -> typing.Iterator[str]:
+    yield "# TYPE mush_route_latency_seconds histogram"
+    for route in metrics.ROUTES.values():
+        yield from metrics.histogram_lines("mush_route_latency_seconds", route.latency,
+                                           {"route": route.name, "method": route.method, "path": route.path})
+    yield "# TYPE mush_route_db_round_trips histogram"
+    for route in metrics.ROUTES.values():
+        yield from metrics.histogram_lines("mush_route_db_round_trips", route.round_trips,
+                                           {"route": route.name, "method": route.method, "path": route.path})
+    yield "# TYPE mush_route_responses_total counter"
+    for route in metrics.ROUTES.values():
+        for status_code, count in route.statuses.items():
+            yield metrics.sample_line("mush_route_responses_total", count,
+                                      {"route": route.name, "method": route.method, "path": route.path,
+                                       "status": status_code})
+
+    yield "# TYPE mush_query_latency_seconds histogram"
+    for query in QUERIES.values():
+        yield from metrics.histogram_lines("mush_query_latency_seconds", query.latency, {"query": query.name})
+    yield "# TYPE mush_query_rows_total counter"
+    for query in QUERIES.values():
+        yield metrics.sample_line("mush_query_rows_total", query.rows, {"query": query.name})
+    yield "# TYPE mush_query_errors_total counter"
+    for query in QUERIES.values():
+        yield metrics.sample_line("mush_query_errors_total", query.errors, {"query": query.name})
+
+    yield "# TYPE mush_fanout_recipients histogram"
+    for event, fanout in metrics.FANOUTS.items():
+        yield from metrics.histogram_lines("mush_fanout_recipients", fanout.recipients, {"event": event})
+    yield "# TYPE mush_fanout_duration_seconds histogram"
+    for event, fanout in metrics.FANOUTS.items():
+        yield from metrics.histogram_lines("mush_fanout_duration_seconds", fanout.duration, {"event": event})
+    yield "# TYPE mush_fanout_failures_total counter"
+    for event, fanout in metrics.FANOUTS.items():
+        yield metrics.sample_line("mush_fanout_failures_total", fanout.failures, {"event": event})
+
+    yield "# TYPE mush_cache_hits_total counter"
+    for name, cache in CACHES.items():
+        yield metrics.sample_line("mush_cache_hits_total", cache.hits, {"cache": name})
+    yield "# TYPE mush_cache_misses_total counter"
+    for name, cache in CACHES.items():
+        yield metrics.sample_line("mush_cache_misses_total", cache.misses, {"cache": name})
+
+    yield "# TYPE mush_board_posts_archived_total counter"
+    for reason, count in ARCHIVER.archived.items():
+        yield metrics.sample_line("mush_board_posts_archived_total", count, {"reason": reason})
+
+
+@router.get("/", response_class=PlainTextResponse)
+async def get_metrics(request: Request):
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if not METRICS_TOKEN or scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(),
+                                                                                   METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="A valid metrics token is required.")
+    return PlainTextResponse("\n".join(exposition()) + "\n", media_type="text/plain; version=0.0.4")
@@ -0,0 +1,100 @@
+from typing import Annotated, Literal
+
+import typing
+import uuid
+
+from fastapi import APIRouter, Depends, Body, Query, HTTPException, status
+from fastapi.responses import StreamingResponse
+
+from mudforge.rest.utils import (
+    get_current_user,
+    get_acting_character,
+    streaming_list
+)
+
+from mudforge.models.users import UserModel
+
+from mudforge_mush.models.plots import SceneModel, SceneCreate, SceneFinish, PoseCreate, ScenePose
+from mudforge_mush.api import plots
+from mudforge_mush.db import plots as plots_db
+from mudforge_mush.rest.routing import ScopedRoute
+
+# Write poses still buffered before the process exits.
+router = APIRouter(route_class=ScopedRoute, on_shutdown=[plots_db.POSE_WRITER.close])
+
+
+@router.get("/", response_model=typing.List[SceneModel])
+async def list_scenes(
+    user: Annotated[UserModel, Depends(get_current_user)], character_id: uuid.UUID
+):
+    acting = await get_acting_character(user, character_id)
+    return streaming_list(plots_db.list_scenes())
+
+
+@router.post("/", response_model=SceneModel)
+async def create_scene(
+    scene: Annotated[SceneCreate, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    return await plots_db.create_scene(scene.name, scene.description, acting.character)
+
+
+@router.get("/{scene_id}", response_model=SceneModel)
+async def get_scene(
+    scene_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    return await plots_db.get_scene(scene_id)
+
+
+@router.post("/{scene_id}/poses", response_model=ScenePose)
+async def create_pose(
+    scene_id: int,
+    pose: Annotated[PoseCreate, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    scene = await plots_db.get_scene(scene_id)
+    # A pose racing a finish can pass this check; it still reaches scene_poses and is
+    # folded into the scene's log by fold_late_poses.
+    if scene.ended_at is not None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="That scene has already ended.")
+    return await plots.pose(scene, acting.character, pose.pose)
+
+
+@router.post("/{scene_id}/finish", response_model=SceneModel)
+async def finish_scene(
+    scene_id: int,
+    finish: Annotated[SceneFinish, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    scene = await plots_db.get_scene(scene_id)
+    participants = await plots.SCENE_ROSTER.participants(scene)
+    # Owners (3) and co-owners (2) may end a scene.
+    if participants.get(acting.character.id, 0) < 2 and acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to end this scene."
+        )
+    return await plots.finish(scene, finish.resolution)
+
+
+@router.get("/{scene_id}/log")
+async def export_scene(
+    scene_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+    format: Annotated[Literal["text", "html", "json"], Query()] = "text",
+):
+    acting = await get_acting_character(user, character_id)
+    scene = await plots_db.get_scene(scene_id)
+    if scene.ended_at is not None:
+        await plots_db.fold_late_poses(scene)
+    exporter, media_type = plots.EXPORTERS[format]
+    return StreamingResponse(exporter(scene, plots_db.stream_poses(scene)), media_type=media_type)
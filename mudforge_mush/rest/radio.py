@@ -0,0 +1,86 @@
+from typing import Annotated
+
+import uuid
+from decimal import Decimal
+
+from fastapi import APIRouter, Depends, Body, Query, HTTPException, status
+
+from mudforge.rest.utils import (
+    get_current_user,
+    get_acting_character,
+)
+
+from mudforge.models.users import UserModel
+
+from mudforge_mush.models.radio import (FrequencyTune, Transmission, TransmissionResult, FrequencyActivity,
+                                        frequency_number)
+from mudforge_mush.api import radio
+from mudforge_mush.rest.routing import ScopedRoute
+
+router = APIRouter(route_class=ScopedRoute)
+
+
+@router.get("/", response_model=list[Decimal])
+async def list_tuned(
+    user: Annotated[UserModel, Depends(get_current_user)], character_id: uuid.UUID
+):
+    acting = await get_acting_character(user, character_id)
+    await radio.RADIO_INDEX.load()
+    return [radio.from_key(key) for key in radio.RADIO_INDEX.frequencies_of(acting.character.id)]
+
+
+@router.post("/tune", response_model=list[Decimal])
+async def tune(
+    tune: Annotated[FrequencyTune, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    await radio.tune(acting.character, tune.frequency, True)
+    return [radio.from_key(key) for key in radio.RADIO_INDEX.frequencies_of(acting.character.id)]
+
+
+@router.post("/untune", response_model=list[Decimal])
+async def untune(
+    tune: Annotated[FrequencyTune, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    await radio.tune(acting.character, tune.frequency, False)
+    return [radio.from_key(key) for key in radio.RADIO_INDEX.frequencies_of(acting.character.id)]
+
+
+@router.post("/transmit", response_model=TransmissionResult)
+async def transmit(
+    transmission: Annotated[Transmission, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    await radio.RADIO_INDEX.load()
+    if not radio.RADIO_INDEX.is_tuned(acting.character.id, radio.to_key(transmission.frequency)):
+        raise HTTPException(
+            status_code=403, detail="You must be tuned to a frequency to transmit on it."
+        )
+    listeners = await radio.transmit(acting.character, transmission.frequency, transmission.message)
+    return TransmissionResult(frequency=transmission.frequency, listeners=listeners)
+
+
+@router.get("/scan", response_model=list[FrequencyActivity])
+async def scan(
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+    low: Annotated[frequency_number, Query()],
+    high: Annotated[frequency_number, Query()],
+):
+    acting = await get_acting_character(user, character_id)
+    if acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to scan frequencies."
+        )
+    if low > high:
+        raise HTTPException(status_code=400, detail="The low end of a scan must not exceed the high end.")
+    await radio.RADIO_INDEX.load()
+    return [FrequencyActivity(frequency=radio.from_key(key), listeners=len(listeners))
+            for key, listeners in radio.RADIO_INDEX.scan(radio.to_key(low), radio.to_key(high))]
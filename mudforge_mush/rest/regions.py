@@ -0,0 +1,106 @@
+from typing import Annotated
+
+import typing
+import uuid
+
+from fastapi import APIRouter, Depends, Body, HTTPException, status
+
+from mudforge.rest.utils import (
+    get_current_user,
+    get_acting_character,
+    streaming_list
+)
+
+from mudforge.models.users import UserModel
+
+from mudforge_mush.models.regions import RegionModel, RegionCreate, RegionMove
+from mudforge_mush.models.rooms import RoomModel
+from mudforge_mush.api.regions import REGION_TREE
+from mudforge_mush.api.rooms import ROOM_GRAPH
+from mudforge_mush.db import regions as regions_db
+from mudforge_mush.rest.routing import ScopedRoute
+
+# The region tree is loaded with the app, so the first containment check finds it ready.
+router = APIRouter(route_class=ScopedRoute, on_startup=[REGION_TREE.load])
+
+
+@router.get("/", response_model=typing.List[RegionModel])
+async def list_regions(
+    user: Annotated[UserModel, Depends(get_current_user)], character_id: uuid.UUID
+):
+    acting = await get_acting_character(user, character_id)
+    return streaming_list(regions_db.list_regions())
+
+
+@router.post("/", response_model=RegionModel)
+async def create_region(
+    region: Annotated[RegionCreate, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    if acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to create regions."
+        )
+    await REGION_TREE.load()
+    region_model = await regions_db.create_region(region.name, region.parent_id)
+    REGION_TREE.add(region_model.id, region_model.parent_id)
+    return region_model
+
+
+@router.get("/{region_id}", response_model=RegionModel)
+async def get_region(
+    region_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    return await regions_db.get_region(region_id)
+
+
+@router.put("/{region_id}/parent", response_model=RegionModel)
+async def move_region(
+    region_id: int,
+    move: Annotated[RegionMove, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    if acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to move regions."
+        )
+    await REGION_TREE.load()
+    region_model = await regions_db.get_region(region_id)
+    region_model = await regions_db.set_parent(region_model, move.parent_id)
+    REGION_TREE.move(region_model.id, region_model.parent_id)
+    return region_model
+
+
+@router.get("/{region_id}/rooms", response_model=typing.List[RoomModel])
+async def list_region_rooms(
+    region_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    region_model = await regions_db.get_region(region_id)
+    return streaming_list(regions_db.rooms_in_region(region_model))
+
+
+# A room is in a region if it lies in that region or any region beneath it. The
+# in-memory tree answers this without touching region_closure.
+@router.get("/{region_id}/rooms/{room_id}", response_model=RoomModel)
+async def get_region_room(
+    region_id: int,
+    room_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    await REGION_TREE.load()
+    room = await ROOM_GRAPH.room(room_id)
+    if not REGION_TREE.room_in(room, region_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found in that region.")
+    return room
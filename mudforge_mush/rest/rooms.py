@@ -0,0 +1,96 @@
+from typing import Annotated
+
+import uuid
+
+from fastapi import APIRouter, Depends, Body, HTTPException, status
+
+from mudforge.rest.utils import (
+    get_current_user,
+    get_acting_character,
+)
+
+from mudforge.models.users import UserModel
+
+from mudforge_mush.models.rooms import ExitModel, ExitCreate, RoomLook, RoomPath
+from mudforge_mush.api.rooms import ROOM_GRAPH
+from mudforge_mush.db import rooms as rooms_db
+from mudforge_mush.rest.routing import ScopedRoute
+
+router = APIRouter(route_class=ScopedRoute)
+
+
+@router.get("/{room_id}", response_model=RoomLook)
+async def look(
+    room_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    room = await ROOM_GRAPH.room(room_id)
+    return RoomLook(room=room, exits=ROOM_GRAPH.exits_of(room_id))
+
+
+@router.get("/{room_id}/exits", response_model=list[ExitModel])
+async def list_exits(
+    room_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    await ROOM_GRAPH.room(room_id)
+    return ROOM_GRAPH.exits_of(room_id)
+
+
+@router.get("/{room_id}/path/{destination_id}", response_model=RoomPath)
+async def directions(
+    room_id: int,
+    destination_id: int,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    await ROOM_GRAPH.room(room_id)
+    await ROOM_GRAPH.room(destination_id)
+    if (path := ROOM_GRAPH.path(room_id, destination_id)) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="There is no way to get there from here.")
+    return path
+
+
+@router.post("/{room_id}/exits", response_model=ExitModel)
+async def create_exit(
+    room_id: int,
+    exit_create: Annotated[ExitCreate, Body()],
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    if acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to build exits."
+        )
+    room = await ROOM_GRAPH.room(room_id)
+    destination = await ROOM_GRAPH.room(exit_create.destination_id)
+    exit_model = await rooms_db.create_exit(room, exit_create.name, destination)
+    ROOM_GRAPH.add_exit(exit_model)
+    return exit_model
+
+
+@router.delete("/{room_id}/exits/{exit_name}", response_model=ExitModel)
+async def delete_exit(
+    room_id: int,
+    exit_name: str,
+    user: Annotated[UserModel, Depends(get_current_user)],
+    character_id: uuid.UUID,
+):
+    acting = await get_acting_character(user, character_id)
+    if acting.user.admin_level <= 3:
+        raise HTTPException(
+            status_code=403, detail="You do not have permission to remove exits."
+        )
+    await ROOM_GRAPH.room(room_id)
+    for exit_model in ROOM_GRAPH.exits_of(room_id):
+        if exit_model.name.lower() == exit_name.lower():
+            await rooms_db.delete_exit(exit_model.id)
+            ROOM_GRAPH.remove_exit(exit_model.id)
+            return exit_model
+    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Exit not found.")
@@ -0,0 +1,49 @@
+import os
+import time
+import typing
+
+from fastapi import Request, Response, HTTPException
+from fastapi.routing import APIRoute
+
+from mudforge_mush import metrics
+from mudforge_mush.db.identity import request_scope
+
+# Set MUSH_DEBUG_ROUND_TRIPS=1 to report each request's round trips in a response header.
+ROUND_TRIPS_HEADER = os.environ.get("MUSH_DEBUG_ROUND_TRIPS", "") not in ("", "0")
+
+
+class ScopedRoute(APIRoute):
+    """
+    Runs each request inside its own db.identity request scope. When ROUND_TRIPS_HEADER
+    is set, the scope's database round trips are reported in the X-DB-Round-Trips
+    response header, for debugging.
+
+    Every request's latency, round trips and status are recorded in the route's
+    metrics.RouteMetrics; that is a few additions per request, so it is always on.
+
+    Bodies of streaming responses are produced after the handler returns, so their
+    queries and time are not part of either.
+    """
+
+    def get_route_handler(self) -> typing.Callable[[Request], typing.Coroutine[typing.Any, typing.Any, Response]]:
+        handler = super().get_route_handler()
+        route_metrics = metrics.route(f"{self.endpoint.__module__}.{self.name}", ",".join(sorted(self.methods)),
+                                      self.path_format)
+
+        async def scoped_handler(request: Request) -> Response:
+            started = time.perf_counter()
+            status_code = 500
+            with request_scope() as scope:
+                try:
+                    response = await handler(request)
+                    status_code = response.status_code
+                except HTTPException as e:
+                    status_code = e.status_code
+                    raise
+                finally:
+                    route_metrics.observe(time.perf_counter() - started, scope.round_trips, status_code)
+            if ROUND_TRIPS_HEADER:
+                response.headers["X-DB-Round-Trips"] = str(scope.round_trips)
+            return response
+
+        return scoped_handler